@@ -1,14 +1,19 @@
 """main application entry point."""
 
+import asyncio
+import contextlib
 import logging
+from contextlib import asynccontextmanager
 
 import uvicorn
 from fastapi import FastAPI, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
 from app.exceptions.global_exceptions import DataNotFoundException
 from app.middleware.logging_middleware import LoggingMiddleware
+from app.middleware.retry_budget_middleware import RetryBudgetMiddleware
 from app.routers import (
     bioentity,
     labeler,
@@ -21,10 +26,51 @@ from app.routers import (
     slimmer,
     users_and_groups,
 )
+from app.utils.go_graph import load_configured_go_graph
+from app.utils.gocam_conversion import run_preconversion
+from app.utils.gocam_summary import load_configured_gocam_summaries
+from app.utils.http_clients import close_upstream_clients
+from app.utils.id_mapping import load_configured_id_mapping
+from app.utils.mygene_utils import seed_configured_mapping_cache
+from app.utils.subset_registry import get_subset_registry_config, subset_registry
 
 logger = logging.getLogger("uvicorn.error")
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Manage resources shared by all requests of a worker.
+
+    The local GO graph, the gene/UniProt mapping table, the mapping cache seed file and the
+    GO-CAM summary table, when configured, are loaded on startup, and the subset registry is
+    preloaded and refreshed in the background. When ``gocam_conversion.preconvert`` is set, the
+    stored GO-CAM models are converted to the gocam-py format in the background too. Upstream
+    HTTP clients are created lazily on first use and closed here on shutdown.
+
+    :param app: The FastAPI application.
+    """
+    await run_in_threadpool(load_configured_go_graph)
+    await run_in_threadpool(load_configured_id_mapping)
+    await run_in_threadpool(seed_configured_mapping_cache)
+    await run_in_threadpool(load_configured_gocam_summaries)
+    refresh_task = None
+    subset_config = get_subset_registry_config()
+    if subset_config["refresh_seconds"] > 0:
+        refresh_task = asyncio.create_task(subset_registry.run_refresh_loop(subset_config["preload"]))
+    preconversion_task = asyncio.create_task(run_preconversion())
+    yield
+    if not preconversion_task.done():
+        preconversion_task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await preconversion_task
+    if refresh_task is not None:
+        refresh_task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await refresh_task
+    await close_upstream_clients()
+
+
 app = FastAPI(
     title="GO API",
     description="The Gene Ontology API.\n\n __Source:__ 'https://github.com/geneontology/go-fastapi'",
@@ -35,6 +81,7 @@ app = FastAPI(
         "email": "help@geneontology.org",
     },
     license_info={"name": "BSD3"},
+    lifespan=lifespan,
 )
 app.include_router(ontology.router)
 app.include_router(bioentity.router)
@@ -49,6 +96,8 @@ app.include_router(users_and_groups.router)
 
 # Logging
 app.add_middleware(LoggingMiddleware)
+# Upstream retry budget per request
+app.add_middleware(RetryBudgetMiddleware)
 # CORS
 app.add_middleware(
     CORSMiddleware,
@@ -0,0 +1,35 @@
+"""Middleware giving each request a shared budget of upstream retries."""
+
+from fastapi import Request
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.utils.retry_utils import start_request_retry_budget
+from app.utils.settings import get_golr_config
+
+DEFAULT_REQUEST_RETRY_BUDGET = 6
+
+
+class RetryBudgetMiddleware(BaseHTTPMiddleware):
+
+    """Middleware starting a per-request retry budget for upstream (GOlr) calls."""
+
+    def __init__(self, app):
+        """
+        Initialize the middleware with the budget configured in config.yaml.
+
+        :param app: The ASGI application.
+        """
+        super().__init__(app)
+        retry_config = get_golr_config().get("golr_retry", {})
+        self.retries = retry_config.get("request_retry_budget", DEFAULT_REQUEST_RETRY_BUDGET)
+
+    async def dispatch(self, request: Request, call_next):
+        """
+        Start the retry budget for the request, then handle it.
+
+        :param request: The request.
+        :param call_next: The next call.
+        :return: The response.
+        """
+        start_request_retry_budget(self.retries)
+        return await call_next(request)
@@ -5,15 +5,16 @@ from enum import Enum
 from typing import List
 
 from fastapi import APIRouter, Path, Query
+from fastapi.concurrency import run_in_threadpool
 from ontobio.config import get_config
 
 from app.exceptions.global_exceptions import DataNotFoundException, InvalidIdentifier
-from app.utils.golr_utils import gu_run_solr_text_on, is_valid_bioentity
+from app.utils.golr_utils import check_bioentity_format, gu_run_solr_text_on_async, is_valid_bioentity_async
 from app.utils.golr_wrappers import search_associations
+from app.utils.mygene_utils import gene_to_uniprot_from_mygene
 from app.utils.settings import ESOLR, ESOLRDoc, get_user_agent
 
-from ..utils.ontology_utils import is_valid_goid
-from .slimmer import gene_to_uniprot_from_mygene
+from ..utils.ontology_utils import check_goid_format, is_valid_goid_async
 
 INVOLVED_IN = "involved_in"
 ACTS_UPSTREAM_OF_OR_WITHIN = "acts_upstream_of_or_within"
@@ -49,6 +50,35 @@ class RelationshipType(str, Enum):
 router = APIRouter()
 
 
+async def _search_goterm_annotations(id: str, query_filters: str, fields: str, optionals: str) -> list:
+    """
+    Run the text search of annotations for a GO term, reporting unknown terms as the validator does.
+
+    The docs are fetched with their ``annotation_class``: a doc annotated to the term shows the term
+    exists, so the separate validation query is only made when no doc is. Free text matches in
+    labels or references alone do not count, and an unknown term still gets a 404.
+
+    :param id: The GO term CURIE, already checked for format.
+    :param query_filters: The qf parameter of the search.
+    :param fields: The fields of the returned docs.
+    :param optionals: The other Solr parameters of the search.
+    :return: The docs, with only the requested ``fields``.
+    :raises DataNotFoundException: If the term is unknown or has no matching docs.
+    """
+    data = await gu_run_solr_text_on_async(
+        ESOLR.GOLR, ESOLRDoc.ANNOTATION, id, query_filters, fields + ",annotation_class", optionals, False
+    )
+    if not any(doc.get("annotation_class") == id for doc in data):
+        try:
+            await is_valid_goid_async(id)
+        except DataNotFoundException as e:
+            raise DataNotFoundException(detail=str(e)) from e
+    if not data:
+        raise DataNotFoundException(detail=f"Item with ID {id} not found")
+    requested = set(fields.split(","))
+    return [{key: value for key, value in doc.items() if key in requested} for doc in data]
+
+
 @router.get("/api/bioentity/{id}", tags=["bioentity"], description="Get bio-entities (genes) by their identifiers.")
 async def get_bioentity_by_id(
     id: str = Path(
@@ -82,11 +112,10 @@ async def get_bioentity_by_id(
           the number of results to be retrieved per page.
     """
     try:
-        is_valid_bioentity(id)
-    except DataNotFoundException as e:
-        raise DataNotFoundException(detail=str(e)) from e
+        check_bioentity_format(id)
     except ValueError as e:
         raise InvalidIdentifier(detail=str(e)) from e
+    requested_id = id
 
     if rows is None:
         rows = 100000
@@ -104,8 +133,15 @@ async def get_bioentity_by_id(
 
     optionals = "&defType=edismax&start=" + str(start) + "&rows=" + str(rows)
     # id here is passed to solr q parameter, query_filters go to the boost, fields are what's returned
-    bioentity = gu_run_solr_text_on(ESOLR.GOLR, ESOLRDoc.BIOENTITY, id, query_filters, fields, optionals, False)
+    bioentity = await gu_run_solr_text_on_async(
+        ESOLR.GOLR, ESOLRDoc.BIOENTITY, id, query_filters, fields, optionals, False
+    )
     if not bioentity:
+        # Only validate the identifier when the search came back empty, to report unknown ids as before.
+        try:
+            await is_valid_bioentity_async(requested_id)
+        except DataNotFoundException as e:
+            raise DataNotFoundException(detail=str(e)) from e
         raise DataNotFoundException(detail=f"Item with ID {id} not found")
     return bioentity
 
@@ -153,9 +189,7 @@ async def get_annotations_by_goterm_id(
           the number of results to be retrieved per page.
     """
     try:
-        is_valid_goid(id)
-    except DataNotFoundException as e:
-        raise DataNotFoundException(detail=str(e)) from e
+        check_goid_format(id)
     except ValueError as e:
         raise InvalidIdentifier(detail=str(e)) from e
 
@@ -187,10 +221,7 @@ async def get_annotations_by_goterm_id(
         evidence += ")"
 
     optionals = "&defType=edismax&start=" + str(start) + "&rows=" + str(rows) + evidence
-    data = gu_run_solr_text_on(ESOLR.GOLR, ESOLRDoc.ANNOTATION, id, query_filters, fields, optionals, False)
-    if not data:
-        raise DataNotFoundException(detail=f"Item with ID {id} not found")
-    return data
+    return await _search_goterm_annotations(id, query_filters, fields, optionals)
 
 
 @router.get(
@@ -244,7 +275,7 @@ async def get_genes_by_goterm_id(
 
     """
     try:
-        is_valid_goid(id)
+        await is_valid_goid_async(id)
     except DataNotFoundException as e:
         raise DataNotFoundException(detail=str(e)) from e
     except ValueError as e:
@@ -254,7 +285,8 @@ async def get_genes_by_goterm_id(
         rows = 100000
 
     if relationship_type == ACTS_UPSTREAM_OF_OR_WITHIN:
-        association_return = search_associations(
+        association_return = await run_in_threadpool(
+            search_associations,
             subject_category="gene",
             use_compact_associations=True,
             object_category="function",
@@ -272,7 +304,8 @@ async def get_genes_by_goterm_id(
     elif relationship_type == INVOLVED_IN_REGULATION_OF:
         # Temporary fix until https://github.com/geneontology/amigo/pull/469
         # and https://github.com/owlcollab/owltools/issues/241 are resolved
-        association_return = search_associations(
+        association_return = await run_in_threadpool(
+            search_associations,
             subject_category="gene",
             object_category="function",
             fq={
@@ -289,7 +322,8 @@ async def get_genes_by_goterm_id(
             rows=rows,
         )
     elif relationship_type == INVOLVED_IN:
-        association_return = search_associations(
+        association_return = await run_in_threadpool(
+            search_associations,
             subject_category="gene",
             object_category="function",
             subject=id,
@@ -341,9 +375,7 @@ async def get_taxon_by_goterm_id(
              The dictionary will contain fields such as 'taxon' and 'taxon_label' associated with the genes.
     """
     try:
-        is_valid_goid(id)
-    except DataNotFoundException as e:
-        raise DataNotFoundException(detail=str(e)) from e
+        check_goid_format(id)
     except ValueError as e:
         raise InvalidIdentifier(detail=str(e)) from e
 
@@ -378,10 +410,7 @@ async def get_taxon_by_goterm_id(
         taxon_restrictions += ")"
 
     optionals = "&defType=edismax&start=" + str(start) + "&rows=" + str(rows) + evidence + taxon_restrictions
-    data = gu_run_solr_text_on(ESOLR.GOLR, ESOLRDoc.ANNOTATION, id, query_filters, fields, optionals, False)
-    if not data:
-        raise DataNotFoundException(detail=f"Item with ID {id} not found")
-    return data
+    return await _search_goterm_annotations(id, query_filters, fields, optionals)
 
 
 @router.get(
@@ -433,7 +462,7 @@ async def get_annotations_by_gene_id(
 
     """
     try:
-        is_valid_bioentity(id)
+        await is_valid_bioentity_async(id)
     except DataNotFoundException as e:
         raise DataNotFoundException(detail=str(e)) from e
     except ValueError as e:
@@ -445,7 +474,8 @@ async def get_annotations_by_gene_id(
     if id.startswith("MGI:MGI:"):
         id = id.replace("MGI:MGI:", "MGI:")
 
-    assocs = search_associations(
+    assocs = await run_in_threadpool(
+        search_associations,
         object_category="function",
         subject_category="gene",
         subject=id,
@@ -462,9 +492,10 @@ async def get_annotations_by_gene_id(
         # sources: https://github.com/biolink/biolink-api/issues/66
         # https://github.com/monarch-initiative/dipper/issues/461
         # prots = scigraph.gene_to_uniprot_proteins(id)
-        prots = gene_to_uniprot_from_mygene(id)
+        prots = await run_in_threadpool(gene_to_uniprot_from_mygene, id)
         for prot in prots:
-            pr_assocs = search_associations(
+            pr_assocs = await run_in_threadpool(
+                search_associations,
                 object_category="function",
                 subject=prot,
                 user_agent=USER_AGENT,
@@ -1,15 +1,16 @@
 """Model API router."""
 
+import json
 import logging
-from pprint import pprint
 from typing import List
 
-import requests
 from fastapi import APIRouter, Path, Query
-from gocam.translation.minerva_wrapper import MinervaWrapper
 
 from app.exceptions.global_exceptions import DataNotFoundException, InvalidIdentifier
 from app.utils import ontology_utils
+from app.utils.gocam_conversion import get_converted_model_async
+from app.utils.gocam_store import gocam_store
+from app.utils.gocam_summary import get_model_summaries_async
 from app.utils.settings import get_user_agent
 
 USER_AGENT = get_user_agent()
@@ -36,40 +37,18 @@ async def get_gocam_model_by_id_in_gocam_py_format(
     :param id: A GO-CAM identifier (e.g. 581e072c00000820, 581e072c00000295, 5900dc7400000968)
     :return: model details in gocam-py format based on a GO-CAM model ID.
     """
-    mw = MinervaWrapper()
-    stripped_ids = []
-    if id.startswith("gomodel:"):
-        model_id = id.replace("gomodel:", "")
-        stripped_ids.append(model_id)
-    else:
-        stripped_ids.append(id)
-    for stripped_id in stripped_ids:
-        path_to_s3 = "https://go-public.s3.amazonaws.com/files/go-cam/%s.json" % stripped_id
-        print(path_to_s3)
-        try:
-            response = requests.get(path_to_s3, timeout=30, headers={"User-Agent": USER_AGENT})
-            # Check for 403/404 first before trying to parse JSON or raise_for_status
-            if response.status_code == 403 or response.status_code == 404:
-                raise DataNotFoundException("GO-CAM model not found.")
-
-            # Now try to raise_for_status for other error codes
-            response.raise_for_status()
-
-            # If we get here, we have a valid response
-            data = response.json()
-            gocam_reposnse = mw.minerva_object_to_model(data)  # convert minerva object to gocam model
-            pprint(gocam_reposnse)
-            return gocam_reposnse.model_dump()
-        except DataNotFoundException:
-            # Re-raise without modification to keep the 404 status
-            raise
-        except requests.exceptions.JSONDecodeError as json_err:
-            # Invalid JSON response
-            raise DataNotFoundException("GO-CAM model response was invalid") from json_err
-        except Exception as e:
-            # Log the error for debugging but return a 404 for not found models
-            logger.error(f"Error retrieving model {stripped_id}: {str(e)}")
-            raise DataNotFoundException("GO-CAM model not found") from e
+    try:
+        return await get_converted_model_async(id)
+    except DataNotFoundException:
+        # Re-raise without modification to keep the 404 status
+        raise
+    except json.JSONDecodeError as json_err:
+        # Invalid JSON response
+        raise DataNotFoundException("GO-CAM model response was invalid") from json_err
+    except Exception as e:
+        # Log the error for debugging but return a 404 for not found models
+        logger.error(f"Error retrieving model {id}: {str(e)}")
+        raise DataNotFoundException("GO-CAM model not found") from e
 
 
 @router.get("/api/models/go", tags=["models"], description="Returns go term details based on a GO-CAM model ID.")
@@ -81,50 +60,17 @@ async def get_goterms_by_model_id(
     )
 ):
     """Returns go term details based on a GO-CAM model ID."""
-    GO_ROOTS = {
-        "http://purl.obolibrary.org/obo/GO_0008150": "BP",
-        "http://purl.obolibrary.org/obo/GO_0003674": "MF",
-        "http://purl.obolibrary.org/obo/GO_0005575": "CC",
-    }
-
     collated_results = []
 
-    for model_id in gocams:
-        go_terms = {}
-
-        model_data = await get_model_details_by_model_id_json(model_id)
-        gocam_id = model_data.get("id", "")
-
-        for individual in model_data.get("individuals", []):
-            for type_item in individual.get("type", []):
-                go_id = type_item.get("id", "")
-
-                if go_id.startswith("GO:"):
-                    go_iri = f"http://purl.obolibrary.org/obo/{go_id.replace(':', '_')}"
-
-                    if go_iri not in GO_ROOTS and go_id not in go_terms:
-                        root_type = individual.get("root-type", [])
-                        go_class = "unknown"
-                        for root in root_type:
-                            root_id = root.get("id", "")
-                            if root_id.startswith("GO:"):
-                                root_iri = f"http://purl.obolibrary.org/obo/{root_id.replace(':', '_')}"
-                                if root_iri in GO_ROOTS:
-                                    go_class = GO_ROOTS[root_iri]
-                                    break
-
-                        go_terms[go_id] = {
-                            "goid": go_iri,
-                            "goname": type_item.get("label", ""),
-                            "goclass": go_class,
-                        }
-
-        if go_terms:
+    for summary in await get_model_summaries_async(gocams):
+        if summary["goterms"]:
             collated_results.append({
-                "gocam": gocam_id,
-                "goclasses": [term["goclass"] for term in go_terms.values()],
-                "goids": [term["goid"] for term in go_terms.values()],
-                "gonames": [term["goname"] for term in go_terms.values()],
+                "gocam": summary["id"],
+                "goclasses": [go_class for _, _, go_class in summary["goterms"]],
+                "goids": [
+                    f"http://purl.obolibrary.org/obo/{go_id.replace(':', '_')}" for go_id, _, _ in summary["goterms"]
+                ],
+                "gonames": [label for _, label, _ in summary["goterms"]],
             })
 
     if not collated_results:
@@ -147,42 +93,14 @@ async def get_geneproducts_by_model_id(
     :param gocams: A list of GO-CAM IDs separated by a comma, e.g. 59a6110e00000067,SYNGO_369
     :return: gene product details based on a GO-CAM model ID.
     """
-    EXCLUDED_PREFIXES = ("GO:", "ECO:", "CHEBI:", "gomodel:")
-
     collated_results = []
 
-    for model_id in gocams:
-        model_data = await get_model_details_by_model_id_json(model_id)
-        gocam_id = model_data.get("id", "")
-
-        individual_map = {}
-        for ind in model_data.get("individuals", []):
-            ind_id = ind.get("id", "")
-            for type_item in ind.get("type", []):
-                gp_id = type_item.get("id", "")
-                gp_label = type_item.get("label", "")
-                if gp_id and not any(gp_id.startswith(prefix) for prefix in EXCLUDED_PREFIXES):
-                    if ind_id not in individual_map:
-                        individual_map[ind_id] = []
-                    individual_map[ind_id].append({"id": gp_id, "label": gp_label})
-
-        gene_products = {}
-        for fact in model_data.get("facts", []):
-            if fact.get("property") == "RO:0002333":
-                obj_id = fact.get("object", "")
-                if obj_id in individual_map:
-                    for gp in individual_map[obj_id]:
-                        gp_id = gp["id"]
-                        if gp_id not in gene_products:
-                            gene_products[gp_id] = gp["label"]
-
-        if gene_products:
-            gpids = "@|@".join(gene_products.keys())
-            gpnames = "@|@".join(gene_products.values())
+    for summary in await get_model_summaries_async(gocams):
+        if summary["gene_products"]:
             collated_results.append({
-                "gocam": gocam_id,
-                "gpids": gpids,
-                "gpnames": gpnames,
+                "gocam": summary["id"],
+                "gpids": "@|@".join(gp_id for gp_id, _ in summary["gene_products"]),
+                "gpnames": "@|@".join(label for _, label in summary["gene_products"]),
             })
 
     if not collated_results:
@@ -200,44 +118,11 @@ async def get_pmid_by_model_id(
     )
 ):
     """Returns pubmed details based on a GO CAM id."""
-    import re
-
     collated_results = []
 
-    for model_id in gocams:
-        pmids = set()
-
-        model_data = await get_model_details_by_model_id_json(model_id)
-        gocam_id = model_data.get("id", "")
-
-        for ann in model_data.get("annotations", []):
-            value = ann.get("value", "")
-            if "PMID" in value:
-                matches = re.findall(r"PMID:\s*\d+", value)
-                for match in matches:
-                    pmids.add(match.replace(" ", ""))
-
-        for ind in model_data.get("individuals", []):
-            for ann in ind.get("annotations", []):
-                if ann.get("key", "") == "source":
-                    value = ann.get("value", "")
-                    if "PMID" in value:
-                        matches = re.findall(r"PMID:\s*\d+", value)
-                        for match in matches:
-                            pmids.add(match.replace(" ", ""))
-
-        for fact in model_data.get("facts", []):
-            for ann in fact.get("annotations", []):
-                if ann.get("key", "") == "source":
-                    value = ann.get("value", "")
-                    if "PMID" in value:
-                        matches = re.findall(r"PMID:\s*\d+", value)
-                        for match in matches:
-                            pmids.add(match.replace(" ", ""))
-
-        if pmids:
-            sources = "@|@".join(sorted(pmids))
-            collated_results.append({"gocam": gocam_id, "sources": sources})
+    for summary in await get_model_summaries_async(gocams):
+        if summary["pmids"]:
+            collated_results.append({"gocam": summary["id"], "sources": "@|@".join(summary["pmids"])})
 
     if not collated_results:
         raise DataNotFoundException("GO-CAM model not found.")
@@ -259,24 +144,10 @@ async def get_model_details_by_model_id_json(
     Returns model details based on a GO-CAM model ID in JSON format.
 
     :param id: A GO-CAM identifier (e.g. 581e072c00000820, 581e072c00000295, 5900dc7400000968)
-    :return: model details based on a GO-CAM model ID in JSON format from the S3 bucket.
+    :return: model details based on a GO-CAM model ID in JSON format, from the local model store
+             or the S3 bucket.
     """
-    stripped_ids = []
-    if id.startswith("gomodel:"):
-        model_id = id.replace("gomodel:", "")
-        stripped_ids.append(model_id)
-    else:
-        stripped_ids.append(id)
-    for stripped_id in stripped_ids:
-        path_to_s3 = "https://go-public.s3.amazonaws.com/files/go-cam/%s.json" % stripped_id
-        response = requests.get(path_to_s3, timeout=30, headers={"User-Agent": USER_AGENT})
-        if response.status_code == 403 or response.status_code == 404:
-            raise DataNotFoundException("GO-CAM model not found.")
-        else:
-            response = requests.get(path_to_s3, timeout=30, headers={"User-Agent": USER_AGENT})
-            response.raise_for_status()  # This will raise an HTTPError if the HTTP request returned
-            # an unsuccessful status code
-            return response.json()
+    return await gocam_store.get_async(id)
 
 
 @router.get("/api/models/{id}", tags=["models"], description="Returns model details based on a GO-CAM model ID.")
@@ -404,7 +275,7 @@ async def get_term_details_by_taxon_id(
         # Only validate with Golr if not found in index
         # This allows tests to work without external Golr dependency
         try:
-            ontology_utils.is_golr_recognized_curie(taxon)
+            await ontology_utils.is_golr_recognized_curie_async(taxon)
         except DataNotFoundException as e:
             raise DataNotFoundException(detail=str(e)) from e
         except ValueError as e:
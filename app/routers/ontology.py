@@ -1,17 +1,24 @@
 """Ontology-related endpoints."""
 
+import asyncio
+import itertools
 import json
 import logging
 from enum import Enum
-from typing import List
+from typing import List, Optional
 
 from curies import Converter
-from fastapi import APIRouter, Path, Query
+from fastapi import APIRouter, HTTPException, Path, Query
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 
 import app.utils.ontology_utils as ontology_utils
 from app.exceptions.global_exceptions import DataNotFoundException, InvalidIdentifier
-from app.utils.golr_utils import gu_run_solr_text_on, run_solr_on
+from app.utils.concurrency import gather_bounded
+from app.utils.go_graph import IS_A, PART_OF, get_go_graph
+from app.utils.gocam_store import gocam_store
+from app.utils.gocam_summary import get_model_summary_async
+from app.utils.golr_utils import gu_run_solr_text_on_async, run_solr_on_async
 from app.utils.prefix_utils import get_prefixes
 from app.utils.settings import ESOLR, ESOLRDoc, get_user_agent
 
@@ -21,6 +28,9 @@ logger = logging.getLogger()
 USER_AGENT = get_user_agent()
 router = APIRouter()
 
+# Upper bound on the number of term pairs compared by one batch request.
+MAX_SHARED_ANCESTOR_PAIRS = 100000
+
 
 class GraphType(str, Enum):
 
@@ -36,16 +46,14 @@ async def get_term_metadata_by_id(
     ),
 ):
     """Returns metadata of an ontology term, e.g. GO:0003677."""
+    fields = "id,annotation_class_label,description,synonym,alternate_id,definition_xref,subset"
     try:
-        ontology_utils.is_golr_recognized_curie(id)
+        doc = await ontology_utils.fetch_golr_recognized_term_async(id, fields)
     except DataNotFoundException as e:
         raise DataNotFoundException(detail=str(e)) from e
     except ValueError as e:
         raise InvalidIdentifier(detail=str(e)) from e
 
-    fields = "id,annotation_class_label,description,synonym,alternate_id,definition_xref,subset"
-    doc = run_solr_on(ESOLR.GOLR, ESOLRDoc.ONTOLOGY, id, fields)
-
     cmaps = get_prefixes("go")
     converter = Converter.from_prefix_map(cmaps, strict=False)
     goid_iri = converter.expand(id)
@@ -75,16 +83,14 @@ async def get_term_graph_by_id(
     graph_type: GraphType = Query(GraphType.topology_graph),
 ):
     """Returns graph of an ontology term, e.g. GO:0003677."""
+    graph_type = graph_type + "_json"  # GOLR field names
+
     try:
-        ontology_utils.is_valid_goid(id)
+        data = await ontology_utils.fetch_go_term_async(id, graph_type)
     except DataNotFoundException as e:
         raise DataNotFoundException(detail=str(e)) from e
     except ValueError as e:
         raise InvalidIdentifier(detail=str(e)) from e
-
-    graph_type = graph_type + "_json"  # GOLR field names
-
-    data = run_solr_on(ESOLR.GOLR, ESOLRDoc.ONTOLOGY, id, graph_type)
     # step required as these graphs are made into strings in the json
     data[graph_type] = json.loads(data[graph_type])
     return data
@@ -110,21 +116,27 @@ async def get_subgraph_by_term_id(
     :param rows: The number of results to return
     :return: A is_a/part_of subgraph of the ontology term including the term's ancestors and descendants, label and ID.
     """
+    if rows is None:
+        rows = 100000
+    graph = get_go_graph()
+    if graph is not None and id in graph:
+        descendents = [{"id": child} for child in graph.descendants(id, reflexive=False)[start:start + rows]]
+        ancestors = [{"id": parent} for parent in graph.ancestors(id)]
+        return {"descendents": descendents, "ancestors": ancestors}
+
+    fields = "id,annotation_class_label,isa_partof_closure,isa_partof_closure_label"
     try:
-        ontology_utils.is_valid_goid(id)
+        term = await ontology_utils.fetch_go_term_async(id, fields)
     except DataNotFoundException as e:
         raise DataNotFoundException(detail=str(e)) from e
     except ValueError as e:
         raise InvalidIdentifier(detail=str(e)) from e
 
-    if rows is None:
-        rows = 100000
     query_filters = ""
     golr_field_to_search = "isa_partof_closure"
     where_statement = "*:*&fq=" + golr_field_to_search + ":" + '"' + id + '"'
-    fields = "id,annotation_class_label,isa_partof_closure,isa_partof_closure_label"
     optionals = "&defType=edismax&start=" + str(start) + "&rows=" + str(rows)
-    descendent_data = gu_run_solr_text_on(
+    descendent_data = await gu_run_solr_text_on_async(
         ESOLR.GOLR, ESOLRDoc.ONTOLOGY, where_statement, query_filters, fields, optionals, False
     )
 
@@ -136,13 +148,8 @@ async def get_subgraph_by_term_id(
             child = {"id": child["id"]}
             descendents.append(child)
 
-    golr_field_to_search = "id"
-    where_statement = "*:*&fq=" + golr_field_to_search + ":" + '"' + id + '"'
-    ancestor_data = gu_run_solr_text_on(
-        ESOLR.GOLR, ESOLRDoc.ONTOLOGY, where_statement, query_filters, fields, optionals, False
-    )
     ancestors = []
-    for parent in ancestor_data[0]["isa_partof_closure"]:
+    for parent in term.get("isa_partof_closure", []):
         ancestors.append({"id": parent})
 
     data = {"descendents": descendents, "ancestors": ancestors}
@@ -164,35 +171,98 @@ async def get_ancestors_shared_by_two_terms(
     :param subject: 'CURIE identifier of a GO term, e.g. GO:0006259'
     :param object: 'CURIE identifier of a GO term, e.g. GO:0016070'
     """
+    graph = get_go_graph()
+    if graph is not None and subject in graph and object in graph:
+        shared = graph.shared_ancestors(subject, object)
+        return {"goids": shared, "gonames: ": [graph.label(term) for term in shared]}
+
+    fields = "isa_partof_closure,isa_partof_closure_label"
     try:
-        ontology_utils.is_valid_goid(subject)
-        ontology_utils.is_valid_goid(object)
+        ontology_utils.check_goid_format(subject)
+        ontology_utils.check_goid_format(object)
+        results = await asyncio.gather(
+            ontology_utils.fetch_go_term_async(subject, fields),
+            ontology_utils.fetch_go_term_async(object, fields),
+            return_exceptions=True,
+        )
+        # Report the subject's error first, as validating the terms one after the other did.
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
     except DataNotFoundException as e:
         raise DataNotFoundException(detail=str(e)) from e
     except ValueError as e:
         raise InvalidIdentifier(detail=str(e)) from e
-
-    fields = "isa_partof_closure,isa_partof_closure_label"
-
-    subres = run_solr_on(ESOLR.GOLR, ESOLRDoc.ONTOLOGY, subject, fields)
-    objres = run_solr_on(ESOLR.GOLR, ESOLRDoc.ONTOLOGY, object, fields)
+    subres, objres = results
 
     logger.info("SUBJECT: ", subres)
     logger.info("OBJECT: ", objres)
 
     shared = []
     shared_labels = []
+    object_closure = set(objres["isa_partof_closure"])
     for i in range(0, len(subres["isa_partof_closure"])):
         sub = subres["isa_partof_closure"][i]
-        found = False
-        if sub in objres["isa_partof_closure"]:
-            found = True
-        if found:
+        if sub in object_closure:
             shared.append(sub)
             shared_labels.append(subres["isa_partof_closure_label"][i])
     return {"goids": shared, "gonames: ": shared_labels}
 
 
+class SharedAncestorsBatchRequest(BaseModel):
+
+    """
+    A batch of GO term pairs to compare.
+
+    :param subjects: GO term IDs.
+    :param objects: GO term IDs compared with every subject; when omitted, every pair of subjects is compared.
+    """
+
+    subjects: List[str]
+    objects: Optional[List[str]] = None
+
+
+@router.post(
+    "/api/ontology/shared",
+    tags=["ontology"],
+    description="Compares many pairs of GO terms: shared ancestors, closest common ancestors and LCA depth.",
+)
+async def get_ancestors_shared_by_term_pairs(request: SharedAncestorsBatchRequest):
+    """
+    Returns the shared is_a/part_of ancestors of many pairs of GO terms, for similarity workloads.
+
+    Every subject is compared with every object, or with every other subject when no objects
+    are given. For each pair the response lists the shared ancestors, the closest common
+    ancestors (shared ancestors with no more specific shared ancestor below them) and the
+    depth of the deepest common ancestor. Requires the local GO graph (go_graph in config.yaml).
+
+    :param request: The subjects and, optionally, objects to compare.
+    :return: One result per pair.
+    """
+    graph = get_go_graph()
+    if graph is None:
+        raise HTTPException(status_code=501, detail="Batch comparisons need the local GO graph to be configured")
+
+    if request.objects is None:
+        pairs = list(itertools.combinations(request.subjects, 2))
+    else:
+        pairs = list(itertools.product(request.subjects, request.objects))
+    if len(pairs) > MAX_SHARED_ANCESTOR_PAIRS:
+        raise InvalidIdentifier(detail=f"At most {MAX_SHARED_ANCESTOR_PAIRS} pairs can be compared per request")
+
+    terms = set(request.subjects) | set(request.objects or [])
+    try:
+        for term in terms:
+            ontology_utils.check_goid_format(term)
+    except ValueError as e:
+        raise InvalidIdentifier(detail=str(e)) from e
+    unknown = sorted(term for term in terms if term not in graph)
+    if unknown:
+        raise DataNotFoundException(detail=f"Unknown GO terms: {', '.join(unknown)}")
+
+    return await run_in_threadpool(graph.compare_pairs, pairs)
+
+
 @router.get(
     "/api/association/between/{subject}/{object}",
     tags=["ontology"],
@@ -210,9 +280,23 @@ async def get_ancestors_shared_between_two_terms(
     :param object: 'CURIE identifier of a GO term, e.g. GO:0016070'
     :param relation: 'relation between two terms' can only be one of two values: shared or closest
     """
+    graph = get_go_graph()
+    if graph is not None and subject in graph and object in graph:
+        if relation == "shared" or relation is None:
+            shared = graph.shared_ancestors(subject, object)
+            return {"shared": shared, "shared_labels": [graph.label(term) for term in shared]}
+
+        def neighbours(term: str, relations: int) -> set:
+            return set(graph.parents(term, relations)) | set(graph.children(term, relations))
+
+        shared_is_a = sorted(neighbours(subject, IS_A) & neighbours(object, IS_A))
+        # as from GOlr below, sharedPartOf lists the part_of neighbours of the object
+        shared_part_of = sorted(neighbours(object, PART_OF))
+        return {"sharedIsA": shared_is_a, "sharedPartOf": shared_part_of}
+
     try:
-        ontology_utils.is_valid_goid(subject)
-        ontology_utils.is_valid_goid(object)
+        await ontology_utils.is_valid_goid_async(subject)
+        await ontology_utils.is_valid_goid_async(object)
     except DataNotFoundException as e:
         raise DataNotFoundException(detail=str(e)) from e
     except ValueError as e:
@@ -224,8 +308,10 @@ async def get_ancestors_shared_between_two_terms(
     logger.info(relation)
     if relation == "shared" or relation is None:
         try:
-            subres = run_solr_on(ESOLR.GOLR, ESOLRDoc.ONTOLOGY, subject, fields)
-            objres = run_solr_on(ESOLR.GOLR, ESOLRDoc.ONTOLOGY, object, fields)
+            subres, objres = await asyncio.gather(
+                run_solr_on_async(ESOLR.GOLR, ESOLRDoc.ONTOLOGY, subject, fields),
+                run_solr_on_async(ESOLR.GOLR, ESOLRDoc.ONTOLOGY, object, fields),
+            )
         except Exception as e:
             logger.error(f"Golr unavailable: {e}")
             raise DataNotFoundException(detail="Ontology service temporarily unavailable") from e
@@ -235,13 +321,11 @@ async def get_ancestors_shared_between_two_terms(
 
         shared = []
         shared_labels = []
+        object_closure = set(objres["isa_partof_closure"])
 
         for i in range(0, len(subres["isa_partof_closure"])):
             sub = subres["isa_partof_closure"][i]
-            found = False
-            if sub in objres["isa_partof_closure"]:
-                found = True
-            if found:
+            if sub in object_closure:
                 shared.append(sub)
                 shared_labels.append(subres["isa_partof_closure_label"][i])
 
@@ -252,8 +336,10 @@ async def get_ancestors_shared_between_two_terms(
         logger.info("got here")
         fields = "neighborhood_graph_json"
         try:
-            subres = run_solr_on(ESOLR.GOLR, ESOLRDoc.ONTOLOGY, subject, fields)
-            objres = run_solr_on(ESOLR.GOLR, ESOLRDoc.ONTOLOGY, object, fields)
+            subres, objres = await asyncio.gather(
+                run_solr_on_async(ESOLR.GOLR, ESOLRDoc.ONTOLOGY, subject, fields),
+                run_solr_on_async(ESOLR.GOLR, ESOLRDoc.ONTOLOGY, object, fields),
+            )
         except Exception as e:
             logger.error(f"Golr unavailable: {e}")
             raise DataNotFoundException(detail="Ontology service temporarily unavailable") from e
@@ -324,16 +410,14 @@ async def get_go_term_detail_by_go_id(
     Note: This endpoint was migrated from the GO-CAM service API and may not be
     supported in its current form in the future.
     """
+    fields = "id,annotation_class_label,description,synonym,alternate_id,definition_xref,subset"
     try:
-        ontology_utils.is_valid_goid(id)
+        doc = await ontology_utils.fetch_go_term_async(id, fields)
     except DataNotFoundException as e:
         raise DataNotFoundException(detail=str(e)) from e
     except ValueError as e:
         raise InvalidIdentifier(detail=str(e)) from e
 
-    fields = "id,annotation_class_label,description,synonym,alternate_id,definition_xref,subset"
-    doc = run_solr_on(ESOLR.GOLR, ESOLRDoc.ONTOLOGY, id, fields)
-
     cmaps = get_prefixes("go")
     converter = Converter.from_prefix_map(cmaps, strict=False)
     goid_iri = converter.expand(id)
@@ -388,8 +472,23 @@ async def get_go_hierarchy_go_id(
     please note, this endpoint was migrated from the GO-CAM service api and may not be
     supported in its current form in the future.
     """
+    graph = get_go_graph()
+    if graph is not None and id in graph:
+        converter = Converter.from_prefix_map(get_prefixes("go"), strict=False)
+        collated_results = [
+            {"GO": converter.expand(parent), "label": graph.label(parent), "hierarchy": "parent"}
+            for parent in graph.ancestors(id, reflexive=False)
+        ]
+        collated_results.append({"GO": converter.expand(id), "label": graph.label(id), "hierarchy": "query"})
+        collated_results.extend(
+            {"GO": converter.expand(child), "label": graph.label(child), "hierarchy": "child"}
+            for child in graph.descendants(id, reflexive=False)
+        )
+        return collated_results
+
+    fields = "id,annotation_class_label,isa_partof_closure,isa_partof_closure_label"
     try:
-        ontology_utils.is_valid_goid(id)
+        doc = await ontology_utils.fetch_go_term_async(id, fields)
     except DataNotFoundException as e:
         raise DataNotFoundException(detail=str(e)) from e
     except ValueError as e:
@@ -400,9 +499,6 @@ async def get_go_hierarchy_go_id(
 
     collated_results = []
 
-    fields = "id,annotation_class_label,isa_partof_closure,isa_partof_closure_label"
-    doc = run_solr_on(ESOLR.GOLR, ESOLRDoc.ONTOLOGY, id, fields)
-
     query_term_iri = converter.expand(id)
 
     for parent_id, parent_label in zip(
@@ -420,7 +516,7 @@ async def get_go_hierarchy_go_id(
     where_statement = "*:*&fq=isa_partof_closure:" + '"' + id + '"'
     fields_children = "id,annotation_class_label"
     optionals = "&rows=10000"
-    children_data = gu_run_solr_text_on(
+    children_data = await gu_run_solr_text_on_async(
         ESOLR.GOLR, ESOLRDoc.ONTOLOGY, where_statement, query_filters, fields_children, optionals, False
     )
 
@@ -452,17 +548,13 @@ async def get_gocam_models_by_go_id(
     :return: GO-CAM model identifiers for a given GO term ID.
     """
     try:
-        ontology_utils.is_valid_goid(id)
+        await ontology_utils.is_valid_goid_async(id)
     except DataNotFoundException as e:
         raise DataNotFoundException(detail=str(e)) from e
     except ValueError as e:
         raise InvalidIdentifier(detail=str(e)) from e
 
-    import asyncio
-
-    import httpx
-
-    from app.utils.settings import get_index_files, get_user_agent
+    from app.utils.settings import get_index_files
 
     entity_index = get_index_files("gocam_entity_index_file")
 
@@ -479,24 +571,14 @@ async def get_gocam_models_by_go_id(
     if not model_ids:
         return []
 
-    async def fetch_model_title(client, model_id):
-        path_to_s3 = f"https://go-public.s3.amazonaws.com/files/go-cam/{model_id}.json"
+    async def fetch_model_title(model_id):
+        title = ""
         try:
-            response = await client.get(path_to_s3, timeout=30.0)
-            if response.status_code == 200:
-                data = response.json()
-                title = ""
-                for ann in data.get("annotations", []):
-                    if ann.get("key") == "title":
-                        title = ann.get("value", "")
-                        break
-                return {"gocam": f"http://model.geneontology.org/{model_id}", "title": title}
+            title = (await get_model_summary_async(model_id))["title"]
         except Exception as e:
             logger.error(f"Failed to fetch model title for {model_id}: {e}")
-        return {"gocam": f"http://model.geneontology.org/{model_id}", "title": ""}
+        return {"gocam": f"http://model.geneontology.org/{model_id}", "title": title}
 
-    async with httpx.AsyncClient(headers={"User-Agent": get_user_agent()}) as client:
-        tasks = [fetch_model_title(client, model_id) for model_id in sorted(model_ids)]
-        collated_results = await asyncio.gather(*tasks)
+    collated_results = await gather_bounded(sorted(model_ids), fetch_model_title, gocam_store.max_concurrency)
 
     return collated_results
@@ -6,8 +6,8 @@ from curies import Converter
 from fastapi import APIRouter, Path, Query
 
 from app.exceptions.global_exceptions import DataNotFoundException, InvalidIdentifier
-from app.routers.models import get_model_details_by_model_id_json
-from app.utils.golr_utils import get_bioentity_isoforms, is_valid_bioentity
+from app.utils.gocam_summary import get_causal_properties, get_model_summaries_async, has_causal_chain
+from app.utils.golr_utils import get_bioentity_isoforms_async, is_valid_bioentity_async
 from app.utils.prefix_utils import get_prefixes
 from app.utils.settings import get_user_agent
 
@@ -51,6 +51,8 @@ async def get_gocams_by_geneproduct_id(
     logger.info("reformatted curie into IRI using identifiers.org from api/gp/%s/models endpoint", id_iri)
 
     model_ids = set()
+    # the ids the gene product may be typed with in the models
+    gene_product_ids = {id, id_iri}
     if id in entity_index:
         model_ids.update(entity_index[id])
     if id_iri in entity_index:
@@ -61,13 +63,14 @@ async def get_gocams_by_geneproduct_id(
     # and look each up in the entity index, so we return models for all isoforms.
     # See: https://github.com/geneontology/go-fastapi/issues/135
     try:
-        isoforms = get_bioentity_isoforms(id)
+        isoforms = await get_bioentity_isoforms_async(id)
     except Exception:
         isoforms = []
     for isoform in isoforms:
         if isoform in entity_index:
             model_ids.update(entity_index[isoform])
         iso_iri = converter.expand(isoform)
+        gene_product_ids.update([isoform, iso_iri])
         if iso_iri in entity_index:
             model_ids.update(entity_index[iso_iri])
 
@@ -75,7 +78,7 @@ async def get_gocams_by_geneproduct_id(
         # Only validate with Golr if not found in index
         # This allows tests to work without external Golr dependency
         try:
-            is_valid_bioentity(id)
+            await is_valid_bioentity_async(id)
         except DataNotFoundException as e:
             raise DataNotFoundException(detail=str(e)) from e
         except ValueError as e:
@@ -86,54 +89,17 @@ async def get_gocams_by_geneproduct_id(
         return []
 
     collated_results = []
-    for model_id in sorted(model_ids):
-        model_data = await get_model_details_by_model_id_json(model_id)
+    sorted_ids = sorted(model_ids)
+    if causalmf == 2:
+        # Models in the summary table are kept when a causal chain runs through a function of this
+        # gene product, without being loaded; the others fall back to the model-wide flag below.
+        sorted_ids = [
+            model_id for model_id in sorted_ids
+            if (properties := get_causal_properties(model_id)) is None or has_causal_chain(properties, gene_product_ids)
+        ]
+    for model_id, summary in zip(sorted_ids, await get_model_summaries_async(sorted_ids), strict=True):
         gocam_iri = f"http://model.geneontology.org/{model_id}"
-        title = ""
-        for ann in model_data.get("annotations", []):
-            if ann.get("key") == "title":
-                title = ann.get("value", "")
-                break
-
-        if causalmf == 2:
-            if has_causal_pathway(model_data, id_iri):
-                collated_results.append({"gocam": gocam_iri, "title": title})
-        else:
-            collated_results.append({"gocam": gocam_iri, "title": title})
+        if causalmf != 2 or summary["causal_pathway"]:
+            collated_results.append({"gocam": gocam_iri, "title": summary["title"]})
 
     return collated_results
-
-
-def has_causal_pathway(model_data, gene_product_iri):
-    """
-    Check if the model has a causal pathway (chain of 3+ functions or chemical intermediate).
-
-    :param model_data: The GO-CAM model JSON data
-    :param gene_product_iri: The IRI of the gene product
-    :return: True if model contains a causal pathway involving the gene product
-    """
-    CAUSAL_RELATIONS = {
-        "RO:0002418", "RO:0004046", "RO:0004047", "RO:0002411",
-        "RO:0002305", "RO:0002304", "RO:0002211", "RO:0002212",
-        "RO:0002213", "RO:0002578", "RO:0002629", "RO:0002630",
-        "RO:0002406", "RO:0002407", "RO:0002408", "RO:0002409",
-        "RO:0002414", "RO:0002412", "RO:0002413"
-    }
-
-    causal_count = 0
-    for fact in model_data.get("facts", []):
-        prop = fact.get("property", "")
-        if prop in CAUSAL_RELATIONS:
-            causal_count += 1
-
-    if causal_count >= 2:
-        return True
-
-    has_chemical_conn = False
-    for fact in model_data.get("facts", []):
-        prop = fact.get("property", "")
-        if prop == "RO:0002233" or prop == "RO:0002234":
-            has_chemical_conn = True
-            break
-
-    return has_chemical_conn
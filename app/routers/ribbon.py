@@ -1,16 +1,20 @@
 """Ribbon router."""
 
+import asyncio
 import logging
 from typing import List
 
 from fastapi import APIRouter, Path, Query
+from fastapi.concurrency import run_in_threadpool
 
 import app.utils.ontology_utils as ontology_utils
 from app.exceptions.global_exceptions import DataNotFoundException, InvalidIdentifier
-from app.utils.golr_utils import gu_run_solr_text_on
+from app.utils.concurrency import gather_bounded
+from app.utils.golr_utils import gu_run_solr_text_on_async, run_solr_on_async
+from app.utils.mygene_utils import gene_to_uniprot_from_mygene
+from app.utils.ribbon_utils import get_ribbon_config, get_ribbon_subjects_async
 from app.utils.settings import ESOLR, ESOLRDoc, get_user_agent
-
-from .slimmer import gene_to_uniprot_from_mygene
+from app.utils.subset_registry import subset_registry
 
 logger = logging.getLogger()
 
@@ -32,16 +36,14 @@ async def get_subsets_by_term(
 ):
     """Returns subsets (slims) associated to an ontology term."""
     try:
-        ontology_utils.is_valid_goid(id)
+        await ontology_utils.is_valid_goid_async(id)
     except DataNotFoundException as e:
         raise DataNotFoundException(detail=str(e)) from e
     except ValueError as e:
         raise InvalidIdentifier(detail=str(e)) from e
 
-    from app.utils.golr_utils import run_solr_on
-
     fields = "subset"
-    doc = run_solr_on(ESOLR.GOLR, ESOLRDoc.ONTOLOGY, id, fields)
+    doc = await run_solr_on_async(ESOLR.GOLR, ESOLRDoc.ONTOLOGY, id, fields)
 
     subsets = doc.get("subset", [])
     if not subsets:
@@ -63,7 +65,7 @@ async def get_subset_by_id(
     id: str = Path(..., description="Name of the subset to map GO terms (e.g. goslim_agr)", examples="goslim_agr")
 ):
     """Returns a subset (slim) by its id which is usually a name."""
-    result = ontology_utils.get_ontology_subsets_by_id(id=id)
+    result = (await subset_registry.get_async(id)).get_categories()
     if not result:
         raise DataNotFoundException(detail=f"Item with ID {id} not found")
     return result
@@ -107,49 +109,10 @@ async def get_ribbon_results(
 
     subject = mgied_subjects
 
-    # Step 1: create the categories
-    categories = ontology_utils.get_ontology_subsets_by_id(subset)
-    # Drop any aspect we couldn't resolve to a root term (no annotation_class) so
-    # a single ontology label drift can't 500 the whole ribbon. See #165.
-    categories = [category for category in categories if category.get("annotation_class")]
-    for category in categories:
-        category["groups"] = category["terms"]
-        del category["terms"]
-
-        category["id"] = category["annotation_class"]
-        del category["annotation_class"]
-
-        category["label"] = category["annotation_class_label"]
-        del category["annotation_class_label"]
-
-        for group in category["groups"]:
-            group["id"] = group["annotation_class"]
-            del group["annotation_class"]
-
-            group["label"] = group["annotation_class_label"]
-            del group["annotation_class_label"]
-
-            group["type"] = "Term"
-
-        category["groups"] = (
-            [
-                {
-                    "id": category["id"],
-                    "label": "all " + category["label"].lower().replace("_", " "),
-                    "description": "Show all " + category["label"].lower().replace("_", " ") + " annotations",
-                    "type": "All",
-                }
-            ]
-            + category["groups"]
-            + [
-                {
-                    "id": category["id"],
-                    "label": "other " + category["label"].lower().replace("_", " "),
-                    "description": "Represent all annotations not mapped to a specific term",
-                    "type": "Other",
-                }
-            ]
-        )
+    # Step 1: create the categories, compiled once per subset version by the registry
+    compiled_subset = await subset_registry.get_async(subset)
+    categories = compiled_subset.get_ribbon_categories()
+    compiled_categories = compiled_subset.compiled
 
     # Step 2: create the entities / subjects
     subject_ids = subject
@@ -159,9 +122,15 @@ async def get_ribbon_results(
     slimmer_subjects = []
     mapped_ids = {}
     reverse_mapped_ids = {}
+    # map the gene ids to UniProt concurrently, within the ribbon's concurrency limit
+    gene_ids = [s for s in dict.fromkeys(subject_ids) if "HGNC:" in s or "NCBIGene:" in s or "ENSEMBL:" in s]
+    gene_prots = await gather_bounded(
+        gene_ids, lambda s: run_in_threadpool(gene_to_uniprot_from_mygene, s), get_ribbon_config()["max_concurrency"]
+    )
+    gene_prots = dict(zip(gene_ids, gene_prots, strict=True))
     for s in subject_ids:
         if "HGNC:" in s or "NCBIGene:" in s or "ENSEMBL:" in s:
-            prots = gene_to_uniprot_from_mygene(s)
+            prots = list(gene_prots[s])
             logger.info(f"prots:  {prots}")
             if len(prots) > 0:
                 mapped_ids[s] = prots[0]
@@ -183,141 +152,23 @@ async def get_ribbon_results(
             subject_ids.remove(subject_id)
 
     # because of the MGI:MGI
-    mod_ids = []
+    mod_ids = list(subject_ids)
 
-    subjects = []
-    for subject_id in subject_ids:
-        entity = {
-            "id": subject_id,
-            "groups": {},
-            "nb_classes": 0,
-            "nb_annotations": 0,
-            "terms": set(),
-        }
-
-        mod_ids.append(subject_id)
-
-        q = "*:*"
-        qf = ""
-        fq = '&fq=bioentity:"' + subject_id + '"&rows=100000'
-        fields = "annotation_class,evidence_type,regulates_closure,aspect"
-        if ecodes:
-            fq += '&fq=evidence_type:("' + '" "'.join(ecodes) + '")'
-        elif exclude_IBA:
-            fq += "&fq=!evidence_type:IBA"
-        if exclude_PB:
-            fq += '&fq=!annotation_class:"GO:0005515"'
-        data = gu_run_solr_text_on(ESOLR.GOLR, ESOLRDoc.ANNOTATION, q, qf, fields, fq, False)
-
-        # compute number of terms and annotations
-        for annot in data:
-            aspect = ontology_utils.aspect_map[annot["aspect"]]
-            found = False
-
-            for cat in categories:
-                for gp in cat["groups"]:
-                    group = gp["id"]
-
-                    if gp["type"] == "Other":
-                        continue
-
-                    # only allow annotated terms belonging to the same category if cross_aspect
-                    if cross_aspect or cat["id"] == aspect:
-                        # is this annotation part of the current group, based on the regulates_closure ?
-                        if group in annot["regulates_closure"]:
-                            found = True
-                            break
-            if found:
-                entity["terms"].add(annot["annotation_class"])
-                entity["nb_annotations"] += 1
-
-        for cat in categories:
-            for gp in cat["groups"]:
-                group = gp["id"]
-
-                if gp["type"] == "Other":
-                    continue
-
-                for annot in data:
-                    aspect = ontology_utils.aspect_map[annot["aspect"]]
-
-                    # only allow annotated terms belonging to the same category if cross_aspect
-                    if cross_aspect or cat["id"] == aspect:
-                        # is this annotation part of the current group, based on the regulates_closure ?
-                        if group in annot["regulates_closure"]:
-                            # if the group has not been met yet, create it
-                            if group not in entity["groups"]:
-                                entity["groups"][group] = {}
-                                entity["groups"][group]["ALL"] = {
-                                    "terms": set(),
-                                    "nb_classes": 0,
-                                    "nb_annotations": 0,
-                                }
-
-                            # if the subgroup has not been met yet, create it
-                            if annot["evidence_type"] not in entity["groups"][group]:
-                                entity["groups"][group][annot["evidence_type"]] = {
-                                    "terms": set(),
-                                    "nb_classes": 0,
-                                    "nb_annotations": 0,
-                                }
-
-                            # for each annotation, add the term and increment the nb of annotations
-                            entity["groups"][group][annot["evidence_type"]]["terms"].add(annot["annotation_class"])
-                            entity["groups"][group][annot["evidence_type"]]["nb_annotations"] += 1
-                            entity["groups"][group]["ALL"]["terms"].add(annot["annotation_class"])
-                            entity["groups"][group]["ALL"]["nb_annotations"] += 1
-
-            terms = ontology_utils.get_category_terms(cat)
-            terms = [term["id"] for term in terms]
-
-            other = {"ALL": {"terms": set(), "nb_classes": 0, "nb_annotations": 0}}
-
-            for annot in data:
-                aspect = ontology_utils.aspect_map[annot["aspect"]]
-
-                # only allow annotated terms belonging to the same category if cross_aspect
-                if cross_aspect or cat["id"] == aspect:
-                    found = False
-                    for term in terms:
-                        if term in annot["regulates_closure"]:
-                            found = True
-                            break
-
-                    if not found:
-                        other["ALL"]["nb_annotations"] += 1
-                        other["ALL"]["terms"].add(annot["annotation_class"])
-                        if annot["evidence_type"] not in other:
-                            other[annot["evidence_type"]] = {
-                                "terms": set(),
-                                "nb_classes": 0,
-                                "nb_annotations": 0,
-                            }
-                        other[annot["evidence_type"]]["nb_annotations"] += 1
-                        other[annot["evidence_type"]]["terms"].add(annot["annotation_class"])
-
-            entity["groups"][cat["id"] + "-other"] = other
-
-        # compute the number of classes for each group that have subgroup (annotations)
-        for group in entity["groups"]:
-            for subgroup in entity["groups"][group]:
-                entity["groups"][group][subgroup]["nb_classes"] = len(entity["groups"][group][subgroup]["terms"])
-                if "-other" not in group:
-                    del entity["groups"][group][subgroup]["terms"]
-                else:
-                    entity["groups"][group][subgroup]["terms"] = list(entity["groups"][group][subgroup]["terms"])
-
-        entity["nb_classes"] = len(entity["terms"])
-        del entity["terms"]
-
-        subjects.append(entity)
-
-    # fill out the entity details
+    # count the subjects' annotations (or reuse their cached counts), along with fetching the entity details
     q = "*:*"
     qf = ""
     fq = '&fq=bioentity:("' + '" or "'.join(mod_ids) + '")&rows=100000'
     fields = "bioentity,bioentity_label,taxon,taxon_label"
-    data = gu_run_solr_text_on(ESOLR.GOLR, ESOLRDoc.BIOENTITY, q, qf, fields, fq, False)
+    entities, data = await asyncio.gather(
+        get_ribbon_subjects_async(
+            mod_ids, compiled_categories, compiled_subset.key, ecodes, exclude_IBA, exclude_PB, cross_aspect
+        ),
+        gu_run_solr_text_on_async(ESOLR.GOLR, ESOLRDoc.BIOENTITY, q, qf, fields, fq, False),
+    )
+
+    subjects = []
+    for subject_id in subject_ids:
+        subjects.append(dict(entities[subject_id]))
 
     # Create a new list to store updated entities
     updated_subjects = []
@@ -6,7 +6,7 @@ from enum import Enum
 from fastapi import APIRouter, Path, Query
 
 from app.exceptions.global_exceptions import DataNotFoundException
-from app.utils.golr_utils import gu_run_solr_text_on
+from app.utils.golr_utils import gu_run_solr_text_on_async
 from app.utils.settings import ESOLR, ESOLRDoc, get_user_agent
 
 logger = logging.getLogger()
@@ -74,7 +74,7 @@ async def autocomplete_term(
         category = ESOLRDoc.ANNOTATION
 
     optionals = "&defType=edismax&start=" + str(start) + "&rows=" + str(rows)
-    data = gu_run_solr_text_on(ESOLR.GOLR, category, term + "*", query_fields, fields, optionals, True)
+    data = await gu_run_solr_text_on_async(ESOLR.GOLR, category, term + "*", query_fields, fields, optionals, True)
     docs = []
 
     for item in data:
@@ -5,14 +5,13 @@ from enum import Enum
 from typing import List
 
 from fastapi import APIRouter, Query
+from fastapi.concurrency import run_in_threadpool
 
 from app.exceptions.global_exceptions import DataNotFoundException
-from app.utils.golr_wrappers import map2slim
-from app.utils.mygene_utils import gene_to_uniprot_from_mygene, uniprot_to_gene_from_mygene
-from app.utils.settings import ESOLR, get_user_agent
+from app.utils.mygene_utils import genes_to_uniprot_from_mygene, uniprots_to_genes_from_mygene
+from app.utils.settings import get_user_agent
+from app.utils.slimmer_utils import ACTS_UPSTREAM_OF_OR_WITHIN, INVOLVED_IN, map2slim_async
 
-INVOLVED_IN = "involved_in"
-ACTS_UPSTREAM_OF_OR_WITHIN = "acts_upstream_of_or_within"
 FUNCTION_CATEGORY = "function"
 ANATOMY_CATEGORY = "anatomy"
 USER_AGENT = get_user_agent()
@@ -54,59 +53,44 @@ async def slimmer_function(
     # Note that GO currently uses UniProt as primary ID
     # for some sources: https://github.com/biolink/biolink-api/issues/66
 
+    gene_subjects = [s for s in subject if "HGNC:" in s or "NCBIGene:" in s or "ENSEMBL:" in s]
+    uniprot_by_gene = {}
+    if gene_subjects:
+        # One batched MyGene lookup covers every gene subject; the answers build both lists below.
+        uniprot_by_gene = await run_in_threadpool(genes_to_uniprot_from_mygene, gene_subjects)
+        for s in gene_subjects:
+            if s not in uniprot_by_gene:
+                raise DataNotFoundException(detail="No UniProtKB IDs found for {}".format(s))
+
     slimmer_subjects = []
+    # Create mapping from converted subjects back to original subjects
+    subject_mapping = {}
     for s in subject:
-        if "HGNC:" in s or "NCBIGene:" in s or "ENSEMBL:" in s:
-            prots = gene_to_uniprot_from_mygene(s)
-            if len(prots) == 0:
-                prots = [s]
-            slimmer_subjects += prots
+        if s in uniprot_by_gene:
+            # These were converted to UniProt IDs
+            for prot in uniprot_by_gene[s]:
+                slimmer_subjects.append(prot)
+                subject_mapping[prot] = s
         elif "MGI:" in s:
             # GOLr expects MGI identifiers in MGI:MGI: format
-            if not s.startswith("MGI:MGI:"):
-                slimmer_subjects.append(s.replace("MGI:", "MGI:MGI:"))
-            else:
-                slimmer_subjects.append(s)
+            converted = s if s.startswith("MGI:MGI:") else s.replace("MGI:", "MGI:MGI:")
+            slimmer_subjects.append(converted)
+            subject_mapping[converted] = s
         elif "WormBase:" in s:
-            slimmer_subjects.append(s.replace("WormBase:", "WB:"))
+            converted = s.replace("WormBase:", "WB:")
+            slimmer_subjects.append(converted)
+            subject_mapping[converted] = s
         else:
             slimmer_subjects.append(s)
-
-    # Create mapping from converted subjects back to original subjects
-    subject_mapping = {}
-    for _i, original_subject in enumerate(subject):
-        if "HGNC:" in original_subject or "NCBIGene:" in original_subject or "ENSEMBL:" in original_subject:
-            # These were converted to UniProt IDs
-            prots = gene_to_uniprot_from_mygene(original_subject)
-            if len(prots) == 0:
-                subject_mapping[original_subject] = original_subject
-            else:
-                for prot in prots:
-                    subject_mapping[prot] = original_subject
-        elif "MGI:" in original_subject:
-            # We converted MGI: to MGI:MGI: for GOLr
-            if not original_subject.startswith("MGI:MGI:"):
-                converted = original_subject.replace("MGI:", "MGI:MGI:")
-                subject_mapping[converted] = original_subject
-            else:
-                subject_mapping[original_subject] = original_subject
-        elif "WormBase:" in original_subject:
-            converted = original_subject.replace("WormBase:", "WB:")
-            subject_mapping[converted] = original_subject
-        else:
-            subject_mapping[original_subject] = original_subject
+            subject_mapping[s] = s
 
     # Log the converted subjects
     logger.info(f"Original subjects: {subject}")
     logger.info(f"Converted subjects for GOLr: {slimmer_subjects}")
 
-    # Use ontobio map2slim with rate limiting and retry logic from golr_wrappers
-    results = map2slim(
+    results = await map2slim_async(
         subjects=slimmer_subjects,
         slim=slim,
-        object_category="function",
-        user_agent=USER_AGENT,
-        url=ESOLR.GOLR.value,
         relationship_type=relationship_type.value,
         exclude_automatic_assertions=exclude_automatic_assertions,
         rows=rows,
@@ -123,33 +107,25 @@ async def slimmer_function(
             if association["subject"]["id"] in subject_mapping:
                 association["subject"]["id"] = subject_mapping[association["subject"]["id"]]
 
-    # To the fullest extent possible return HGNC ids
-    checked = {}
-    for result in results:
-        for association in result["assocs"]:
-            taxon = association["subject"]["taxon"]["id"]
-            protein_id = association["subject"]["id"]
-            if taxon == "NCBITaxon:9606" and protein_id.startswith("UniProtKB:"):
-                if protein_id not in checked:
-                    try:
-                        genes = uniprot_to_gene_from_mygene(protein_id)
-                        found_hgnc = False
-                        for gene in genes:
-                            if gene.startswith("HGNC"):
-                                association["subject"]["id"] = gene
-                                checked[protein_id] = gene
-                                found_hgnc = True
-                                break
-                        # If no HGNC ID was found in the results, keep the original UniProt ID
-                        if not found_hgnc:
-                            logger.info(f"No HGNC ID found in results for {protein_id}, keeping original")
-                            checked[protein_id] = protein_id
-                    except DataNotFoundException:
-                        # If we can't map the UniProt back to HGNC, keep the UniProt ID
-                        logger.warning("Could not map UniProt %s back to HGNC, keeping original ID", protein_id)
-                        checked[protein_id] = protein_id
-                else:
-                    association["subject"]["id"] = checked[protein_id]
+    # To the fullest extent possible return HGNC ids, resolving every human protein in one batch
+    human_proteins = [
+        association["subject"]["id"]
+        for result in results
+        for association in result["assocs"]
+        if association["subject"]["taxon"]["id"] == "NCBITaxon:9606"
+        and association["subject"]["id"].startswith("UniProtKB:")
+    ]
+    if human_proteins:
+        genes_by_protein = await run_in_threadpool(uniprots_to_genes_from_mygene, human_proteins)
+        for protein_id in dict.fromkeys(human_proteins):
+            if protein_id not in genes_by_protein:
+                logger.warning("Could not map UniProt %s back to HGNC, keeping original ID", protein_id)
+        for result in results:
+            for association in result["assocs"]:
+                genes = genes_by_protein.get(association["subject"]["id"], [])
+                hgnc_ids = [gene for gene in genes if gene.startswith("HGNC")]
+                if hgnc_ids:
+                    association["subject"]["id"] = hgnc_ids[0]
     if not results:
         logger.warning(f"No slim results found for subjects: {slimmer_subjects}")
         raise DataNotFoundException(detail="No results found")
@@ -0,0 +1,504 @@
+"""Pluggable cache backends for upstream results (GOlr, MyGene, GO-CAM, ...)."""
+
+import inspect
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from typing import Any, Callable, Iterable, Optional
+
+from fastapi.concurrency import run_in_threadpool
+
+from app.exceptions.global_exceptions import DataNotFoundException
+
+logger = logging.getLogger()
+
+# Per-namespace defaults, overridden by ``cache_backend.namespaces`` in config.yaml.
+DEFAULT_NAMESPACE_CONFIG = {
+    "golr": {"max_bytes": 64 * 1024 * 1024, "ttl_seconds": 900},
+    "mygene": {"max_bytes": 8 * 1024 * 1024, "ttl_seconds": 86400},
+    "gocam": {"max_bytes": 128 * 1024 * 1024, "ttl_seconds": 3600},
+    "gocam_py": {"max_bytes": 128 * 1024 * 1024, "ttl_seconds": 30 * 86400},
+    "not_found": {"max_bytes": 4 * 1024 * 1024, "ttl_seconds": 600},
+    "ribbon": {"max_bytes": 32 * 1024 * 1024, "ttl_seconds": 3600},
+}
+
+# Writes between two checks of the on-disk size of a namespace.
+SQLITE_EVICTION_INTERVAL = 64
+
+# Seconds before a hit records its access time again; hits within this window of the
+# previous one stay read-only, so LRU order is only as precise as this.
+SQLITE_ACCESS_INTERVAL = 60
+
+_backends: dict = {}
+_backends_lock = threading.Lock()
+
+
+def json_size(value: Any) -> int:
+    """Return the size in bytes of the JSON encoding of a value, e.g. to cache a small value."""
+    return len(json.dumps(value))
+
+
+class CacheBackend:
+
+    """
+    Interface of a cache store bounded by the total size of its entries.
+
+    Values must be JSON serializable. Every entry carries its own TTL and the
+    backend evicts least recently used entries once ``max_bytes`` is exceeded.
+    Values are not copied in or out of the memory backend: callers must not mutate a
+    value after caching it or one they got from the cache.
+
+    :param max_bytes: The maximum total size of the cached values.
+    :param ttl_seconds: The TTL used when :meth:`set` is not given one.
+    """
+
+    def __init__(self, max_bytes: int, ttl_seconds: float):
+        """Initialize the counters shared by every backend."""
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Return the value cached for ``key``, or None on a miss or expired entry.
+
+        :param key: The cache key.
+        :return: The cached value, or None; it may be shared with other callers and is read-only.
+        """
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None, size: Optional[int] = None):
+        """
+        Cache a value, evicting least recently used entries to stay within ``max_bytes``.
+
+        :param key: The cache key.
+        :param value: A JSON serializable value, which the caller must not mutate afterwards.
+        :param ttl: The TTL in seconds, defaulting to the backend's ``ttl_seconds``.
+        :param size: The footprint of the value in bytes. The memory backend requires it, as it
+                     does not serialize values to measure them (see :func:`json_size` for small ones).
+        """
+        raise NotImplementedError
+
+    def set_many(self, items: Iterable[tuple[str, Any]], ttl: Optional[float] = None):
+        """
+        Cache many values at once, e.g. to seed the cache from a bulk file.
+
+        Each value is sized by its JSON encoding, so this is meant for loads off the request path.
+
+        :param items: ``(key, value)`` pairs.
+        :param ttl: The TTL in seconds of every entry, defaulting to the backend's ``ttl_seconds``.
+        """
+        for key, value in items:
+            self.set(key, value, ttl, size=json_size(value))
+
+    def get_many(self, keys: Iterable[str]) -> dict:
+        """
+        Return the values cached for many keys at once.
+
+        :param keys: The cache keys.
+        :return: The cached value of each key found, by key.
+        """
+        found = {}
+        for key in keys:
+            value = self.get(key)
+            if value is not None:
+                found[key] = value
+        return found
+
+    def clear(self):
+        """Drop every entry and reset the counters."""
+        raise NotImplementedError
+
+    def stats(self) -> dict:
+        """Return the hit/miss counters and current size of the cache."""
+        raise NotImplementedError
+
+
+class MemoryCacheBackend(CacheBackend):
+
+    """
+    A thread-safe TTL + LRU cache private to the current worker process.
+
+    Values are held and returned as they are, without copying, so hits cost no more than a dict lookup.
+    """
+
+    def __init__(self, max_bytes: int, ttl_seconds: float = 900):
+        """Initialize an empty cache."""
+        super().__init__(max_bytes, ttl_seconds)
+        self.current_bytes = 0
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the (read-only) value cached for ``key``, or None on a miss or expired entry."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= time.monotonic():
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None, size: Optional[int] = None):
+        """Cache a value of a given size, evicting least recently used entries to stay within ``max_bytes``."""
+        if size is None:
+            raise ValueError("The memory cache backend needs the size of the values it caches")
+        ttl = self.ttl_seconds if ttl is None else ttl
+        if ttl <= 0 or size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + ttl, value, size)
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _remove(self, key: str):
+        """Drop an entry; the caller holds the lock."""
+        _, _, size = self._entries.pop(key)
+        self.current_bytes -= size
+
+    def clear(self):
+        """Drop every entry and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> dict:
+        """Return the hit/miss counters and current size of the cache."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+class SQLiteCacheBackend(CacheBackend):
+
+    """
+    A TTL + LRU cache stored in a SQLite database in WAL mode, shared by every worker process.
+
+    All gunicorn workers on a host point at the same file, so a result fetched by one
+    worker is reused by the others and held on disk (and in the page cache) only once.
+    Several namespaces share one file, each bounded by its own ``max_bytes``. Values are
+    stored as JSON. Database errors are logged and treated as misses, so a broken cache
+    never fails a request. The hit/miss counters are those of the current process.
+
+    Every call may wait on the database lock of another worker, so coroutines call the
+    backend from the thread pool. Reads only write back their access time once it is
+    :data:`SQLITE_ACCESS_INTERVAL` old, and expired entries are left to eviction.
+
+    :param path: The path of the SQLite database file.
+    :param namespace: The namespace isolating these entries from other users of the file.
+    :param max_bytes: The maximum total size of the namespace's JSON values.
+    :param ttl_seconds: The TTL used when :meth:`set` is not given one.
+    """
+
+    def __init__(self, path: str, namespace: str, max_bytes: int, ttl_seconds: float = 900):
+        """Initialize the backend; the database is opened lazily by each thread."""
+        super().__init__(max_bytes, ttl_seconds)
+        self.path = path
+        self.namespace = namespace
+        self._local = threading.local()
+        self._writes = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        """Return this thread's connection, creating the database and table on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache_entries ("
+                " namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL,"
+                " expires_at REAL NOT NULL, accessed_at REAL NOT NULL, size INTEGER NOT NULL,"
+                " PRIMARY KEY (namespace, key))"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS cache_entries_lru ON cache_entries (namespace, accessed_at)")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the value cached for ``key``, or None on a miss, expired entry or database error."""
+        now = time.time()
+        try:
+            conn = self._connection()
+            row = conn.execute(
+                "SELECT value, expires_at, accessed_at FROM cache_entries WHERE namespace = ? AND key = ?",
+                (self.namespace, key),
+            ).fetchone()
+            if row is not None and row[1] <= now:
+                row = None
+            if row is not None and now - row[2] >= SQLITE_ACCESS_INTERVAL:
+                conn.execute(
+                    "UPDATE cache_entries SET accessed_at = ? WHERE namespace = ? AND key = ?",
+                    (now, self.namespace, key),
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"Shared cache read failed for {self.namespace}: {e}")
+            row = None
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(row[0])
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None, size: Optional[int] = None):
+        """Cache a value, evicting least recently used entries of the namespace to stay within ``max_bytes``."""
+        ttl = self.ttl_seconds if ttl is None else ttl
+        text = json.dumps(value)
+        size = len(text)
+        if ttl <= 0 or size > self.max_bytes:
+            return
+        now = time.time()
+        try:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO cache_entries (namespace, key, value, expires_at, accessed_at, size)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (self.namespace, key, text, now + ttl, now, size),
+            )
+            self._writes += 1
+            if self._writes % SQLITE_EVICTION_INTERVAL == 0:
+                self._evict(conn, now)
+        except sqlite3.Error as e:
+            logger.warning(f"Shared cache write failed for {self.namespace}: {e}")
+
+    def set_many(self, items: Iterable[tuple[str, Any]], ttl: Optional[float] = None):
+        """Cache many values in a single transaction, then evict down to ``max_bytes``."""
+        ttl = self.ttl_seconds if ttl is None else ttl
+        if ttl <= 0:
+            return
+        now = time.time()
+        rows = []
+        for key, value in items:
+            text = json.dumps(value)
+            if len(text) <= self.max_bytes:
+                rows.append((self.namespace, key, text, now + ttl, now, len(text)))
+        try:
+            conn = self._connection()
+            with conn:
+                conn.execute("BEGIN")
+                conn.executemany(
+                    "INSERT OR REPLACE INTO cache_entries (namespace, key, value, expires_at, accessed_at, size)"
+                    " VALUES (?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+            self._evict(conn, now)
+        except sqlite3.Error as e:
+            logger.warning(f"Shared cache write failed for {self.namespace}: {e}")
+
+    def _evict(self, conn: sqlite3.Connection, now: float):
+        """Drop expired entries, then least recently used ones until the namespace fits in ``max_bytes``."""
+        conn.execute("DELETE FROM cache_entries WHERE namespace = ? AND expires_at <= ?", (self.namespace, now))
+        total = conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM cache_entries WHERE namespace = ?", (self.namespace,)
+        ).fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        excess = total - self.max_bytes
+        victims = []
+        for key, size in conn.execute(
+            "SELECT key, size FROM cache_entries WHERE namespace = ? ORDER BY accessed_at", (self.namespace,)
+        ):
+            victims.append((self.namespace, key))
+            excess -= size
+            if excess <= 0:
+                break
+        conn.executemany("DELETE FROM cache_entries WHERE namespace = ? AND key = ?", victims)
+        self.evictions += len(victims)
+
+    def clear(self):
+        """Drop every entry of the namespace and reset the counters."""
+        try:
+            self._connection().execute("DELETE FROM cache_entries WHERE namespace = ?", (self.namespace,))
+        except sqlite3.Error as e:
+            logger.warning(f"Shared cache clear failed for {self.namespace}: {e}")
+        self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> dict:
+        """Return this process's hit/miss counters and the shared size of the namespace."""
+        try:
+            entries, size = self._connection().execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache_entries WHERE namespace = ?", (self.namespace,)
+            ).fetchone()
+        except sqlite3.Error:
+            entries, size = None, None
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": entries,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+        }
+
+
+def get_cache_config() -> dict:
+    """
+    Return the ``cache_backend`` section of config.yaml.
+
+    :return: A dict with the backend ``type`` ("memory" or "sqlite"), the sqlite ``path``
+             and per-namespace ``namespaces`` settings.
+    """
+    from app.utils.settings import get_golr_config
+
+    return get_golr_config().get("cache_backend") or {}
+
+
+def get_namespace_config(namespace: str) -> dict:
+    """
+    Return the settings of a namespace: its defaults overridden by ``cache_backend.namespaces``.
+
+    :param namespace: The namespace of the cached results (e.g. "golr", "mygene", "gocam").
+    :return: A dict with at least ``max_bytes`` and ``ttl_seconds``.
+    """
+    return {
+        **DEFAULT_NAMESPACE_CONFIG.get(namespace, DEFAULT_NAMESPACE_CONFIG["golr"]),
+        **((get_cache_config().get("namespaces") or {}).get(namespace) or {}),
+    }
+
+
+def create_cache_backend(namespace: str, max_bytes: Optional[int] = None,
+                         ttl_seconds: Optional[float] = None) -> CacheBackend:
+    """
+    Create the configured cache backend for a namespace.
+
+    A namespace may set its own ``type`` and ``path`` under ``cache_backend.namespaces``,
+    e.g. to keep identifier mappings on disk while everything else stays in memory.
+
+    :param namespace: The namespace of the cached results (e.g. "golr", "mygene", "gocam").
+    :param max_bytes: Overrides the configured size bound of the namespace.
+    :param ttl_seconds: Overrides the configured default TTL of the namespace.
+    :return: A new backend.
+    :raises ValueError: If the configured backend type is unknown or sqlite has no path.
+    """
+    config = get_cache_config()
+    namespace_config = get_namespace_config(namespace)
+    if max_bytes is None:
+        max_bytes = namespace_config["max_bytes"]
+    if ttl_seconds is None:
+        ttl_seconds = namespace_config["ttl_seconds"]
+
+    backend_type = namespace_config.get("type") or config.get("type", "memory")
+    if backend_type == "memory":
+        return MemoryCacheBackend(max_bytes, ttl_seconds)
+    if backend_type == "sqlite":
+        path = namespace_config.get("path") or config.get("path")
+        if not path:
+            raise ValueError("cache_backend.path must be set in config.yaml to use the sqlite cache backend")
+        return SQLiteCacheBackend(path, namespace, max_bytes, ttl_seconds)
+    raise ValueError(f"Unknown cache backend type in config.yaml: {backend_type}")
+
+
+def get_cache_backend(namespace: str) -> CacheBackend:
+    """
+    Return the process-wide cache backend of a namespace, creating it on first use.
+
+    :param namespace: The namespace of the cached results (e.g. "mygene", "gocam").
+    :return: The backend.
+    """
+    backend = _backends.get(namespace)
+    if backend is None:
+        with _backends_lock:
+            backend = _backends.get(namespace)
+            if backend is None:
+                backend = create_cache_backend(namespace)
+                _backends[namespace] = backend
+    return backend
+
+
+def cached_by_argument(namespace: str, prefix: str) -> Callable:
+    """
+    Decorator caching the result of a single-argument function in a namespace's backend.
+
+    Only successful results are cached; exceptions propagate and are not remembered.
+
+    :param namespace: The cache namespace.
+    :param prefix: A prefix distinguishing this function's keys within the namespace.
+    :return: Decorated function
+    """
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(arg: str) -> Any:
+            backend = get_cache_backend(namespace)
+            key = f"{prefix}:{arg}"
+            cached = backend.get(key)
+            if cached is not None:
+                return cached
+            result = func(arg)
+            backend.set(key, result, size=json_size(result))
+            return result
+
+        return wrapper
+    return decorator
+
+
+def cache_not_found(prefix: str, namespace: str = "not_found") -> Callable:
+    """
+    Decorator remembering the DataNotFoundException raised by a lookup, keyed by its first argument.
+
+    While the negative entry lives, calls for the same identifier raise the remembered
+    DataNotFoundException without running the lookup, so repeated requests for unknown
+    identifiers cost nothing upstream. Other outcomes are not cached. The ``not_found``
+    namespace has its own TTL and size bound (see ``cache_backend`` in config.yaml).
+    Works for both plain and coroutine functions; the latter use the backend from the thread pool.
+
+    :param prefix: A prefix distinguishing this lookup's keys within the namespace.
+    :param namespace: The cache namespace of the negative entries.
+    :return: Decorated function
+    """
+    def decorator(func: Callable) -> Callable:
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(arg: str, *args: Any, **kwargs: Any) -> Any:
+                backend = get_cache_backend(namespace)
+                key = f"{prefix}:{arg}"
+                detail = await run_in_threadpool(backend.get, key)
+                if detail is not None:
+                    raise DataNotFoundException(detail=detail)
+                try:
+                    return await func(arg, *args, **kwargs)
+                except DataNotFoundException as e:
+                    await run_in_threadpool(backend.set, key, e.detail, size=json_size(e.detail))
+                    raise
+
+            return async_wrapper
+
+        @wraps(func)
+        def wrapper(arg: str, *args: Any, **kwargs: Any) -> Any:
+            backend = get_cache_backend(namespace)
+            key = f"{prefix}:{arg}"
+            detail = backend.get(key)
+            if detail is not None:
+                raise DataNotFoundException(detail=detail)
+            try:
+                return func(arg, *args, **kwargs)
+            except DataNotFoundException as e:
+                backend.set(key, e.detail, size=json_size(e.detail))
+                raise
+
+        return wrapper
+    return decorator
@@ -0,0 +1,30 @@
+"""Helpers running many upstream calls concurrently, within a bound."""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Iterable
+
+
+async def gather_bounded(items: Iterable, func: Callable[[Any], Awaitable[Any]], limit: int) -> list:
+    """
+    Run ``func`` on every item concurrently, with at most ``limit`` calls in flight.
+
+    Results are returned in the order of the items. As with :func:`asyncio.gather`, the
+    first exception raised by a call propagates; the calls still pending are cancelled.
+
+    :param items: The items to process.
+    :param func: A coroutine function called with each item.
+    :param limit: The maximum number of concurrent calls; values below 1 are treated as 1.
+    :return: The result of each call.
+    """
+    semaphore = asyncio.Semaphore(max(1, int(limit)))
+
+    async def run(item):
+        async with semaphore:
+            return await func(item)
+
+    tasks = [asyncio.ensure_future(run(item)) for item in items]
+    try:
+        return await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
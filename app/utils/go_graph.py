@@ -0,0 +1,448 @@
+"""Compact in-memory GO graph loaded from a local GO release, for answering closure queries without GOlr."""
+
+import heapq
+import json
+import logging
+import re
+from array import array
+from typing import Iterable, Optional
+
+logger = logging.getLogger()
+
+# Relations are bit flags so that a traversal can follow any combination of them.
+IS_A = 1
+PART_OF = 2
+REGULATES = 4
+NEGATIVELY_REGULATES = 8
+POSITIVELY_REGULATES = 16
+
+# The relations GOlr follows for isa_partof_closure and regulates_closure.
+ISA_PARTOF = IS_A | PART_OF
+REGULATES_CLOSURE = IS_A | PART_OF | REGULATES | NEGATIVELY_REGULATES | POSITIVELY_REGULATES
+
+PREDICATES = {
+    "is_a": IS_A,
+    "http://www.w3.org/2000/01/rdf-schema#subClassOf": IS_A,
+    "part_of": PART_OF,
+    "BFO:0000050": PART_OF,
+    "http://purl.obolibrary.org/obo/BFO_0000050": PART_OF,
+    "regulates": REGULATES,
+    "RO:0002211": REGULATES,
+    "http://purl.obolibrary.org/obo/RO_0002211": REGULATES,
+    "negatively_regulates": NEGATIVELY_REGULATES,
+    "RO:0002212": NEGATIVELY_REGULATES,
+    "http://purl.obolibrary.org/obo/RO_0002212": NEGATIVELY_REGULATES,
+    "positively_regulates": POSITIVELY_REGULATES,
+    "RO:0002213": POSITIVELY_REGULATES,
+    "http://purl.obolibrary.org/obo/RO_0002213": POSITIVELY_REGULATES,
+}
+
+_OBO_PURL = re.compile(r"^http://purl\.obolibrary\.org/obo/([A-Za-z]+)_(.+)$")
+
+_graph = None
+
+
+def _to_curie(id: str) -> str:
+    """Return the CURIE of an OBO PURL (e.g. GO:0008150 for .../obo/GO_0008150); CURIEs are returned as is."""
+    match = _OBO_PURL.match(id)
+    return f"{match.group(1)}:{match.group(2)}" if match else id
+
+
+class GOGraph:
+
+    """
+    An integer-indexed GO graph with CSR adjacency lists.
+
+    Every term gets an index in ``ids``. Edges from a term to its parents are stored in
+    compressed sparse row form: the parents of term ``i`` are
+    ``parent_targets[parent_offsets[i]:parent_offsets[i + 1]]``, with the relation of each
+    edge in ``parent_relations``. The same layout indexed the other way round gives the
+    children. Relations are bit flags (:data:`IS_A`, :data:`PART_OF`, ...) so traversals
+    can follow any combination of them.
+
+    Terms are indexed in topological order over is_a/part_of (every term after its
+    ancestors), which lets the reflexive is_a/part_of closure of every term be precomputed
+    in one pass and stored as a sorted int array (``closure_offsets``/``closure_targets``,
+    again in CSR form), along with the ``depth`` of each term (the longest path to a root).
+    Shared ancestor queries turn two closures into int bitsets and AND them; as ancestors
+    have smaller indices than their descendants, a term's bitset is at most as wide as
+    its own index.
+
+    :param ids: The CURIEs of the terms.
+    :param labels: The labels of the terms, in the same order.
+    :param edges: (child index, parent index, relation) triples, indexing ``ids``.
+    """
+
+    def __init__(self, ids: list[str], labels: list[str], edges: Iterable[tuple[int, int, int]]):
+        """Index the terms topologically, then build the adjacency lists and the closure index."""
+        edges = list(edges)
+        order = self._topological_order(len(ids), edges)
+        position = array("l", [0] * len(ids))
+        for new, old in enumerate(order):
+            position[old] = new
+        self.ids = [ids[old] for old in order]
+        self.labels = [labels[old] for old in order]
+        self.index = {id: i for i, id in enumerate(self.ids)}
+        edges = [(position[child], position[parent], rel) for child, parent, rel in edges]
+        self.parent_offsets, self.parent_targets, self.parent_relations = self._csr(
+            len(ids), ((child, parent, rel) for child, parent, rel in edges)
+        )
+        self.child_offsets, self.child_targets, self.child_relations = self._csr(
+            len(ids), ((parent, child, rel) for child, parent, rel in edges)
+        )
+        self._build_closure_index()
+
+    @staticmethod
+    def _topological_order(size: int, edges: list) -> list[int]:
+        """
+        Return the term indices ordered so that is_a/part_of ancestors come first.
+
+        Ties keep the original order. Terms on a cycle (which GO should not have) are
+        appended at the end in their original order.
+        """
+        pending = [0] * size
+        children: list[list[int]] = [[] for _ in range(size)]
+        for child, parent, rel in edges:
+            if rel & ISA_PARTOF:
+                pending[child] += 1
+                children[parent].append(child)
+        ready = [i for i in range(size) if pending[i] == 0]
+        heapq.heapify(ready)
+        order = []
+        while ready:
+            i = heapq.heappop(ready)
+            order.append(i)
+            for child in children[i]:
+                pending[child] -= 1
+                if pending[child] == 0:
+                    heapq.heappush(ready, child)
+        if len(order) < size:
+            placed = set(order)
+            order.extend(i for i in range(size) if i not in placed)
+        return order
+
+    def _build_closure_index(self):
+        """Precompute the reflexive is_a/part_of closure and the depth of every term."""
+        size = len(self.ids)
+        self.closure_offsets = array("l", [0] * (size + 1))
+        self.closure_targets = array("l")
+        self.depth = array("l", [0] * size)
+        for i in range(size):
+            parents = set(self._neighbours(i, ISA_PARTOF, True))
+            if all(p < i for p in parents):
+                closure = {i}
+                for p in parents:
+                    closure.update(self.closure_targets[self.closure_offsets[p]:self.closure_offsets[p + 1]])
+                closure = sorted(closure)
+            else:
+                closure = self.closure_indices(i)
+            self.depth[i] = 1 + max((self.depth[p] for p in parents if p < i), default=-1)
+            self.closure_targets.extend(closure)
+            self.closure_offsets[i + 1] = len(self.closure_targets)
+
+    @staticmethod
+    def _csr(size: int, edges: Iterable[tuple[int, int, int]]) -> tuple[array, array, array]:
+        """Return the offsets, targets and relations arrays of the edges grouped by source."""
+        edges = sorted(edges)
+        offsets = array("l", [0] * (size + 1))
+        for source, _, _ in edges:
+            offsets[source + 1] += 1
+        for i in range(size):
+            offsets[i + 1] += offsets[i]
+        targets = array("l", (target for _, target, _ in edges))
+        relations = array("b", (rel for _, _, rel in edges))
+        return offsets, targets, relations
+
+    def __len__(self) -> int:
+        """Return the number of terms."""
+        return len(self.ids)
+
+    def __contains__(self, term: str) -> bool:
+        """Return whether the graph has a term."""
+        return term in self.index
+
+    def label(self, term: str) -> Optional[str]:
+        """Return the label of a term, or None if it is unknown."""
+        i = self.index.get(term)
+        return None if i is None else self.labels[i]
+
+    def _neighbours(self, i: int, relations: int, up: bool) -> Iterable[int]:
+        """Yield the parents (``up``) or children of term index ``i`` over the given relations."""
+        if up:
+            offsets, targets, rels = self.parent_offsets, self.parent_targets, self.parent_relations
+        else:
+            offsets, targets, rels = self.child_offsets, self.child_targets, self.child_relations
+        for k in range(offsets[i], offsets[i + 1]):
+            if rels[k] & relations:
+                yield targets[k]
+
+    def closure_indices(self, i: int, relations: int = ISA_PARTOF, up: bool = True, reflexive: bool = True) -> list:
+        """
+        Return the sorted indices of the terms reachable from term index ``i``.
+
+        :param i: The index of the start term.
+        :param relations: The relations to follow, as bit flags.
+        :param up: True for ancestors, False for descendants.
+        :param reflexive: Whether the start term is included.
+        :return: The term indices, in ascending order.
+        """
+        seen = bytearray(len(self.ids))
+        seen[i] = 1
+        stack = [i]
+        while stack:
+            for j in self._neighbours(stack.pop(), relations, up):
+                if not seen[j]:
+                    seen[j] = 1
+                    stack.append(j)
+        if not reflexive:
+            seen[i] = 0
+        return [j for j, flag in enumerate(seen) if flag]
+
+    def _require(self, term: str) -> int:
+        """Return the index of a term, raising KeyError if it is unknown."""
+        i = self.index.get(term)
+        if i is None:
+            raise KeyError(term)
+        return i
+
+    def parents(self, term: str, relations: int = ISA_PARTOF) -> list[str]:
+        """Return the direct parents of a term over the given relations."""
+        return [self.ids[j] for j in sorted(set(self._neighbours(self._require(term), relations, True)))]
+
+    def children(self, term: str, relations: int = ISA_PARTOF) -> list[str]:
+        """Return the direct children of a term over the given relations."""
+        return [self.ids[j] for j in sorted(set(self._neighbours(self._require(term), relations, False)))]
+
+    def ancestors(self, term: str, relations: int = ISA_PARTOF, reflexive: bool = True) -> list[str]:
+        """
+        Return the ancestors of a term, i.e. its closure over the given relations.
+
+        With the defaults this is the equivalent of the GOlr ``isa_partof_closure`` field.
+
+        :param term: A GO CURIE.
+        :param relations: The relations to follow, as bit flags.
+        :param reflexive: Whether the term itself is included.
+        :return: The ancestor CURIEs.
+        :raises KeyError: If the term is not in the graph.
+        """
+        i = self._require(term)
+        if relations == ISA_PARTOF:
+            closure = self.closure_targets[self.closure_offsets[i]:self.closure_offsets[i + 1]]
+            return [self.ids[j] for j in closure if reflexive or j != i]
+        return [self.ids[j] for j in self.closure_indices(i, relations, True, reflexive)]
+
+    def descendants(self, term: str, relations: int = ISA_PARTOF, reflexive: bool = True) -> list[str]:
+        """
+        Return the descendants of a term, i.e. the terms whose closure contains it.
+
+        :param term: A GO CURIE.
+        :param relations: The relations to follow, as bit flags.
+        :param reflexive: Whether the term itself is included.
+        :return: The descendant CURIEs.
+        :raises KeyError: If the term is not in the graph.
+        """
+        return [self.ids[j] for j in self.closure_indices(self._require(term), relations, False, reflexive)]
+
+    def ancestor_bits(self, term: str) -> int:
+        """
+        Return the reflexive is_a/part_of closure of a term as an int bitset over term indices.
+
+        :param term: A GO CURIE.
+        :return: An int with bit ``j`` set for every ancestor ``j`` (including the term).
+        :raises KeyError: If the term is not in the graph.
+        """
+        return self._index_bits(self._require(term))
+
+    def _index_bits(self, i: int) -> int:
+        """Return the closure bitset of term index ``i``."""
+        bits = 0
+        for j in self.closure_targets[self.closure_offsets[i]:self.closure_offsets[i + 1]]:
+            bits |= 1 << j
+        return bits
+
+    def bits_to_terms(self, bits: int) -> list[str]:
+        """Return the CURIEs of the terms set in a bitset, ancestors first."""
+        terms = []
+        while bits:
+            low = bits & -bits
+            terms.append(self.ids[low.bit_length() - 1])
+            bits ^= low
+        return terms
+
+    def _closest(self, shared: int) -> int:
+        """Return the members of a set of shared ancestors that are not an ancestor of another member."""
+        covered = 0
+        remaining = shared
+        while remaining:
+            low = remaining & -remaining
+            covered |= self._index_bits(low.bit_length() - 1) & ~low
+            remaining ^= low
+        return shared & ~covered
+
+    def shared_ancestor_bits(self, subject: str, object: str) -> int:
+        """Return the is_a/part_of ancestors shared by two terms (each term counting as its own ancestor)."""
+        return self.ancestor_bits(subject) & self.ancestor_bits(object)
+
+    def shared_ancestors(self, subject: str, object: str) -> list[str]:
+        """
+        Return the is_a/part_of ancestors shared by two terms, ancestors first.
+
+        :raises KeyError: If a term is not in the graph.
+        """
+        return self.bits_to_terms(self.shared_ancestor_bits(subject, object))
+
+    def closest_common_ancestors(self, subject: str, object: str) -> list[str]:
+        """
+        Return the shared ancestors of two terms that have no more specific shared ancestor below them.
+
+        :raises KeyError: If a term is not in the graph.
+        """
+        return self.bits_to_terms(self._closest(self.shared_ancestor_bits(subject, object)))
+
+    def lca_depth(self, subject: str, object: str) -> Optional[int]:
+        """
+        Return the depth of the deepest common ancestor of two terms, or None if they share none.
+
+        :raises KeyError: If a term is not in the graph.
+        """
+        shared = self._closest(self.shared_ancestor_bits(subject, object))
+        return max((self.depth[self.index[term]] for term in self.bits_to_terms(shared)), default=None)
+
+    def compare_pairs(self, pairs: Iterable[tuple[str, str]]) -> list[dict]:
+        """
+        Compare many pairs of terms, computing each term's closure bitset only once.
+
+        :param pairs: (subject, object) pairs of GO CURIEs.
+        :return: For every pair, its shared ancestors, closest common ancestors and LCA depth.
+        :raises KeyError: If a term is not in the graph.
+        """
+        bits: dict = {}
+        results = []
+        for subject, object in pairs:
+            for term in (subject, object):
+                if term not in bits:
+                    bits[term] = self.ancestor_bits(term)
+            shared = bits[subject] & bits[object]
+            closest = self.bits_to_terms(self._closest(shared))
+            results.append({
+                "subject": subject,
+                "object": object,
+                "shared": self.bits_to_terms(shared),
+                "closest": closest,
+                "lca_depth": max((self.depth[self.index[term]] for term in closest), default=None),
+            })
+        return results
+
+
+def _graph_from_obographs(data: dict) -> GOGraph:
+    """Build a graph from an OBO Graphs JSON document (e.g. go.json), keeping only GO terms."""
+    ids, labels, index = [], [], {}
+    raw_edges = []
+    for graph in data.get("graphs", []):
+        for node in graph.get("nodes", []):
+            curie = _to_curie(node.get("id", ""))
+            if curie.startswith("GO:") and curie not in index and node.get("type", "CLASS") == "CLASS":
+                index[curie] = len(ids)
+                ids.append(curie)
+                labels.append(node.get("lbl", ""))
+        raw_edges.extend(graph.get("edges", []))
+    edges = []
+    for edge in raw_edges:
+        rel = PREDICATES.get(edge.get("pred"))
+        child = index.get(_to_curie(edge.get("sub", "")))
+        parent = index.get(_to_curie(edge.get("obj", "")))
+        if rel and child is not None and parent is not None:
+            edges.append((child, parent, rel))
+    return GOGraph(ids, labels, edges)
+
+
+def _graph_from_obo(lines: Iterable[str]) -> GOGraph:
+    """Build a graph from an OBO flat file (e.g. go-basic.obo or go.obo), keeping only GO terms."""
+    ids, labels = [], []
+    raw_edges = []
+    in_term = False
+    current = None
+    for line in lines:
+        line = line.strip()
+        if line.startswith("["):
+            in_term = line == "[Term]"
+            current = None
+            continue
+        if not in_term or ": " not in line:
+            continue
+        tag, _, value = line.partition(": ")
+        value = value.split(" ! ")[0].strip()
+        if tag == "id":
+            current = value if value.startswith("GO:") else None
+            if current is not None:
+                ids.append(current)
+                labels.append("")
+        elif current is None:
+            continue
+        elif tag == "name":
+            labels[-1] = value
+        elif tag == "is_a":
+            raw_edges.append((current, value.split()[0], IS_A))
+        elif tag == "relationship":
+            parts = value.split()
+            if len(parts) >= 2 and parts[0] in PREDICATES:
+                raw_edges.append((current, parts[1], PREDICATES[parts[0]]))
+    index = {id: i for i, id in enumerate(ids)}
+    edges = [
+        (index[child], index[parent], rel) for child, parent, rel in raw_edges if child in index and parent in index
+    ]
+    return GOGraph(ids, labels, edges)
+
+
+def load_go_graph(path: str) -> GOGraph:
+    """
+    Load a GO graph from a local GO release file.
+
+    :param path: The path of an OBO Graphs JSON file (``.json``) or an OBO file.
+    :return: The graph.
+    """
+    with open(path, "r") as f:
+        if path.endswith(".json"):
+            graph = _graph_from_obographs(json.load(f))
+        else:
+            graph = _graph_from_obo(f)
+    logger.info(f"Loaded GO graph with {len(graph)} terms and {len(graph.parent_targets)} edges from {path}")
+    return graph
+
+
+def get_go_graph_path() -> Optional[str]:
+    """Return the GO release file configured under ``go_graph.path`` in config.yaml, if any."""
+    from app.utils.settings import get_golr_config
+
+    return (get_golr_config().get("go_graph") or {}).get("path") or None
+
+
+def load_configured_go_graph() -> Optional[GOGraph]:
+    """
+    Load the configured GO graph and make it the one returned by :func:`get_go_graph`.
+
+    Does nothing when no path is configured. A file that cannot be read is logged and
+    the routers keep querying GOlr.
+
+    :return: The loaded graph, or None.
+    """
+    path = get_go_graph_path()
+    if path is None:
+        return None
+    try:
+        set_go_graph(load_go_graph(path))
+    except (OSError, ValueError) as e:
+        logger.error(f"Could not load the GO graph from {path}, falling back to GOlr: {e}")
+        return None
+    return _graph
+
+
+def set_go_graph(graph: Optional[GOGraph]):
+    """Set (or with None, unset) the GO graph used by the routers."""
+    global _graph
+    _graph = graph
+
+
+def get_go_graph() -> Optional[GOGraph]:
+    """Return the local GO graph, or None when none is loaded and GOlr must be queried instead."""
+    return _graph
@@ -0,0 +1,156 @@
+"""Conversion of GO-CAM models to the gocam-py format, cached per model version."""
+
+import argparse
+import hashlib
+import importlib.metadata
+import logging
+import os
+from typing import Optional
+
+from fastapi.concurrency import run_in_threadpool
+from gocam.translation.minerva_wrapper import MinervaWrapper
+
+from app.utils.cache_backends import get_cache_backend, json_size
+from app.utils.gocam_store import GoCamModelStore, get_gocam_store_config, gocam_store, strip_model_id
+from app.utils.settings import get_golr_config
+from app.utils.singleflight import SingleFlight
+
+logger = logging.getLogger()
+
+DEFAULT_GOCAM_CONVERSION_CONFIG = {
+    "preconvert": False,
+}
+
+try:
+    GOCAM_PY_VERSION = importlib.metadata.version("gocam")
+except importlib.metadata.PackageNotFoundError:
+    GOCAM_PY_VERSION = "unknown"
+
+_flight = SingleFlight()
+
+
+def get_gocam_conversion_config() -> dict:
+    """
+    Return the conversion settings from the ``gocam_conversion`` section of config.yaml.
+
+    :return: A dict with preconvert.
+    """
+    return {**DEFAULT_GOCAM_CONVERSION_CONFIG, **(get_golr_config().get("gocam_conversion") or {})}
+
+
+def conversion_key(model_id: str, version: str) -> str:
+    """
+    Return the ``gocam_py`` cache key of a converted model.
+
+    :param model_id: A GO-CAM identifier, with or without the ``gomodel:`` prefix.
+    :param version: The version of the model given by the model store.
+    :return: The model id and a digest of the model version and the gocam-py release, so the key
+             changes whenever either does.
+    """
+    digest = hashlib.sha256(f"{GOCAM_PY_VERSION}\n{version}".encode()).hexdigest()[:12]
+    return f"{strip_model_id(model_id)}@{digest}"
+
+
+def convert_model(model_data: dict) -> dict:
+    """
+    Convert a GO-CAM model to the gocam-py format.
+
+    :param model_data: The GO-CAM model JSON data (Minerva format).
+    :return: The ``model_dump()`` of the gocam-py model.
+    """
+    return MinervaWrapper.minerva_object_to_model(model_data).model_dump()
+
+
+def get_or_convert_model(key: str, model_data: dict) -> dict:
+    """
+    Return the gocam-py form of a model from the ``gocam_py`` cache, converting and caching it on a miss.
+
+    :param key: The cache key of the converted model, see :func:`conversion_key`.
+    :param model_data: The GO-CAM model JSON data (Minerva format).
+    :return: The ``model_dump()`` of the gocam-py model.
+    """
+    converted = get_cache_backend("gocam_py").get(key)
+    if converted is None:
+        converted = convert_model(model_data)
+        get_cache_backend("gocam_py").set(key, converted, size=json_size(converted))
+    return converted
+
+
+async def get_converted_model_async(id: str) -> dict:
+    """
+    Return a GO-CAM model in the gocam-py format.
+
+    Conversions are cached by model id and version, so a model is only converted again
+    when its file (or the gocam-py release) changes. The version comes from the model store,
+    which works it out once when it loads the model. The cache lookup and, on a miss, the
+    conversion run in the thread pool, shared by concurrent requests for the same model.
+
+    :param id: A GO-CAM identifier, with or without the ``gomodel:`` prefix.
+    :return: The ``model_dump()`` of the gocam-py model.
+    :raises DataNotFoundException: If the model is in neither the model store nor S3.
+    """
+    model_data, version = await gocam_store.get_with_version_async(id)
+    key = conversion_key(id, version)
+    return await _flight.do(key, lambda: run_in_threadpool(get_or_convert_model, key, model_data))
+
+
+def preconvert_models(directory: str) -> int:
+    """
+    Convert every ``<id>.json`` model of a model store directory that is not cached yet.
+
+    Models that cannot be read or converted are logged and skipped.
+
+    :param directory: The GO-CAM model store directory.
+    :return: The number of models converted.
+    """
+    store = GoCamModelStore(path=directory, max_models=0)
+    backend = get_cache_backend("gocam_py")
+    count = 0
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith(".json"):
+            continue
+        model_id = name[:-len(".json")]
+        local = store.load_local(model_id)
+        if local is None:
+            continue
+        model_data, version, _ = local
+        key = conversion_key(model_id, version)
+        if backend.get(key) is not None:
+            continue
+        try:
+            converted = convert_model(model_data)
+            backend.set(key, converted, size=json_size(converted))
+        except Exception as e:
+            logger.warning(f"Could not convert GO-CAM model {model_id} to the gocam-py format: {e}")
+            continue
+        count += 1
+    logger.info(f"Converted {count} GO-CAM models from {directory} to the gocam-py format")
+    return count
+
+
+async def run_preconversion() -> Optional[int]:
+    """
+    Pre-convert the models of the configured model store, when ``gocam_conversion.preconvert`` is set.
+
+    Meant to run as a background task on startup: the conversions run in the thread pool and
+    errors are logged.
+
+    :return: The number of models converted, or None when pre-conversion is off.
+    """
+    directory = get_gocam_store_config()["path"]
+    if not get_gocam_conversion_config()["preconvert"] or not directory:
+        return None
+    try:
+        return await run_in_threadpool(preconvert_models, directory)
+    except OSError as e:
+        logger.error(f"Could not pre-convert the GO-CAM models of {directory}: {e}")
+        return None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert the models of the GO-CAM store to the gocam-py format.")
+    parser.add_argument("--directory", default=get_gocam_store_config()["path"], help="the model store directory")
+    args = parser.parse_args()
+    if not args.directory:
+        parser.error("no directory given and gocam_store.path is not set in config.yaml")
+    preconvert_models(args.directory)
@@ -0,0 +1,385 @@
+"""Local store of GO-CAM model JSON files, with an LRU of parsed models and S3 as the fallback."""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import re
+import tarfile
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Iterable, Optional
+
+import httpx
+import requests
+from fastapi.concurrency import run_in_threadpool
+
+from app.exceptions.global_exceptions import DataNotFoundException
+from app.utils.cache_backends import get_cache_backend, get_namespace_config, json_size
+from app.utils.concurrency import gather_bounded
+from app.utils.http_clients import get_async_client, get_session
+from app.utils.settings import get_golr_config
+from app.utils.singleflight import SingleFlight
+
+logger = logging.getLogger()
+
+DEFAULT_GOCAM_STORE_CONFIG = {
+    "path": "",
+    "s3_url": "https://go-public.s3.amazonaws.com/files/go-cam/",
+    "max_models": 256,
+    "write_through": True,
+    "max_concurrency": 8,
+}
+
+# Model ids are file names in the store and on S3, so nothing else is looked up.
+_MODEL_ID = re.compile(r"[A-Za-z0-9_\-]+")
+
+
+def get_gocam_store_config() -> dict:
+    """
+    Return the store settings from the ``gocam_store`` section of config.yaml.
+
+    :return: A dict with path, s3_url, max_models, write_through and max_concurrency.
+    """
+    return {**DEFAULT_GOCAM_STORE_CONFIG, **(get_golr_config().get("gocam_store") or {})}
+
+
+def strip_model_id(id: str) -> str:
+    """Return the bare model id of a GO-CAM identifier (e.g. 581e072c00000295 for gomodel:581e072c00000295)."""
+    return id.replace("gomodel:", "") if id.startswith("gomodel:") else id
+
+
+def content_version(data: dict) -> str:
+    """Return a digest of a model's content, the version of models that come without an ETag or file."""
+    return hashlib.sha256(json.dumps(data, sort_keys=True).encode()).hexdigest()[:12]
+
+
+class GoCamModelStore:
+
+    """
+    Serve GO-CAM models (Minerva JSON) from memory, a local directory or S3, in that order.
+
+    Parsed models are kept in an LRU of ``max_models`` entries for ``ttl_seconds``. On a miss
+    the model is read from ``<path>/<id>.json``; the directory can be filled in bulk from a
+    release tarball (see :func:`sync_models_from_tarball`). Models found in neither place are
+    downloaded from S3 once (concurrent requests for the same model share the download) and
+    written to the directory when ``write_through`` is set. Without a directory, downloaded
+    models go to the shared ``gocam`` cache backend instead. Returned models are shared:
+    callers must not mutate them.
+
+    Models written through keep their S3 ETag next to them (``<path>/<id>.etag``). Once the
+    ETag was last checked more than ``ttl_seconds`` ago, the model is revalidated with a
+    conditional request and replaced if S3 has a newer one; the saved copy is served when S3
+    cannot be reached. Models synced from a tarball have no ETag and are only replaced by the
+    next sync.
+
+    Each model is loaded with a version that changes whenever the model does: its ETag, else
+    the size and modification time of its file, else a digest of its content. The version is
+    kept with the model in the LRU, so results derived from a model can be cached by version
+    without reading the model again (see :meth:`get_with_version_async`).
+
+    :param path: The directory of ``<id>.json`` models, or an empty string for none.
+    :param s3_url: The URL prefix models are downloaded from on a miss.
+    :param max_models: The number of parsed models kept in memory.
+    :param write_through: Whether models downloaded from S3 are saved in ``path``.
+    :param max_concurrency: The number of models :meth:`get_many_async` loads at once.
+    :param ttl_seconds: How long models are trusted before being loaded or revalidated again;
+                        defaults to the ``ttl_seconds`` of the ``gocam`` cache namespace.
+    """
+
+    def __init__(self, path: str = "", s3_url: str = DEFAULT_GOCAM_STORE_CONFIG["s3_url"],
+                 max_models: int = 256, write_through: bool = True, max_concurrency: int = 8,
+                 ttl_seconds: Optional[float] = None):
+        """Initialize an empty store."""
+        self.path = path or None
+        self.s3_url = s3_url
+        self.max_models = max_models
+        self.write_through = write_through
+        self.max_concurrency = max_concurrency
+        if ttl_seconds is None:
+            ttl_seconds = get_namespace_config("gocam")["ttl_seconds"]
+        self.ttl_seconds = ttl_seconds
+        self._models: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self._flight = SingleFlight()
+        self.memory_hits = 0
+        self.local_hits = 0
+        self.downloads = 0
+
+    def _file(self, model_id: str) -> str:
+        """Return the path of a model in the local directory."""
+        return os.path.join(self.path, f"{model_id}.json")
+
+    def _etag_file(self, model_id: str) -> str:
+        """Return the path of the S3 ETag of a model written through to the local directory."""
+        return os.path.join(self.path, f"{model_id}.etag")
+
+    def _get_cached_entry(self, model_id: str) -> Optional[tuple[dict, str]]:
+        """Return a model and its version from the in-memory LRU, or None when it is not there or has expired."""
+        with self._lock:
+            entry = self._models.get(model_id)
+            if entry is None:
+                return None
+            data, version, expires_at = entry
+            if time.monotonic() >= expires_at:
+                del self._models[model_id]
+                return None
+            self._models.move_to_end(model_id)
+            self.memory_hits += 1
+            return data, version
+
+    def get_cached(self, model_id: str) -> Optional[dict]:
+        """Return a model from the in-memory LRU, or None when it is not there or has expired."""
+        entry = self._get_cached_entry(model_id)
+        return entry[0] if entry is not None else None
+
+    def _remember(self, model_id: str, data: dict, version: str):
+        """Put a model in the LRU, evicting the least recently used ones beyond ``max_models``."""
+        if self.max_models <= 0:
+            return
+        with self._lock:
+            self._models[model_id] = (data, version, time.monotonic() + self.ttl_seconds)
+            self._models.move_to_end(model_id)
+            while len(self._models) > self.max_models:
+                self._models.popitem(last=False)
+
+    def read_local(self, model_id: str) -> Optional[dict]:
+        """Return a model from the local directory, or None when it is not there or unreadable."""
+        if self.path is None:
+            return None
+        try:
+            with open(self._file(model_id)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable GO-CAM model file {self._file(model_id)}: {e}")
+            return None
+
+    def load_local(self, model_id: str) -> Optional[tuple[dict, str, Optional[float]]]:
+        """
+        Return a model from the local directory with its version, or None when it is not there or unreadable.
+
+        :param model_id: The bare model id.
+        :return: The model, its version (its S3 ETag, else the size and modification time of its file)
+                 and when the ETag was last checked (None for models without one).
+        """
+        data = self.read_local(model_id)
+        if data is None:
+            return None
+        saved_etag = self.read_etag(model_id)
+        if saved_etag is not None:
+            return data, saved_etag[0], saved_etag[1]
+        try:
+            stat = os.stat(self._file(model_id))
+        except OSError:
+            return data, content_version(data), None
+        return data, f"{stat.st_size}-{stat.st_mtime_ns}", None
+
+    def read_etag(self, model_id: str) -> Optional[tuple[str, float]]:
+        """Return the S3 ETag of a model written through, and when it was last checked, or None."""
+        try:
+            with open(self._etag_file(model_id)) as f:
+                return f.read().strip(), os.fstat(f.fileno()).st_mtime
+        except OSError:
+            return None
+
+    def write_local(self, model_id: str, data: dict, etag: Optional[str] = None):
+        """
+        Save a model in the local directory, atomically so readers never see a partial file.
+
+        :param model_id: The bare model id.
+        :param data: The model.
+        :param etag: The S3 ETag of a downloaded model, kept to revalidate it; without one
+                     (e.g. when syncing a tarball) the model is not revalidated.
+        """
+        try:
+            os.makedirs(self.path, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.path, suffix=".tmp")
+            with os.fdopen(fd, "w") as f:
+                json.dump(data, f)
+            os.replace(tmp, self._file(model_id))
+            if etag:
+                with open(self._etag_file(model_id), "w") as f:
+                    f.write(etag)
+            elif os.path.exists(self._etag_file(model_id)):
+                os.remove(self._etag_file(model_id))
+        except OSError as e:
+            logger.warning(f"Could not save GO-CAM model {model_id} in {self.path}: {e}")
+
+    def _mark_validated(self, model_id: str):
+        """Record that the saved copy of a model was found to be current on S3."""
+        try:
+            os.utime(self._etag_file(model_id))
+        except OSError as e:
+            logger.warning(f"Could not update the ETag of GO-CAM model {model_id} in {self.path}: {e}")
+
+    def _cache_in_backend(self, model_id: str, data: dict):
+        """Keep a downloaded model in the ``gocam`` cache backend, when the store has no directory."""
+        get_cache_backend("gocam").set(model_id, data, size=json_size(data))
+
+    async def download_async(self, model_id: str, etag: Optional[str] = None) -> tuple[Optional[dict], Optional[str]]:
+        """
+        Download a model from S3.
+
+        :param model_id: The bare model id.
+        :param etag: The ETag of a saved copy, to only download the model if it changed since.
+        :return: The model (None when it has not changed since ``etag``) and its ETag.
+        :raises DataNotFoundException: If S3 does not have the model.
+        """
+        url = f"{self.s3_url}{model_id}.json"
+        headers = {"If-None-Match": etag} if etag else None
+        response = await get_async_client(url).get(url, headers=headers, timeout=30.0)
+        if response.status_code == 304:
+            return None, etag
+        if response.status_code in (403, 404):
+            raise DataNotFoundException("GO-CAM model not found.")
+        response.raise_for_status()
+        self.downloads += 1
+        return response.json(), response.headers.get("ETag")
+
+    async def _revalidate_async(self, model_id: str, etag: str) -> Optional[tuple[dict, str]]:
+        """Check a saved model against S3; return the newer model and its ETag, or None to keep the saved one."""
+        try:
+            new_data, new_etag = await self.download_async(model_id, etag)
+        except (httpx.HTTPError, ValueError) as e:
+            logger.warning(f"Could not revalidate GO-CAM model {model_id}, serving the saved copy: {e}")
+            return None
+        if new_data is None:
+            await run_in_threadpool(self._mark_validated, model_id)
+            return None
+        return new_data, new_etag
+
+    async def _load_async(self, model_id: str) -> tuple[dict, str]:
+        """Load a model missing from memory, and its version, from the local directory, the cache backend or S3."""
+        local = await run_in_threadpool(self.load_local, model_id)
+        if local is not None:
+            data, version, checked_at = local
+            newer = None
+            if checked_at is not None and time.time() - checked_at >= self.ttl_seconds:
+                newer = await self._revalidate_async(model_id, version)
+            if newer is not None:
+                data, etag = newer
+                await run_in_threadpool(self.write_local, model_id, data, etag)
+                version = etag or await run_in_threadpool(content_version, data)
+            else:
+                self.local_hits += 1
+        elif self.path is None and (
+            (data := await run_in_threadpool(get_cache_backend("gocam").get, model_id)) is not None
+        ):
+            self.local_hits += 1
+            version = await run_in_threadpool(content_version, data)
+        else:
+            data, etag = await self.download_async(model_id)
+            if self.path is None:
+                await run_in_threadpool(self._cache_in_backend, model_id, data)
+            elif self.write_through:
+                await run_in_threadpool(self.write_local, model_id, data, etag)
+            version = etag or await run_in_threadpool(content_version, data)
+        self._remember(model_id, data, version)
+        return data, version
+
+    async def get_with_version_async(self, id: str) -> tuple[dict, str]:
+        """
+        Return a GO-CAM model and its version.
+
+        :param id: A GO-CAM identifier, with or without the ``gomodel:`` prefix.
+        :return: The model (Minerva JSON), shared with other callers, and a version that changes
+                 whenever the model does.
+        :raises DataNotFoundException: If the model is in neither the store nor S3.
+        """
+        model_id = strip_model_id(id)
+        if not _MODEL_ID.fullmatch(model_id):
+            raise DataNotFoundException("GO-CAM model not found.")
+        entry = self._get_cached_entry(model_id)
+        if entry is not None:
+            return entry
+        return await self._flight.do(model_id, lambda: self._load_async(model_id))
+
+    async def get_async(self, id: str) -> dict:
+        """
+        Return a GO-CAM model.
+
+        :param id: A GO-CAM identifier, with or without the ``gomodel:`` prefix.
+        :return: The model (Minerva JSON), shared with other callers.
+        :raises DataNotFoundException: If the model is in neither the store nor S3.
+        """
+        return (await self.get_with_version_async(id))[0]
+
+    async def get_many_async(self, ids: Iterable[str]) -> list[dict]:
+        """
+        Return several GO-CAM models, loading up to ``max_concurrency`` of them at once.
+
+        :param ids: GO-CAM identifiers, with or without the ``gomodel:`` prefix; duplicates are loaded once.
+        :return: The models, in the order of ``ids``.
+        :raises DataNotFoundException: If any model is in neither the store nor S3.
+        """
+        ids = list(ids)
+        unique = list(dict.fromkeys(strip_model_id(id) for id in ids))
+        models = dict(zip(unique, await gather_bounded(unique, self.get_async, self.max_concurrency), strict=True))
+        return [models[strip_model_id(id)] for id in ids]
+
+    def clear(self):
+        """Drop the in-memory models."""
+        with self._lock:
+            self._models.clear()
+
+
+def sync_models_from_tarball(source: str, directory: str) -> int:
+    """
+    Fill a store directory with the models of a release tarball (e.g. the GO-CAM JSON tarball).
+
+    Only the ``*.json`` members are written, flattened to ``<directory>/<id>.json``; other
+    members and member paths are ignored, so the archive cannot write outside ``directory``.
+
+    :param source: The path or URL of a ``.tar.gz`` archive.
+    :param directory: The store directory.
+    :return: The number of models written.
+    """
+    store = GoCamModelStore(path=directory)
+    count = 0
+    if source.startswith(("http://", "https://")):
+        response = get_session(source).get(source, stream=True, timeout=300)
+        response.raise_for_status()
+        archive = tarfile.open(fileobj=response.raw, mode="r|gz")
+    else:
+        archive = tarfile.open(source, mode="r|gz")
+    with archive:
+        for member in archive:
+            name = os.path.basename(member.name)
+            model_id = name[:-len(".json")]
+            if not member.isfile() or not name.endswith(".json") or not _MODEL_ID.fullmatch(model_id):
+                continue
+            try:
+                data = json.load(archive.extractfile(member))
+            except ValueError as e:
+                logger.warning(f"Skipping invalid GO-CAM model {member.name}: {e}")
+                continue
+            store.write_local(model_id, data)
+            count += 1
+    logger.info(f"Synced {count} GO-CAM models from {source} into {directory}")
+    return count
+
+
+gocam_store = GoCamModelStore(**get_gocam_store_config())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fill the local GO-CAM model store from a release tarball.")
+    parser.add_argument("source", help="path or URL of the GO-CAM JSON release tarball")
+    parser.add_argument("--directory", default=get_gocam_store_config()["path"], help="the store directory")
+    parser.add_argument("--summary-file", help="a GO-CAM summary table to update once the models are synced")
+    args = parser.parse_args()
+    if not args.directory:
+        parser.error("no directory given and gocam_store.path is not set in config.yaml")
+    try:
+        sync_models_from_tarball(args.source, args.directory)
+    except (OSError, tarfile.TarError, requests.RequestException) as e:
+        parser.exit(1, f"Could not sync GO-CAM models: {e}\n")
+    if args.summary_file:
+        from app.utils.gocam_summary import update_summary_file
+
+        update_summary_file(args.summary_file, args.directory)
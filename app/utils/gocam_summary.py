@@ -0,0 +1,428 @@
+"""Per-model GO-CAM summaries (title, GO terms, gene products, PMIDs, ...) built offline and served from memory."""
+
+import argparse
+import json
+import logging
+import os
+import re
+import tempfile
+from typing import Iterable, Optional
+
+from app.utils.gocam_store import get_gocam_store_config, gocam_store, strip_model_id
+from app.utils.settings import get_golr_config, get_index_files
+
+logger = logging.getLogger()
+
+SUMMARY_FORMAT_VERSION = 2
+
+GO_ROOTS = {
+    "http://purl.obolibrary.org/obo/GO_0008150": "BP",
+    "http://purl.obolibrary.org/obo/GO_0003674": "MF",
+    "http://purl.obolibrary.org/obo/GO_0005575": "CC",
+}
+
+# Type ids of individuals that are not gene products.
+NON_GENE_PRODUCT_PREFIXES = ("GO:", "ECO:", "CHEBI:", "gomodel:")
+
+ENABLED_BY = "RO:0002333"
+
+CAUSAL_RELATIONS = {
+    "RO:0002418", "RO:0004046", "RO:0004047", "RO:0002411",
+    "RO:0002305", "RO:0002304", "RO:0002211", "RO:0002212",
+    "RO:0002213", "RO:0002578", "RO:0002629", "RO:0002630",
+    "RO:0002406", "RO:0002407", "RO:0002408", "RO:0002409",
+    "RO:0002414", "RO:0002412", "RO:0002413"
+}
+
+# has input / has output: a chemical connects two functions.
+CHEMICAL_RELATIONS = {"RO:0002233", "RO:0002234"}
+
+# Causal chains are followed up to this number of functions.
+CHAIN_LENGTH_LIMIT = 8
+
+# Functions a causal chain through a gene product needs for the pathway widget.
+MIN_CAUSAL_CHAIN = 3
+
+_PMID = re.compile(r"PMID:\s*\d+")
+
+_summaries: Optional[dict] = None
+
+
+def _go_iri(go_id: str) -> str:
+    """Return the OBO PURL of a GO CURIE."""
+    return f"http://purl.obolibrary.org/obo/{go_id.replace(':', '_')}"
+
+
+def _pmids(value: str) -> list[str]:
+    """Return the PMIDs cited in an annotation value, without inner spaces."""
+    return [match.replace(" ", "") for match in _PMID.findall(value)] if "PMID" in value else []
+
+
+def has_causal_pathway(model_data: dict) -> bool:
+    """
+    Check if the model has a causal pathway (chain of 3+ functions or chemical intermediate).
+
+    :param model_data: The GO-CAM model JSON data
+    :return: True if the model has two or more causal edges, or a chemical input/output edge
+    """
+    facts = model_data.get("facts", [])
+    if sum(1 for fact in facts if fact.get("property", "") in CAUSAL_RELATIONS) >= 2:
+        return True
+    return any(fact.get("property", "") in CHEMICAL_RELATIONS for fact in facts)
+
+
+def _strongly_connected_components(nodes: Iterable[str], successors: dict) -> dict:
+    """
+    Number the strongly connected components of a directed graph (Tarjan's algorithm, iteratively).
+
+    Components are numbered in the order they are completed, which is a reverse topological
+    order: edges between two components always go to the lower numbered one.
+
+    :param nodes: The nodes of the graph.
+    :param successors: The successors of each node.
+    :return: The component number of each node.
+    """
+    index = {}
+    low = {}
+    stack = []
+    on_stack = set()
+    component = {}
+    count = 0
+    for root in nodes:
+        if root in index:
+            continue
+        index[root] = low[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(successors.get(root, ())))]
+        while work:
+            node, children = work[-1]
+            for child in children:
+                if child not in index:
+                    index[child] = low[child] = len(index)
+                    stack.append(child)
+                    on_stack.add(child)
+                    work.append((child, iter(successors.get(child, ()))))
+                    break
+                if child in on_stack:
+                    low[node] = min(low[node], index[child])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+                if low[node] == index[node]:
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component[member] = count
+                        if member == node:
+                            break
+                    count += 1
+    return component
+
+
+def causal_chain_lengths(activities: Iterable[str], successors: dict, limit: int = CHAIN_LENGTH_LIMIT) -> dict:
+    """
+    Return the number of functions of the longest causal chain running through each activity.
+
+    Chains follow consecutive causal edges. The functions of a causal cycle (feedback loop)
+    are counted once each, however the chain enters and leaves the cycle. Lengths are worked
+    out once per component of the graph, in time linear in its size, and capped at ``limit``.
+
+    :param activities: The individual ids of the activities to measure.
+    :param successors: The individual ids each activity causally affects.
+    :param limit: The length at which chains stop being counted.
+    :return: The chain length of each activity, between 1 (no causal edge) and ``limit``.
+    """
+    activities = list(activities)
+    nodes = list(dict.fromkeys([*activities, *successors, *(n for targets in successors.values() for n in targets)]))
+    component = _strongly_connected_components(nodes, successors)
+    count = max(component.values(), default=-1) + 1
+    sizes = [0] * count
+    downstream_of = [set() for _ in range(count)]
+    upstream_of = [set() for _ in range(count)]
+    for node in nodes:
+        sizes[component[node]] += 1
+        for target in successors.get(node, ()):
+            if component[target] != component[node]:
+                downstream_of[component[node]].add(component[target])
+                upstream_of[component[target]].add(component[node])
+    # Edges go from higher to lower numbered components.
+    down = [0] * count
+    for c in range(count):
+        down[c] = min(limit, sizes[c] + max((down[d] for d in downstream_of[c]), default=0))
+    up = [0] * count
+    for c in reversed(range(count)):
+        up[c] = min(limit, sizes[c] + max((up[u] for u in upstream_of[c]), default=0))
+    return {
+        activity: min(limit, up[component[activity]] + down[component[activity]] - sizes[component[activity]])
+        for activity in activities
+    }
+
+
+def _causal_properties(model_data: dict, individual_map: dict, chain_lengths: bool) -> dict:
+    """
+    Compute the causal pathway properties of a GO-CAM model.
+
+    :param model_data: The GO-CAM model JSON data (Minerva format).
+    :param individual_map: The gene product ``(id, label)`` types of each individual.
+    :param chain_lengths: Whether to include the chain lengths.
+    :return: A dict with ``causal_edges`` (the number of causal relation facts), ``chemical_connection``
+             (whether a chemical is the input or output of a function), ``causal_pathway``
+             (see :func:`has_causal_pathway`) and, if asked for, ``chain_lengths`` (for each enabler,
+             the length of the longest causal chain through the functions it enables).
+    """
+    causal_edges = 0
+    chemical_connection = False
+    successors = {}
+    activities = {}
+    for fact in model_data.get("facts", []):
+        prop = fact.get("property", "")
+        subject, obj = fact.get("subject", ""), fact.get("object", "")
+        if prop in CAUSAL_RELATIONS:
+            causal_edges += 1
+            if subject != obj:
+                successors.setdefault(subject, set()).add(obj)
+        elif prop in CHEMICAL_RELATIONS:
+            chemical_connection = True
+        elif prop == ENABLED_BY:
+            for gp_id, _ in individual_map.get(obj, []):
+                activities.setdefault(gp_id, set()).add(subject)
+
+    properties = {
+        "causal_edges": causal_edges,
+        "chemical_connection": chemical_connection,
+        "causal_pathway": causal_edges >= 2 or chemical_connection,
+    }
+    if chain_lengths:
+        lengths = causal_chain_lengths({a for gp_activities in activities.values() for a in gp_activities}, successors)
+        properties["chain_lengths"] = {
+            gp_id: max(lengths[activity] for activity in gp_activities) for gp_id, gp_activities in activities.items()
+        }
+    return properties
+
+
+def summarize_model(model_data: dict, chain_lengths: bool = False) -> dict:
+    """
+    Extract the fields the model list endpoints need from a GO-CAM model.
+
+    :param model_data: The GO-CAM model JSON data (Minerva format).
+    :param chain_lengths: Whether to include the causal chain lengths, which only the offline
+                          table build computes.
+    :return: A dict with the model ``id``, ``title``, ``state``, ``goterms`` (``[GO id, label, aspect]``
+             for each non-root GO class, aspect being BP, MF, CC or unknown), ``gene_products``
+             (``[id, label]`` of each enabler), the sorted ``pmids`` and the causal pathway properties
+             ``causal_edges``, ``chemical_connection``, ``causal_pathway`` and, if asked for, ``chain_lengths``.
+    """
+    title = None
+    state = None
+    pmids = set()
+    for ann in model_data.get("annotations", []):
+        if ann.get("key") == "title" and title is None:
+            title = ann.get("value", "")
+        elif ann.get("key") == "state" and state is None:
+            state = ann.get("value", "")
+        pmids.update(_pmids(ann.get("value", "")))
+
+    go_terms = {}
+    individual_map = {}
+    for individual in model_data.get("individuals", []):
+        for type_item in individual.get("type", []):
+            type_id = type_item.get("id", "")
+            if type_id.startswith("GO:") and type_id not in go_terms and _go_iri(type_id) not in GO_ROOTS:
+                go_class = "unknown"
+                for root in individual.get("root-type", []):
+                    root_id = root.get("id", "")
+                    if root_id.startswith("GO:") and _go_iri(root_id) in GO_ROOTS:
+                        go_class = GO_ROOTS[_go_iri(root_id)]
+                        break
+                go_terms[type_id] = [type_id, type_item.get("label", ""), go_class]
+            if type_id and not type_id.startswith(NON_GENE_PRODUCT_PREFIXES):
+                individual_map.setdefault(individual.get("id", ""), []).append((type_id, type_item.get("label", "")))
+        for ann in individual.get("annotations", []):
+            if ann.get("key", "") == "source":
+                pmids.update(_pmids(ann.get("value", "")))
+
+    gene_products = {}
+    for fact in model_data.get("facts", []):
+        if fact.get("property") == ENABLED_BY:
+            for gp_id, gp_label in individual_map.get(fact.get("object", ""), []):
+                gene_products.setdefault(gp_id, gp_label)
+        for ann in fact.get("annotations", []):
+            if ann.get("key", "") == "source":
+                pmids.update(_pmids(ann.get("value", "")))
+
+    return {
+        "id": model_data.get("id", ""),
+        "title": title or "",
+        "state": state or "",
+        "goterms": list(go_terms.values()),
+        "gene_products": [[gp_id, label] for gp_id, label in gene_products.items()],
+        "pmids": sorted(pmids),
+        **_causal_properties(model_data, individual_map, chain_lengths),
+    }
+
+
+def build_summaries(directory: str, previous: Optional[dict] = None) -> dict:
+    """
+    Summarize every ``<id>.json`` model of a model store directory.
+
+    Models whose file has the same size and modification time as when ``previous`` was
+    built keep their previous summary, so rebuilding after a sync only reads changed files.
+
+    :param directory: The GO-CAM model store directory.
+    :param previous: A summary table built earlier from the same directory, if any.
+    :return: The summary table: ``{"version": ..., "models": {model id: summary}}``.
+    """
+    reusable = {}
+    if previous and previous.get("version") == SUMMARY_FORMAT_VERSION:
+        reusable = previous.get("models", {})
+    models = {}
+    for entry in sorted(os.scandir(directory), key=lambda e: e.name):
+        if not entry.is_file() or not entry.name.endswith(".json"):
+            continue
+        model_id = entry.name[:-len(".json")]
+        stat = entry.stat()
+        source = [stat.st_size, stat.st_mtime_ns]
+        summary = reusable.get(model_id)
+        if summary is None or summary.get("source") != source:
+            try:
+                with open(entry.path) as f:
+                    summary = {**summarize_model(json.load(f), chain_lengths=True), "source": source}
+            except (OSError, ValueError) as e:
+                logger.warning(f"Skipping unreadable GO-CAM model {entry.path}: {e}")
+                continue
+        models[model_id] = summary
+    return {"version": SUMMARY_FORMAT_VERSION, "models": models}
+
+
+def write_summaries(table: dict, path: str):
+    """Write a summary table atomically, so readers never load a partial file."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    with os.fdopen(fd, "w") as f:
+        json.dump(table, f, separators=(",", ":"))
+    os.replace(tmp, path)
+
+
+def update_summary_file(path: str, directory: str) -> dict:
+    """
+    Build the summary table of a model store directory, reusing the table in ``path`` if any, and write it there.
+
+    :param path: The summary table JSON file.
+    :param directory: The GO-CAM model store directory.
+    :return: The summary table.
+    """
+    previous = None
+    if os.path.exists(path):
+        with open(path) as f:
+            previous = json.load(f)
+    table = build_summaries(directory, previous)
+    write_summaries(table, path)
+    logger.info(f"Wrote {len(table['models'])} GO-CAM model summaries to {path}")
+    return table
+
+
+def load_configured_gocam_summaries() -> Optional[dict]:
+    """
+    Load the summary table configured under ``gocam_summary_file`` and serve summaries from it.
+
+    Does nothing when no URL or path is configured. A table that cannot be loaded is
+    logged and models keep being summarized on request.
+
+    :return: The summaries by model id, or None.
+    """
+    if not (get_golr_config().get("gocam_summary_file") or {}).get("url"):
+        return None
+    try:
+        table = get_index_files("gocam_summary_file")
+    except Exception as e:
+        logger.error(f"Could not load the GO-CAM summary table, summarizing models on request: {e}")
+        return None
+    if table.get("version") != SUMMARY_FORMAT_VERSION:
+        logger.error(f"Ignoring GO-CAM summary table of format {table.get('version')}; rebuild it")
+        return None
+    set_gocam_summaries(table["models"])
+    return _summaries
+
+
+def set_gocam_summaries(summaries: Optional[dict]):
+    """Set (or with None, unset) the summaries by model id served by :func:`get_model_summary_async`."""
+    global _summaries
+    _summaries = summaries
+
+
+def has_causal_chain(properties: dict, gene_product_ids: Iterable[str]) -> bool:
+    """
+    Check from its summary table properties if a model has a causal pathway involving a gene product.
+
+    :param properties: The causal properties of the model, see :func:`get_causal_properties`.
+    :param gene_product_ids: The ids the gene product may be typed with in the model (e.g. its isoforms).
+    :return: True if a chain of at least ``MIN_CAUSAL_CHAIN`` functions runs through a function
+             the gene product enables, or if a chemical connects two functions of the model.
+    """
+    if properties["chemical_connection"]:
+        return True
+    chain_lengths = properties["chain_lengths"]
+    return any(chain_lengths.get(gp_id, 0) >= MIN_CAUSAL_CHAIN for gp_id in gene_product_ids)
+
+
+def get_causal_properties(id: str) -> Optional[dict]:
+    """
+    Return the causal pathway properties of a model from the summary table.
+
+    :param id: A GO-CAM identifier, with or without the ``gomodel:`` prefix.
+    :return: The ``causal_edges``, ``chemical_connection``, ``chain_lengths`` and ``causal_pathway``
+             of the model (see :func:`summarize_model`), or None when no table is loaded or the model is not in it.
+    """
+    summary = (_summaries or {}).get(strip_model_id(id))
+    if summary is None:
+        return None
+    return {key: summary[key] for key in ("causal_edges", "chemical_connection", "chain_lengths", "causal_pathway")}
+
+
+async def get_model_summary_async(id: str) -> dict:
+    """
+    Return the summary of a GO-CAM model, from the summary table or else from the model itself.
+
+    :param id: A GO-CAM identifier, with or without the ``gomodel:`` prefix.
+    :return: See :func:`summarize_model`.
+    :raises DataNotFoundException: If the model is in neither the table nor the model store.
+    """
+    if _summaries is not None:
+        summary = _summaries.get(strip_model_id(id))
+        if summary is not None:
+            return summary
+    return summarize_model(await gocam_store.get_async(id))
+
+
+async def get_model_summaries_async(ids: Iterable[str]) -> list[dict]:
+    """
+    Return the summaries of several GO-CAM models.
+
+    Summaries missing from the table are made from models loaded concurrently, up to
+    ``gocam_store.max_concurrency`` at once.
+
+    :param ids: GO-CAM identifiers, with or without the ``gomodel:`` prefix.
+    :return: The summaries (see :func:`summarize_model`), in the order of ``ids``.
+    :raises DataNotFoundException: If any model is in neither the table nor the model store.
+    """
+    ids = list(ids)
+    table = _summaries or {}
+    summaries = {id: table[strip_model_id(id)] for id in ids if strip_model_id(id) in table}
+    missing = [id for id in dict.fromkeys(ids) if id not in summaries]
+    if missing:
+        for id, model_data in zip(missing, await gocam_store.get_many_async(missing), strict=True):
+            summaries[id] = summarize_model(model_data)
+    return [summaries[id] for id in ids]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build (or update) the GO-CAM summary table from the model store.")
+    parser.add_argument("output", help="the summary table JSON file, updated incrementally when it exists")
+    parser.add_argument("--directory", default=get_gocam_store_config()["path"], help="the model store directory")
+    args = parser.parse_args()
+    if not args.directory:
+        parser.error("no directory given and gocam_store.path is not set in config.yaml")
+    update_summary_file(args.output, args.directory)
@@ -1,20 +1,151 @@
 """golr utils."""
 
+import json
+from typing import Optional
+from urllib.parse import parse_qsl, quote, urlencode
 from zipfile import error
 
+import httpx
 import requests
+from fastapi.concurrency import run_in_threadpool
 
 from app.exceptions.global_exceptions import DataNotFoundException
+from app.utils.cache_backends import CacheBackend, MemoryCacheBackend, cache_not_found, create_cache_backend
+from app.utils.http_clients import get_async_client, get_session
+from app.utils.id_mapping import lookup_uniprot_ids
 from app.utils.mygene_utils import gene_to_uniprot_from_mygene
 from app.utils.retry_utils import retry_on_golr_error
-from app.utils.settings import ESOLR, ESOLRDoc, logger
+from app.utils.settings import ESOLR, ESOLRDoc, get_golr_config, logger
+from app.utils.singleflight import SingleFlight
 
+GOLR_TIMEOUT_SECONDS = 60
 
-# Respect the method name for run_sparql_on with enums
-@retry_on_golr_error(max_retries=3, delay=2)
-def run_solr_on(solr_instance, category, id, fields):
-    """Return the result of a Solr query."""
-    query = (
+# Query parameters that only affect how Solr formats its response, not what it returns.
+PRESENTATION_PARAMS = frozenset({"indent"})
+
+# Concurrent identical GOlr queries share a single upstream request.
+golr_single_flight = SingleFlight()
+
+# Defaults for the ``golr_cache`` section of config.yaml. Ontology documents only change
+# with GO releases; annotations and bioentities are refreshed more often.
+DEFAULT_CACHE_CONFIG = {
+    "enabled": True,
+    "max_bytes": 64 * 1024 * 1024,
+    "ttl_seconds": {
+        "ontology_class": 86400,
+        "bioentity": 3600,
+        "annotation": 900,
+        "default": 900,
+    },
+}
+
+
+def normalize_solr_query(query: str) -> str:
+    """
+    Normalize a GOlr URL so that equivalent queries map to the same key.
+
+    Parameters are decoded, presentation-only parameters are dropped and the remaining
+    parameters are sorted, so e.g. the order of ``fq`` clauses does not matter.
+
+    :param query: A GOlr select URL.
+    :return: The normalized query.
+    """
+    base, _, params = query.partition("?")
+    pairs = [(k, v) for k, v in parse_qsl(params, keep_blank_values=True) if k not in PRESENTATION_PARAMS]
+    return base + "?" + urlencode(sorted(pairs))
+
+
+def _query_category(query: str) -> Optional[str]:
+    """Return the document_category a GOlr query is filtered on, if any."""
+    _, _, params = query.partition("?")
+    for key, value in parse_qsl(params, keep_blank_values=True):
+        if key == "fq" and value.startswith("document_category:"):
+            return value.partition(":")[2].strip('"')
+    return None
+
+
+class GolrResponseCache:
+
+    """
+    A bounded TTL + LRU cache of parsed GOlr responses.
+
+    Entries are keyed by the normalized query and expire after the TTL configured for
+    the query's document category. Entries hold the response body as received, so its size
+    is the entry's footprint; when the total exceeds ``max_bytes`` the least recently used
+    entries are evicted. Each hit parses the body again, so callers may mutate what they get.
+    Entries are held by a :class:`~app.utils.cache_backends.CacheBackend`, private to the
+    worker process by default or shared by all workers (see ``cache_backend`` in config.yaml).
+
+    :param max_bytes: The maximum total footprint of the cached responses.
+    :param ttl_seconds: TTLs by document category, with a ``default`` for other queries.
+    :param enabled: Whether responses are cached at all.
+    :param backend: The store holding the entries, defaulting to a per-process memory cache.
+    """
+
+    def __init__(self, max_bytes: int, ttl_seconds: dict, enabled: bool = True,
+                 backend: Optional[CacheBackend] = None):
+        """Initialize an empty cache."""
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled
+        self.backend = backend if backend is not None else MemoryCacheBackend(max_bytes)
+
+    @classmethod
+    def from_config(cls, config: Optional[dict]) -> "GolrResponseCache":
+        """
+        Create a cache from the ``golr_cache`` section of config.yaml, stored in the configured backend.
+
+        :param config: The section, or None to use :data:`DEFAULT_CACHE_CONFIG`.
+        :return: The cache.
+        """
+        config = {**DEFAULT_CACHE_CONFIG, **(config or {})}
+        ttl_seconds = {**DEFAULT_CACHE_CONFIG["ttl_seconds"], **(config.get("ttl_seconds") or {})}
+        backend = create_cache_backend("golr", max_bytes=config["max_bytes"], ttl_seconds=ttl_seconds["default"])
+        return cls(max_bytes=config["max_bytes"], ttl_seconds=ttl_seconds, enabled=config["enabled"],
+                   backend=backend)
+
+    def ttl_for(self, key: str) -> float:
+        """Return the TTL in seconds for a normalized query, based on its document category."""
+        return self.ttl_seconds.get(_query_category(key), self.ttl_seconds["default"])
+
+    def get(self, key: str) -> Optional[dict]:
+        """
+        Return the cached response for ``key``, freshly parsed, or None on a miss or expired entry.
+
+        :param key: The normalized query.
+        :return: The parsed response, or None.
+        """
+        if not self.enabled:
+            return None
+        body = self.backend.get(key)
+        return None if body is None else json.loads(body)
+
+    def put(self, key: str, body: str, size: int):
+        """
+        Cache a response body with the TTL of its document category.
+
+        :param key: The normalized query.
+        :param body: The JSON body of the response.
+        :param size: The footprint of the response in bytes (the length of its body).
+        """
+        if not self.enabled:
+            return
+        self.backend.set(key, body, ttl=self.ttl_for(key), size=size)
+
+    def clear(self):
+        """Drop every entry and reset the counters."""
+        self.backend.clear()
+
+    def stats(self) -> dict:
+        """Return the hit/miss counters and current size of the cache."""
+        return self.backend.stats()
+
+
+golr_cache = GolrResponseCache.from_config(get_golr_config().get("golr_cache"))
+
+
+def _build_solr_on_query(solr_instance, category, id, fields) -> str:
+    """Build the GOlr URL used to fetch a single document by id."""
+    return (
         solr_instance.value
         + 'select?q=*:*&fq=document_category:"'
         + category.value
@@ -25,17 +156,140 @@ def run_solr_on(solr_instance, category, id, fields):
         + "&wt=json&indent=on"
     )
 
+
+def _build_solr_text_query(solr_instance, category, q: str, qf: str, fields: str, optionals: str, highlight: bool):
+    """Build the GOlr URL used by :func:`gu_run_solr_text_on` and its async counterpart."""
+    if optionals is None:
+        optionals = ""
+    query = (
+        solr_instance.value
+        + "select?q="
+        + q
+        + "&qf="
+        + qf
+        + '&fq=document_category:"'
+        + category.value
+        + '"&fl='
+        + fields
+    )
+
+    # Only add highlighting parameters if requested
+    if highlight:
+        query += ("&hl=on&hl.snippets=1000&hl.fl=bioentity_name_searchable,bioentity_label_searchable,bioentity_class,"
+                  + "annotation_class_label_searchable,&hl.requireFieldMatch=true")
+
+    query += "&wt=json&indent=on" + optionals
+    return query
+
+
+def _process_solr_text_response(response_json: dict, highlight: bool) -> list:
+    """
+    Post-process the docs of a GOlr text query.
+
+    Solr returns matching text in the field "highlighting", but it is not included in the docs.
+    We add it to each doc here to make it easier to use. Highlighting is keyed by the id of the document.
+    MGI ids are also normalised from the legacy MGI:MGI: form.
+    """
+    if highlight:
+        highlight_added = []
+        for doc in response_json["response"]["docs"]:
+            if doc.get("id") is not None and doc.get("id") in response_json["highlighting"]:
+                doc["highlighting"] = response_json["highlighting"][doc["id"]]
+                if doc.get("id").startswith("MGI:"):
+                    doc["id"] = doc["id"].replace("MGI:MGI:", "MGI:")
+            else:
+                doc["highlighting"] = {}
+            highlight_added.append(doc)
+        return highlight_added
+    return_doc = []
+    for doc in response_json["response"]["docs"]:
+        if doc.get("id") is not None and doc.get("id").startswith("MGI:"):
+            doc["id"] = doc["id"].replace("MGI:MGI:", "MGI:")
+        return_doc.append(doc)
+    return return_doc
+
+
+def _build_isoform_query(entity_id: str) -> str:
+    """Build the GOlr facet query listing the isoforms annotated for a bioentity."""
+    return (
+        ESOLR.GOLR.value
+        + 'select?q=*:*&fq=document_category:"'
+        + ESOLRDoc.ANNOTATION.value
+        + '"&fq=bioentity:"'
+        + entity_id
+        + '"&rows=0&facet=true&facet.field=bioentity_isoform&facet.mincount=1&facet.limit=-1&wt=json'
+    )
+
+
+def _parse_isoform_facets(data: dict) -> list[str]:
+    """Extract isoform ids from a facet response, which is alternating [value, count, value, count, ...]."""
+    facet_list = (
+        data.get("facet_counts", {})
+        .get("facet_fields", {})
+        .get("bioentity_isoform", [])
+    )
+    return [facet_list[i] for i in range(0, len(facet_list), 2) if facet_list[i]]
+
+
+def _get_golr_json(query: str) -> dict:
+    """Return the parsed JSON body of a GOlr query, from :data:`golr_cache` when possible."""
+    key = normalize_solr_query(query)
+    cached = golr_cache.get(key)
+    if cached is not None:
+        return cached
+    response = get_session(query).get(query, timeout=GOLR_TIMEOUT_SECONDS)
+    response.raise_for_status()  # Raise an error for non-2xx responses
+    try:
+        response_json = response.json()
+    except requests.exceptions.JSONDecodeError as e:
+        logger.error(f"Failed to parse JSON response from GOLr: {e}")
+        raise ValueError(f"Invalid JSON response from GOLr server: {e}") from e
+    golr_cache.put(key, response.text, len(response.content))
+    return response_json
+
+
+async def _async_fetch_golr_json(query: str, key: str, cache: bool = True) -> dict:
+    """Fetch a GOlr URL with the shared async client, cache it under ``key`` unless told not to, and return its JSON."""
+    response = await get_async_client(query).get(query, timeout=GOLR_TIMEOUT_SECONDS)
+    response.raise_for_status()  # Raise an error for non-2xx responses
+    try:
+        response_json = response.json()
+    except ValueError as e:
+        logger.error(f"Failed to parse JSON response from GOLr: {e}")
+        raise ValueError(f"Invalid JSON response from GOLr server: {e}") from e
+    if cache:
+        await run_in_threadpool(golr_cache.put, key, response.text, len(response.content))
+    return response_json
+
+
+async def _async_get_golr_json(query: str, fresh: bool = False, cache: bool = True) -> dict:
+    """
+    Return the parsed JSON body of a GOlr query, from :data:`golr_cache` when possible.
+
+    On a miss, callers issuing the same normalized query while it is in flight await that
+    one upstream request and each receive their own copy of its parsed result. With ``fresh``
+    the cached response is ignored; the one fetched instead replaces it in the cache. Without
+    ``cache`` the cache is neither read nor written, e.g. for large pages of docs that would only
+    evict the entries the cache is for. The cache is read and written from the thread pool, as a
+    shared backend may wait on other workers.
+    """
+    key = normalize_solr_query(query)
+    cached = None if fresh or not cache else await run_in_threadpool(golr_cache.get, key)
+    if cached is not None:
+        return cached
+    return await golr_single_flight.do(key, lambda: _async_fetch_golr_json(query, key, cache))
+
+
+# Respect the method name for run_sparql_on with enums
+@retry_on_golr_error(max_retries=3, delay=2)
+def run_solr_on(solr_instance, category, id, fields):
+    """Return the result of a Solr query."""
+    query = _build_solr_on_query(solr_instance, category, id, fields)
+
     logger.info(f"Solr query: {query}")
-    timeout_seconds = 60
 
     try:
-        response = requests.get(query, timeout=timeout_seconds)
-        response.raise_for_status()  # Raise an error for non-2xx responses
-        try:
-            response_json = response.json()
-        except requests.exceptions.JSONDecodeError as e:
-            logger.error(f"Failed to parse JSON response from GOLr: {e}")
-            raise ValueError(f"Invalid JSON response from GOLr server: {e}") from e
+        response_json = _get_golr_json(query)
         logger.info("Solr response JSON:", response_json)
 
         docs = response_json.get("response", {}).get("docs", [])
@@ -54,6 +308,33 @@ def run_solr_on(solr_instance, category, id, fields):
         raise
 
 
+@retry_on_golr_error(max_retries=3, delay=2)
+async def run_solr_on_async(solr_instance, category, id, fields):
+    """
+    Return the first document matching an id, without blocking the event loop.
+
+    Async counterpart of :func:`run_solr_on` backed by the shared pooled client.
+
+    :raises DataNotFoundException: If no document matches the id.
+    """
+    query = _build_solr_on_query(solr_instance, category, id, fields)
+    logger.info(f"Solr query: {query}")
+
+    try:
+        response_json = await _async_get_golr_json(query)
+    except httpx.TimeoutException as e:
+        logger.info(f"Request timed out: {e}")
+        raise
+    except httpx.HTTPError as e:
+        logger.info(f"Request failed: {e}")
+        raise
+
+    docs = response_json.get("response", {}).get("docs", [])
+    if not docs:
+        raise DataNotFoundException(detail=f"Item with ID {id} not found")
+    return docs[0]
+
+
 # (ESOLR.GOLR, ESOLRDoc.ANNOTATION, q, qf, fields, fq, False)
 @retry_on_golr_error(max_retries=3, delay=2)
 def gu_run_solr_text_on(
@@ -73,67 +354,46 @@ def gu_run_solr_text_on(
     :return: The result of the query
 
     """
-    solr_url = solr_instance.value
+    query = _build_solr_text_query(solr_instance, category, q, qf, fields, optionals, highlight)
+    logger.info(query)
 
-    if optionals is None:
-        optionals = ""
-    query = (
-        solr_url
-        + "select?q="
-        + q
-        + "&qf="
-        + qf
-        + '&fq=document_category:"'
-        + category.value
-        + '"&fl='
-        + fields
-    )
+    try:
+        response_json = _get_golr_json(query)
+        return _process_solr_text_response(response_json, highlight)
+    except requests.Timeout as e:
+        logger.error(f"Request timed out: {e}")
+        raise
+    except requests.RequestException as e:
+        logger.error(f"Request error: {e}")
+        raise
 
-    # Only add highlighting parameters if requested
-    if highlight:
-        query += ("&hl=on&hl.snippets=1000&hl.fl=bioentity_name_searchable,bioentity_label_searchable,bioentity_class,"
-                  + "annotation_class_label_searchable,&hl.requireFieldMatch=true")
 
-    query += "&wt=json&indent=on" + optionals
+@retry_on_golr_error(max_retries=3, delay=2)
+async def gu_run_solr_text_on_async(
+    solr_instance, category: str, q: str, qf: str, fields: str, optionals: str, highlight: bool = False,
+    fresh: bool = False, cache: bool = True,
+):
+    """
+    Return the result of a solr query, without blocking the event loop.
+
+    Async counterpart of :func:`gu_run_solr_text_on`; see it for the other parameters.
+
+    :param fresh: Whether to query GOlr even when the response is cached.
+    :param cache: Whether to use the response cache at all.
+    :return: The docs of the query result
+    """
+    query = _build_solr_text_query(solr_instance, category, q, qf, fields, optionals, highlight)
     logger.info(query)
-    timeout_seconds = 60  # Set the desired timeout value in seconds
 
     try:
-        response = requests.get(query, timeout=timeout_seconds)
-        response.raise_for_status()  # Raise an error for non-2xx responses
-        try:
-            response_json = response.json()
-        except requests.exceptions.JSONDecodeError as e:
-            logger.error(f"Failed to parse JSON response from GOLr: {e}")
-            raise ValueError(f"Invalid JSON response from GOLr server: {e}") from e
-
-        # solr returns matching text in the field "highlighting", but it is not included in the response.
-        # We add it to the response here to make it easier to use. Highlighting is keyed by the id of the document
-        if highlight:
-            highlight_added = []
-            for doc in response_json["response"]["docs"]:
-                if doc.get("id") is not None and doc.get("id") in response_json["highlighting"]:
-                    doc["highlighting"] = response_json["highlighting"][doc["id"]]
-                    if doc.get("id").startswith("MGI:"):
-                        doc["id"] = doc["id"].replace("MGI:MGI:", "MGI:")
-                else:
-                    doc["highlighting"] = {}
-                highlight_added.append(doc)
-            return highlight_added
-        else:
-            return_doc = []
-            for doc in response_json["response"]["docs"]:
-                if doc.get("id") is not None and doc.get("id").startswith("MGI:"):
-                    doc["id"] = doc["id"].replace("MGI:MGI:", "MGI:")
-                return_doc.append(doc)
-            return return_doc
-            # Process the response here
-    except requests.Timeout as e:
+        response_json = await _async_get_golr_json(query, fresh, cache)
+    except httpx.TimeoutException as e:
         logger.error(f"Request timed out: {e}")
         raise
-    except requests.RequestException as e:
+    except httpx.HTTPError as e:
         logger.error(f"Request error: {e}")
         raise
+    return _process_solr_text_response(response_json, highlight)
 
 
 @retry_on_golr_error(max_retries=3, delay=2)
@@ -154,32 +414,84 @@ def get_bioentity_isoforms(entity_id: str) -> list[str]:
     :param entity_id: A canonical bioentity CURIE (e.g. "UniProtKB:P08887")
     :return: List of isoform CURIEs (may include the canonical ID itself)
     """
-    query = (
-        ESOLR.GOLR.value
+    data = _get_golr_json(_build_isoform_query(entity_id))
+    return _parse_isoform_facets(data)
+
+
+@retry_on_golr_error(max_retries=3, delay=2)
+async def get_bioentity_isoforms_async(entity_id: str) -> list[str]:
+    """
+    Query GOlr annotations for the isoform IDs of a canonical bioentity, without blocking the event loop.
+
+    Async counterpart of :func:`get_bioentity_isoforms`.
+
+    :param entity_id: A canonical bioentity CURIE (e.g. "UniProtKB:P08887")
+    :return: List of isoform CURIEs (may include the canonical ID itself)
+    """
+    data = await _async_get_golr_json(_build_isoform_query(entity_id))
+    return _parse_isoform_facets(data)
+
+
+@retry_on_golr_error(max_retries=3, delay=2)
+async def run_solr_docs_async(solr_instance, category, fields: str, optionals: str, cache: bool = True) -> list:
+    """
+    Return the docs of a GOlr query as they are stored, without the post-processing of gu_run_solr_text_on.
+
+    :param solr_instance: The Solr instance (e.g. ESOLR.GOLR)
+    :param category: The document category to query (e.g. ESOLRDoc.ANNOTATION)
+    :param fields: The fields to return, comma separated
+    :param optionals: Additional query parameters, e.g. filter queries starting with ``&fq=``
+    :param cache: Whether to use the response cache at all.
+    :return: The docs of the query result
+    """
+    query = _build_solr_text_query(solr_instance, category, "*:*", "", fields, optionals, False)
+    logger.info(query)
+    response_json = await _async_get_golr_json(query, cache=cache)
+    return response_json.get("response", {}).get("docs", [])
+
+
+def _build_json_facet_query(solr_instance, category, optionals: str, facets: dict) -> str:
+    """Build a GOlr query returning JSON Facet API results only (rows=0)."""
+    return (
+        solr_instance.value
         + 'select?q=*:*&fq=document_category:"'
-        + ESOLRDoc.ANNOTATION.value
-        + '"&fq=bioentity:"'
-        + entity_id
-        + '"&rows=0&facet=true&facet.field=bioentity_isoform&facet.mincount=1&facet.limit=-1&wt=json'
+        + category.value
+        + '"&rows=0&wt=json'
+        + optionals
+        + "&json.facet="
+        + quote(json.dumps(facets, separators=(",", ":")))
     )
 
-    timeout_seconds = 60
-    response = requests.get(query, timeout=timeout_seconds)
-    response.raise_for_status()
-    try:
-        data = response.json()
-    except requests.exceptions.JSONDecodeError as e:
-        logger.error(f"Failed to parse JSON response from GOLr: {e}")
-        raise ValueError(f"Invalid JSON response from GOLr server: {e}") from e
-    # Facet field response is alternating [value, count, value, count, ...]
-    facet_list = (
-        data.get("facet_counts", {})
-        .get("facet_fields", {})
-        .get("bioentity_isoform", [])
-    )
-    return [facet_list[i] for i in range(0, len(facet_list), 2) if facet_list[i]]
+
+@retry_on_golr_error(max_retries=3, delay=2)
+async def run_solr_json_facets_async(solr_instance, category, optionals: str, facets: dict) -> dict:
+    """
+    Return the JSON Facet API results of a GOlr query, without fetching any docs.
+
+    :param solr_instance: The Solr instance (e.g. ESOLR.GOLR)
+    :param category: The document category to query (e.g. ESOLRDoc.ANNOTATION)
+    :param optionals: Additional query parameters, e.g. filter queries starting with ``&fq=``
+    :param facets: The ``json.facet`` request
+    :return: The ``facets`` section of the response
+    """
+    query = _build_json_facet_query(solr_instance, category, optionals, facets)
+    logger.info(query)
+    response_json = await _async_get_golr_json(query)
+    return response_json.get("facets", {})
+
+
+def check_bioentity_format(entity_id: str):
+    """
+    Check that a bioentity identifier is a CURIE, without querying GOlr.
+
+    :param entity_id: The bioentity identifier
+    :raises ValueError: If the identifier has no prefix.
+    """
+    if ":" not in entity_id:
+        raise ValueError("Invalid CURIE format")
 
 
+@cache_not_found("bioentity")
 def is_valid_bioentity(entity_id) -> bool:
     """
     Check if the provided identifier is valid by querying the AmiGO Solr (GOLR) instance.
@@ -190,8 +502,7 @@ def is_valid_bioentity(entity_id) -> bool:
     :rtype: bool
     """
     # Ensure the GO ID starts with the proper prefix
-    if ":" not in entity_id:
-        raise ValueError("Invalid CURIE format")
+    check_bioentity_format(entity_id)
 
     if "MGI:" in entity_id:
         if "MGI:MGI:" in entity_id:
@@ -208,7 +519,7 @@ def is_valid_bioentity(entity_id) -> bool:
     except DataNotFoundException:
         if "HGNC" in entity_id:
             try:
-                fix_possible_hgnc_id = gene_to_uniprot_from_mygene(entity_id)
+                fix_possible_hgnc_id = lookup_uniprot_ids(entity_id) or gene_to_uniprot_from_mygene(entity_id)
             except DataNotFoundException as e:
                 logger.info(f"Data Not Found Exception occurred: {e}")
                 # Propagate the exception and return False
@@ -229,3 +540,48 @@ def is_valid_bioentity(entity_id) -> bool:
         logger.info(f"Unexpected error in gene_to_uniprot_from_mygene: {e}")
         return False
     return False
+
+
+@cache_not_found("bioentity")
+async def is_valid_bioentity_async(entity_id) -> bool:
+    """
+    Check if the provided bioentity identifier is known to GOlr, without blocking the event loop.
+
+    Async counterpart of :func:`is_valid_bioentity`. HGNC identifiers missing from GOlr are
+    mapped to UniProtKB with the local mapping table, or else through MyGene.info (in a worker
+    thread), and checked again.
+
+    :param entity_id: The bioentity identifier
+    :type entity_id: str
+    :return: True if the entity identifier is valid, False otherwise.
+    :rtype: bool
+    """
+    check_bioentity_format(entity_id)
+
+    if "MGI:" in entity_id and "MGI:MGI:" not in entity_id:
+        entity_id = entity_id.replace("MGI:", "MGI:MGI:")
+
+    fields = ""
+
+    try:
+        data = await run_solr_on_async(ESOLR.GOLR, ESOLRDoc.BIOENTITY, entity_id, fields)
+        if data:
+            return True
+    except DataNotFoundException:
+        if "HGNC" not in entity_id:
+            raise DataNotFoundException(detail=f"Bioentity with ID {entity_id} not found") from error
+        try:
+            fix_possible_hgnc_id = lookup_uniprot_ids(entity_id)
+            if not fix_possible_hgnc_id:
+                fix_possible_hgnc_id = await run_in_threadpool(gene_to_uniprot_from_mygene, entity_id)
+            if fix_possible_hgnc_id:
+                data = await run_solr_on_async(ESOLR.GOLR, ESOLRDoc.BIOENTITY, fix_possible_hgnc_id[0], fields)
+                if data:
+                    return True
+        except DataNotFoundException as e:
+            logger.info(f"Data Not Found Exception occurred: {e}")
+            raise e from error
+    except Exception as e:
+        logger.info(f"Unexpected error in gene_to_uniprot_from_mygene: {e}")
+        return False
+    return False
@@ -0,0 +1,118 @@
+"""Shared, pooled HTTP clients for upstream services (GOlr, S3, Alliance, ...)."""
+
+import asyncio
+import logging
+import threading
+from urllib.parse import urlparse
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger()
+
+DEFAULT_POOL_CONFIG = {
+    "max_connections": 100,
+    "max_keepalive_connections": 20,
+    "keepalive_expiry": 30,
+}
+
+# One requests.Session per upstream host, shared by every thread of the worker.
+_sessions: dict = {}
+# One httpx.AsyncClient per upstream host, bound to the event loop it was created on.
+_async_clients: dict = {}
+_async_clients_loop = None
+_lock = threading.Lock()
+
+
+def get_pool_config() -> dict:
+    """
+    Return the connection pool limits from the ``upstream_http`` section of config.yaml.
+
+    :return: A dict with max_connections, max_keepalive_connections and keepalive_expiry.
+    """
+    from app.utils.settings import get_golr_config
+
+    return {**DEFAULT_POOL_CONFIG, **(get_golr_config().get("upstream_http") or {})}
+
+
+def _host_key(url: str) -> str:
+    """Return the scheme and host of a URL, which identifies its connection pool."""
+    parsed = urlparse(url)
+    return f"{parsed.scheme}://{parsed.netloc}"
+
+
+def _user_agent() -> str:
+    """Return the User-Agent header sent upstream."""
+    from app.utils.settings import get_user_agent
+
+    return get_user_agent()
+
+
+def get_session(url: str) -> requests.Session:
+    """
+    Return the keep-alive requests session for the host of ``url``, creating it on first use.
+
+    :param url: Any URL on the upstream host.
+    :return: A pooled requests.Session
+    """
+    key = _host_key(url)
+    session = _sessions.get(key)
+    if session is None:
+        with _lock:
+            session = _sessions.get(key)
+            if session is None:
+                config = get_pool_config()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=config["max_keepalive_connections"])
+                session = requests.Session()
+                session.headers["User-Agent"] = _user_agent()
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                _sessions[key] = session
+                logger.info(f"Opened upstream session pool for {key}")
+    return session
+
+
+def get_async_client(url: str) -> httpx.AsyncClient:
+    """
+    Return the pooled async client for the host of ``url``, creating it on first use.
+
+    Clients are bound to the running event loop; when called from a different loop
+    (e.g. a new test client) the registry is reset and fresh clients are created.
+
+    :param url: Any URL on the upstream host.
+    :return: A pooled httpx.AsyncClient
+    """
+    global _async_clients_loop
+    loop = asyncio.get_running_loop()
+    if _async_clients_loop is not loop:
+        _async_clients.clear()
+        _async_clients_loop = loop
+
+    key = _host_key(url)
+    client = _async_clients.get(key)
+    if client is None or client.is_closed:
+        config = get_pool_config()
+        limits = httpx.Limits(
+            max_connections=config["max_connections"],
+            max_keepalive_connections=config["max_keepalive_connections"],
+            keepalive_expiry=config["keepalive_expiry"],
+        )
+        client = httpx.AsyncClient(limits=limits, headers={"User-Agent": _user_agent()})
+        _async_clients[key] = client
+        logger.info(f"Opened upstream async pool for {key}")
+    return client
+
+
+async def close_upstream_clients():
+    """Close every pooled session and async client; called on application shutdown."""
+    global _async_clients_loop
+    for client in list(_async_clients.values()):
+        if not client.is_closed:
+            await client.aclose()
+    _async_clients.clear()
+    _async_clients_loop = None
+    with _lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
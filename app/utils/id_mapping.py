@@ -0,0 +1,254 @@
+"""Compact in-memory gene <-> UniProtKB cross-reference table loaded from a local file."""
+
+import bisect
+import csv
+import json
+import logging
+from array import array
+from typing import Iterable, Iterator, Optional
+
+logger = logging.getLogger()
+
+_table = None
+
+
+def _uniprot_curie(id: str) -> str:
+    """Return ``id`` as a ``UniProtKB:`` CURIE (bare accessions get the prefix)."""
+    return id if id.startswith("UniProtKB:") else f"UniProtKB:{id}"
+
+
+class SortedIds:
+
+    """
+    A sorted, immutable list of identifiers stored as one string and an offsets array.
+
+    Holding tens of thousands of CURIEs this way costs a few bytes of overhead per
+    identifier instead of a Python object each. It supports ``len``, indexing and
+    :meth:`index`, so :mod:`bisect` can search it.
+
+    :param ids: The identifiers, sorted and without duplicates.
+    """
+
+    def __init__(self, ids: list[str]):
+        """Pack the identifiers."""
+        self._blob = "".join(ids)
+        self._offsets = array("l", [0] * (len(ids) + 1))
+        for i, id in enumerate(ids):
+            self._offsets[i + 1] = self._offsets[i] + len(id)
+
+    def __len__(self) -> int:
+        """Return the number of identifiers."""
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i: int) -> str:
+        """Return the ``i``-th identifier."""
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return self._blob[self._offsets[i]:self._offsets[i + 1]]
+
+    def index(self, id: str) -> int:
+        """Return the position of ``id``, or -1 when it is not in the list."""
+        i = bisect.bisect_left(self, id)
+        return i if i < len(self) and self[i] == id else -1
+
+
+class IdMappingTable:
+
+    """
+    Gene <-> UniProtKB cross-references indexed in both directions.
+
+    Genes and proteins are kept in :class:`SortedIds` lists. The proteins of gene ``i`` are
+    ``protein_targets[protein_offsets[i]:protein_offsets[i + 1]]`` (compressed sparse rows
+    of protein indices, in the order the file lists them), and the genes of a protein are
+    stored the same way in ``gene_offsets``/``gene_targets``.
+
+    :param pairs: ``(gene id, UniProtKB id)`` cross-references; duplicates are ignored.
+    """
+
+    def __init__(self, pairs: Iterable[tuple[str, str]]):
+        """Index the cross-references."""
+        pairs = list(dict.fromkeys((gene, _uniprot_curie(protein)) for gene, protein in pairs))
+        self.genes = SortedIds(sorted({gene for gene, _ in pairs}))
+        self.proteins = SortedIds(sorted({protein for _, protein in pairs}))
+        edges = [(self.genes.index(gene), self.proteins.index(protein)) for gene, protein in pairs]
+        self.protein_offsets, self.protein_targets = self._csr(len(self.genes), edges)
+        self.gene_offsets, self.gene_targets = self._csr(len(self.proteins), [(p, g) for g, p in edges])
+
+    @staticmethod
+    def _csr(size: int, edges: list[tuple[int, int]]) -> tuple[array, array]:
+        """Return the offsets and targets arrays of the edges grouped by source, keeping their order."""
+        edges = sorted(edges, key=lambda edge: edge[0])
+        offsets = array("l", [0] * (size + 1))
+        for source, _ in edges:
+            offsets[source + 1] += 1
+        for i in range(size):
+            offsets[i + 1] += offsets[i]
+        return offsets, array("l", (target for _, target in edges))
+
+    def __len__(self) -> int:
+        """Return the number of genes with cross-references."""
+        return len(self.genes)
+
+    def gene_to_uniprot(self, gene_id: str) -> list[str]:
+        """
+        Return the UniProtKB ids of a gene.
+
+        :param gene_id: A gene CURIE as written in the mapping file (e.g. ``HGNC:11998``).
+        :return: ``UniProtKB:`` CURIEs; empty when the gene is not in the table.
+        """
+        i = self.genes.index(gene_id)
+        if i < 0:
+            return []
+        targets = self.protein_targets[self.protein_offsets[i]:self.protein_offsets[i + 1]]
+        return [self.proteins[j] for j in targets]
+
+    def uniprot_to_gene(self, uniprot_id: str) -> list[str]:
+        """
+        Return the genes of a UniProtKB protein.
+
+        :param uniprot_id: A UniProtKB id, with or without the ``UniProtKB:`` prefix.
+        :return: Gene CURIEs; empty when the protein is not in the table.
+        """
+        i = self.proteins.index(_uniprot_curie(uniprot_id))
+        if i < 0:
+            return []
+        return [self.genes[j] for j in self.gene_targets[self.gene_offsets[i]:self.gene_offsets[i + 1]]]
+
+
+def read_hgnc_uniprot_mappings(path: str) -> Iterator[tuple[list[str], list[str]]]:
+    """
+    Read the gene to UniProtKB cross-references of an HGNC complete set TSV dump.
+
+    :param path: The path of ``hgnc_complete_set.txt`` (or any TSV with the same columns).
+    :return: ``(gene_ids, uniprot_ids)`` for every gene with UniProt ids, where ``gene_ids`` is the
+             HGNC id followed by the NCBIGene and ENSEMBL ids of the gene when known.
+    :raises ValueError: If the file has no ``hgnc_id`` or ``uniprot_ids`` column.
+    """
+    with open(path, newline="") as f:
+        reader = csv.DictReader(f, delimiter="\t")
+        if not {"hgnc_id", "uniprot_ids"} <= set(reader.fieldnames or []):
+            raise ValueError(f"{path} is not an HGNC TSV dump with hgnc_id and uniprot_ids columns")
+        for row in reader:
+            uniprot_ids = [f"UniProtKB:{x}" for x in (row["uniprot_ids"] or "").split("|") if x]
+            if not row["hgnc_id"] or not uniprot_ids:
+                continue
+            gene_ids = [row["hgnc_id"]]
+            if row.get("entrez_id"):
+                gene_ids.append(f"NCBIGene:{row['entrez_id']}")
+            if row.get("ensembl_gene_id"):
+                gene_ids.append(f"ENSEMBL:{row['ensembl_gene_id']}")
+            yield gene_ids, uniprot_ids
+
+
+def read_id_mapping_pairs(path: str) -> Iterator[tuple[str, str]]:
+    """
+    Read the ``(gene id, UniProtKB id)`` cross-references of a mapping file.
+
+    Three layouts are understood: a JSON object from gene ids to lists of UniProtKB ids
+    (``.json``), an HGNC complete set TSV dump (recognized by its ``hgnc_id`` and
+    ``uniprot_ids`` columns), and a two column gene/UniProtKB TSV where blank lines and
+    lines starting with ``#`` are skipped.
+
+    :param path: The path of the mapping file.
+    :return: The cross-references, in file order.
+    :raises ValueError: If the file does not have one of these layouts.
+    """
+    if path.endswith(".json"):
+        with open(path) as f:
+            data = json.load(f)
+        if not isinstance(data, dict):
+            raise ValueError(f"{path} must hold a JSON object from gene ids to UniProtKB ids")
+        for gene_id, uniprot_ids in data.items():
+            for uniprot_id in [uniprot_ids] if isinstance(uniprot_ids, str) else uniprot_ids:
+                yield gene_id, uniprot_id
+        return
+
+    with open(path) as f:
+        header = f.readline().rstrip("\n").split("\t")
+    if {"hgnc_id", "uniprot_ids"} <= set(header):
+        for gene_ids, uniprot_ids in read_hgnc_uniprot_mappings(path):
+            for gene_id in gene_ids:
+                for uniprot_id in uniprot_ids:
+                    yield gene_id, uniprot_id
+        return
+
+    with open(path) as f:
+        for number, line in enumerate(f, 1):
+            if not line.strip() or line.startswith("#"):
+                continue
+            columns = line.rstrip("\n").split("\t")
+            if len(columns) < 2:
+                raise ValueError(f"{path}:{number}: expected a gene id and a UniProtKB id")
+            yield columns[0], columns[1]
+
+
+def load_id_mapping(path: str) -> IdMappingTable:
+    """
+    Load a mapping file into an :class:`IdMappingTable`.
+
+    :param path: The path of the mapping file (see :func:`read_id_mapping_pairs`).
+    :return: The table.
+    """
+    table = IdMappingTable(read_id_mapping_pairs(path))
+    logger.info(f"Loaded {len(table)} genes and {len(table.proteins)} UniProtKB proteins from {path}")
+    return table
+
+
+def get_id_mapping_path() -> Optional[str]:
+    """Return the mapping file configured under ``id_mapping.path`` in config.yaml, if any."""
+    from app.utils.settings import get_golr_config
+
+    return (get_golr_config().get("id_mapping") or {}).get("path") or None
+
+
+def load_configured_id_mapping() -> Optional[IdMappingTable]:
+    """
+    Load the configured mapping file and make it the table returned by :func:`get_id_mapping`.
+
+    Does nothing when no path is configured. A file that cannot be read is logged and
+    identifiers keep being translated by MyGene.info and the Alliance.
+
+    :return: The loaded table, or None.
+    """
+    path = get_id_mapping_path()
+    if path is None:
+        return None
+    try:
+        set_id_mapping(load_id_mapping(path))
+    except (OSError, ValueError) as e:
+        logger.error(f"Could not load the identifier mapping table from {path}, using remote lookups: {e}")
+        return None
+    return _table
+
+
+def set_id_mapping(table: Optional[IdMappingTable]):
+    """Set (or with None, unset) the identifier mapping table used by the lookups."""
+    global _table
+    _table = table
+
+
+def get_id_mapping() -> Optional[IdMappingTable]:
+    """Return the loaded identifier mapping table, or None when every lookup goes to the remote services."""
+    return _table
+
+
+def lookup_uniprot_ids(gene_id: str) -> list[str]:
+    """
+    Return the UniProtKB ids of a gene from the local table.
+
+    :param gene_id: A gene CURIE.
+    :return: ``UniProtKB:`` CURIEs; empty when no table is loaded or the gene is not in it.
+    """
+    return _table.gene_to_uniprot(gene_id) if _table is not None else []
+
+
+def lookup_hgnc_ids(uniprot_id: str) -> list[str]:
+    """
+    Return the HGNC genes of a UniProtKB protein from the local table.
+
+    :param uniprot_id: A UniProtKB id, with or without the ``UniProtKB:`` prefix.
+    :return: ``HGNC:`` CURIEs; empty when no table is loaded or the protein has no HGNC gene in it.
+    """
+    if _table is None:
+        return []
+    return [gene_id for gene_id in _table.uniprot_to_gene(uniprot_id) if gene_id.startswith("HGNC:")]
@@ -1,15 +1,31 @@
 """Utilities for MyGene.info interactions."""
 
 import logging
+import os
+from typing import Iterable, Optional
 from urllib.parse import quote
 
 import requests
 from biothings_client import get_client
 
 from app.exceptions.global_exceptions import DataNotFoundException
+from app.utils.cache_backends import cached_by_argument, get_cache_backend, get_cache_config, json_size
+from app.utils.http_clients import get_session
+from app.utils.id_mapping import lookup_hgnc_ids, lookup_uniprot_ids, read_hgnc_uniprot_mappings
 
 logger = logging.getLogger()
 
+# MyGeneInfo field searched for each gene CURIE prefix in batched queries.
+GENE_PREFIX_SCOPES = {
+    "HGNC": "HGNC",
+    "NCBIGene": "entrezgene",
+    "entrezgene": "entrezgene",
+    "ENSEMBL": "ensembl.gene",
+}
+
+# Seeded mappings outlive looked up ones; a changed seed file is loaded again on startup.
+DEFAULT_SEED_TTL_SECONDS = 30 * 86400
+
 
 def gene_to_uniprot_from_alliance(gene_id: str) -> list[str]:
     """
@@ -41,7 +57,7 @@ def gene_to_uniprot_from_alliance(gene_id: str) -> list[str]:
 
     """
     url = f"https://www.alliancegenome.org/api/gene/{quote(gene_id, safe='')}"
-    response = requests.get(url, timeout=30)
+    response = get_session(url).get(url, timeout=30)
     response.raise_for_status()
     gene = response.json().get("gene", {}) or {}
 
@@ -61,9 +77,49 @@ def gene_to_uniprot_from_alliance(gene_id: str) -> list[str]:
     return uniprot_ids
 
 
+def _uniprot_ids_from_hit(hit: dict) -> list[str]:
+    """
+    Return the UniProtKB ids of a MyGeneInfo hit, preferring Swiss-Prot over TrEMBL.
+
+    :param hit: A MyGeneInfo hit queried with ``fields="uniprot"``.
+    :return: CURIEs such as ``UniProtKB:P04637``; empty when the hit has no UniProt data.
+    """
+    if "uniprot" not in hit:
+        return []
+    if "Swiss-Prot" in hit["uniprot"]:
+        ids = hit["uniprot"]["Swiss-Prot"]
+    else:
+        ids = hit["uniprot"].get("TrEMBL", [])
+    if isinstance(ids, str):
+        ids = [ids]
+    return [x if x.startswith("UniProtKB") else "UniProtKB:{}".format(x) for x in ids]
+
+
+def _hgnc_id_from_hit(hit: dict, uniprot_id: str) -> Optional[str]:
+    """
+    Return the HGNC id of a MyGeneInfo hit if the hit really lists ``uniprot_id``.
+
+    :param hit: A MyGeneInfo hit queried with ``fields="HGNC,symbol,uniprot"``.
+    :param uniprot_id: The bare UniProt accession (no ``UniProtKB:`` prefix).
+    :return: An ``HGNC:`` CURIE, or None when the hit does not match or has no HGNC id.
+    """
+    uniprot_data = hit.get("uniprot")
+    if not uniprot_data or "HGNC" not in hit:
+        return None
+    for source in ("Swiss-Prot", "TrEMBL"):
+        ids = uniprot_data.get(source)
+        if ids == uniprot_id or (isinstance(ids, list) and uniprot_id in ids):
+            gene_id = hit["HGNC"]
+            return gene_id if gene_id.startswith("HGNC") else "HGNC:{}".format(gene_id)
+    return None
+
+
+@cached_by_argument("mygene", "gene_to_uniprot")
 def gene_to_uniprot_from_mygene(id: str):
-    """Query MyGeneInfo with a gene and get its corresponding UniProt ID."""
-    uniprot_ids = []
+    """Query MyGeneInfo with a gene and get its corresponding UniProt ID, unless the local mapping table has it."""
+    uniprot_ids = lookup_uniprot_ids(id)
+    if uniprot_ids:
+        return uniprot_ids
     mg = get_client("gene")
     if id.startswith("NCBIGene:"):
         # MyGeneInfo uses 'entrezgene' prefix instead of 'NCBIGene'
@@ -71,27 +127,8 @@ def gene_to_uniprot_from_mygene(id: str):
     try:
         results = mg.query(id, fields="uniprot")
         logger.info("results from mygene for %s: %s", id, results["hits"])
-        if results["hits"]:
-            for hit in results["hits"]:
-                if "uniprot" not in hit:
-                    continue
-                if "Swiss-Prot" in hit["uniprot"]:
-                    uniprot_id = hit["uniprot"]["Swiss-Prot"]
-                    if isinstance(uniprot_id, str):
-                        if not uniprot_id.startswith("UniProtKB"):
-                            uniprot_id = "UniProtKB:{}".format(uniprot_id)
-                        uniprot_ids.append(uniprot_id)
-                    else:
-                        for x in uniprot_id:
-                            if not x.startswith("UniProtKB"):
-                                x = "UniProtKB:{}".format(x)
-                            uniprot_ids.append(x)
-                else:
-                    trembl_ids = hit["uniprot"]["TrEMBL"]
-                    for x in trembl_ids:
-                        if not x.startswith("UniProtKB"):
-                            x = "UniProtKB:{}".format(x)
-                        uniprot_ids.append(x)
+        for hit in results["hits"]:
+            uniprot_ids += _uniprot_ids_from_hit(hit)
     except ConnectionError:
         logging.error("ConnectionError while querying MyGeneInfo with {}".format(id))
     if not uniprot_ids and id.startswith("HGNC:"):
@@ -105,8 +142,12 @@ def gene_to_uniprot_from_mygene(id: str):
     return uniprot_ids
 
 
+@cached_by_argument("mygene", "uniprot_to_gene")
 def uniprot_to_gene_from_mygene(id: str):
-    """Query MyGeneInfo with a UniProtKB id and get its corresponding HGNC gene."""
+    """Query MyGeneInfo with a UniProtKB id and get its HGNC gene, unless the local mapping table has it."""
+    local_ids = lookup_hgnc_ids(id)
+    if local_ids:
+        return local_ids[:1]
     gene_id = None
     if id.startswith("UniProtKB"):
         id = id.split(":", 1)[1]
@@ -116,33 +157,182 @@ def uniprot_to_gene_from_mygene(id: str):
         # Query specifically in the uniprot fields to avoid false matches
         results = mg.query(f"uniprot.Swiss-Prot:{id} OR uniprot.TrEMBL:{id}",
                           fields="HGNC,symbol,uniprot")
-        if results["hits"]:
-            # Verify the hit actually contains our UniProt ID
-            for hit in results["hits"]:
-                if "uniprot" in hit:
-                    uniprot_data = hit["uniprot"]
-                    # Check Swiss-Prot
-                    has_id = False
-                    if "Swiss-Prot" in uniprot_data:
-                        swiss_prot = uniprot_data["Swiss-Prot"]
-                        if (isinstance(swiss_prot, str) and swiss_prot == id) or \
-                           (isinstance(swiss_prot, list) and id in swiss_prot):
-                            has_id = True
-                    # Check TrEMBL if not found
-                    if not has_id and "TrEMBL" in uniprot_data:
-                        trembl = uniprot_data["TrEMBL"]
-                        if (isinstance(trembl, str) and trembl == id) or \
-                           (isinstance(trembl, list) and id in trembl):
-                            has_id = True
-
-                    if has_id and "HGNC" in hit:
-                        gene_id = hit["HGNC"]
-                        if not gene_id.startswith("HGNC"):
-                            gene_id = "HGNC:{}".format(gene_id)
-                        break
+        for hit in results["hits"]:
+            gene_id = _hgnc_id_from_hit(hit, id)
+            if gene_id:
+                break
     except ConnectionError:
         logging.error("ConnectionError while querying MyGeneInfo with {}".format(id))
 
     if not gene_id:
         raise DataNotFoundException(detail="No HGNC IDs found for {}".format(id))
     return [gene_id]
+
+
+def _cached_or_missing(prefix: str, ids: Iterable[str]) -> tuple[dict, list[str]]:
+    """
+    Split ``ids`` into answers already in the mygene cache and the ids that still need a query.
+
+    :param prefix: The key prefix used by the single-id function sharing the cache.
+    :param ids: Identifiers to look up; duplicates are resolved once.
+    :return: ``(cached, missing)`` where ``cached`` maps id to its cached answer.
+    """
+    backend = get_cache_backend("mygene")
+    cached, missing = {}, []
+    for id in dict.fromkeys(ids):
+        value = backend.get(f"{prefix}:{id}")
+        if value is not None:
+            cached[id] = value
+        else:
+            missing.append(id)
+    return cached, missing
+
+
+def _store(prefix: str, answers: dict):
+    """Store batched answers under the same keys as the single-id functions."""
+    backend = get_cache_backend("mygene")
+    for id, value in answers.items():
+        backend.set(f"{prefix}:{id}", value, size=json_size(value))
+
+
+def genes_to_uniprot_from_mygene(ids: Iterable[str]) -> dict[str, list[str]]:
+    """
+    Map many gene ids to UniProtKB ids with one MyGeneInfo ``querymany`` per id namespace.
+
+    Genes in the local mapping table are answered from it. Other answers are shared with
+    :func:`gene_to_uniprot_from_mygene` through the mygene cache. HGNC genes MyGeneInfo has
+    no UniProt data for fall back to the Alliance API, as in the single-id lookup.
+
+    :param ids: HGNC, NCBIGene or ENSEMBL gene CURIEs.
+    :return: A dict from each gene id to its UniProtKB ids; genes without any mapping are left out.
+    """
+    ids = list(ids)
+    local = {id: uniprot_ids for id in ids if (uniprot_ids := lookup_uniprot_ids(id))}
+    found, missing = _cached_or_missing("gene_to_uniprot", [id for id in ids if id not in local])
+    by_scope = {}
+    for id in missing:
+        prefix, _, local_id = id.partition(":")
+        if prefix not in GENE_PREFIX_SCOPES:
+            raise ValueError(f"Cannot map {id} to UniProtKB: unsupported gene prefix")
+        by_scope.setdefault(GENE_PREFIX_SCOPES[prefix], {})[local_id] = id
+
+    answers = {}
+    for scope, terms in by_scope.items():
+        try:
+            hits = get_client("gene").querymany(list(terms), scopes=scope, fields="uniprot", verbose=False)
+        except ConnectionError:
+            logging.error("ConnectionError while querying MyGeneInfo with %s", list(terms.values()))
+            continue
+        for hit in hits:
+            id = terms.get(str(hit.get("query")))
+            if id is None or hit.get("notfound"):
+                continue
+            answers.setdefault(id, []).extend(_uniprot_ids_from_hit(hit))
+
+    for id in missing:
+        if not answers.get(id) and id.startswith("HGNC:"):
+            logger.info("No UniProt IDs from mygene.info for %s, trying Alliance API fallback", id)
+            try:
+                answers[id] = gene_to_uniprot_from_alliance(id)
+            except (requests.HTTPError, DataNotFoundException):
+                logger.info("Alliance API fallback also failed for %s", id)
+    answers = {id: uniprot_ids for id, uniprot_ids in answers.items() if uniprot_ids}
+    _store("gene_to_uniprot", answers)
+    return {**local, **found, **answers}
+
+
+def uniprots_to_genes_from_mygene(ids: Iterable[str]) -> dict[str, list[str]]:
+    """
+    Map many UniProtKB ids to HGNC genes with a single MyGeneInfo ``querymany`` call.
+
+    Proteins in the local mapping table are answered from it. Other answers are shared with
+    :func:`uniprot_to_gene_from_mygene` through the mygene cache.
+
+    :param ids: UniProtKB ids, with or without the ``UniProtKB:`` prefix.
+    :return: A dict from each id, as given, to ``[HGNC id]``; ids without an HGNC gene are left out.
+    """
+    ids = list(ids)
+    local = {id: gene_ids[:1] for id in ids if (gene_ids := lookup_hgnc_ids(id))}
+    found, missing = _cached_or_missing("uniprot_to_gene", [id for id in ids if id not in local])
+    terms = {id.split(":", 1)[1] if id.startswith("UniProtKB") else id: id for id in missing}
+    answers = {}
+    if terms:
+        mg = get_client("gene")
+        try:
+            hits = mg.querymany(list(terms), scopes="uniprot.Swiss-Prot,uniprot.TrEMBL",
+                                fields="HGNC,symbol,uniprot", verbose=False)
+        except ConnectionError:
+            logging.error("ConnectionError while querying MyGeneInfo with %s", missing)
+            hits = []
+        for hit in hits:
+            accession = str(hit.get("query"))
+            id = terms.get(accession)
+            if id is None or id in answers or hit.get("notfound"):
+                continue
+            gene_id = _hgnc_id_from_hit(hit, accession)
+            if gene_id:
+                answers[id] = [gene_id]
+    _store("uniprot_to_gene", answers)
+    return {**local, **found, **answers}
+
+
+def get_mapping_seed_config() -> dict:
+    """
+    Return the bulk gene/UniProt mapping file the mygene cache is seeded from, and its TTL.
+
+    :return: ``seed_file`` (None when unset) and ``seed_ttl_seconds`` from
+             ``cache_backend.namespaces.mygene`` in config.yaml.
+    """
+    namespace_config = (get_cache_config().get("namespaces") or {}).get("mygene") or {}
+    return {
+        "seed_file": namespace_config.get("seed_file") or None,
+        "seed_ttl_seconds": namespace_config.get("seed_ttl_seconds", DEFAULT_SEED_TTL_SECONDS),
+    }
+
+
+def seed_mapping_cache(path: str, ttl_seconds: float = DEFAULT_SEED_TTL_SECONDS) -> int:
+    """
+    Load the mappings of an HGNC dump into the mygene cache, in both directions.
+
+    The entries use the keys of the MyGeneInfo lookups, so seeded human genes and proteins
+    are answered without leaving the host. A marker keyed by the file's modification time
+    makes workers sharing an on-disk cache skip a file another worker already loaded.
+
+    :param path: The path of the HGNC TSV dump.
+    :param ttl_seconds: How long the seeded entries (and the marker) are kept.
+    :return: The number of cache entries written (0 when the file was already loaded).
+    """
+    backend = get_cache_backend("mygene")
+    marker = f"seed:{os.path.abspath(path)}"
+    mtime = os.path.getmtime(path)
+    if backend.get(marker) == mtime:
+        return 0
+    entries = {}
+    for gene_ids, uniprot_ids in read_hgnc_uniprot_mappings(path):
+        for gene_id in gene_ids:
+            entries[f"gene_to_uniprot:{gene_id}"] = uniprot_ids
+        for uniprot_id in uniprot_ids:
+            entries.setdefault(f"uniprot_to_gene:{uniprot_id}", [gene_ids[0]])
+    backend.set_many(entries.items(), ttl_seconds)
+    backend.set(marker, mtime, ttl_seconds, size=json_size(mtime))
+    logger.info("Seeded %d gene/UniProt mappings from %s", len(entries), path)
+    return len(entries)
+
+
+def seed_configured_mapping_cache() -> int:
+    """
+    Seed the mygene cache from the configured bulk mapping file, if any.
+
+    A file that cannot be read is logged and the lookups keep querying MyGeneInfo.
+
+    :return: The number of cache entries written.
+    """
+    config = get_mapping_seed_config()
+    path = config["seed_file"]
+    if path is None:
+        return 0
+    try:
+        return seed_mapping_cache(path, config["seed_ttl_seconds"])
+    except (OSError, ValueError) as e:
+        logger.error(f"Could not seed the gene/UniProt mapping cache from {path}: {e}")
+        return 0
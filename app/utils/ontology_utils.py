@@ -1,5 +1,6 @@
 """ontology utility functions."""
 
+import asyncio
 import logging
 
 from ontobio.golr.golr_query import ESOLR, ESOLRDoc
@@ -7,7 +8,8 @@ from ontobio.ontol_factory import OntologyFactory
 from ontobio.sparql.sparql_ontol_utils import SEPARATOR
 
 from app.exceptions.global_exceptions import DataNotFoundException
-from app.utils.golr_utils import gu_run_solr_text_on, run_solr_on
+from app.utils.cache_backends import cache_not_found
+from app.utils.golr_utils import gu_run_solr_text_on, gu_run_solr_text_on_async, run_solr_on, run_solr_on_async
 from app.utils.settings import get_golr_config
 
 cfg = get_golr_config()
@@ -39,6 +41,27 @@ def batch_fetch_labels(ids):
     return m
 
 
+async def batch_fetch_labels_async(ids):
+    """
+    Fetch all rdfs:label assertions for a set of CURIEs, querying GOlr concurrently.
+
+    Async counterpart of :func:`batch_fetch_labels`.
+
+    :param ids: List of CURIEs for which labels are to be fetched.
+    :type ids: list
+    :return: Dictionary containing the CURIEs as keys and their corresponding labels as values.
+    :rtype: dict
+    """
+    ids = ["MGI:" + id if id.startswith("MGI:") else id for id in ids]
+    labels = await asyncio.gather(*(goont_fetch_label_async(id) for id in ids))
+    m = {}
+    for id, label in zip(ids, labels, strict=True):
+        if label is None:
+            raise DataNotFoundException(detail=f"Item with ID {id} not found")
+        m[id] = label
+    return m
+
+
 def goont_fetch_label(id):
     """
     Fetch label for a given ID using GOLR.
@@ -67,6 +90,32 @@ def goont_fetch_label(id):
     return None
 
 
+async def goont_fetch_label_async(id):
+    """
+    Fetch label for a given ID using GOLR, without blocking the event loop.
+
+    :param id: The ID for which the label is to be fetched.
+    :type id: str
+    :return: Label for the given ID.
+    :rtype: str
+    """
+    try:
+        doc = await run_solr_on_async(ESOLR.GOLR, ESOLRDoc.ONTOLOGY, id, "annotation_class_label,bioentity_label")
+        if doc and doc.get("annotation_class_label"):
+            return doc.get("annotation_class_label")
+    except Exception as e:
+        logger.error(f"Failed to fetch label from ONTOLOGY for {id}: {e}")
+
+    try:
+        doc = await run_solr_on_async(ESOLR.GOLR, ESOLRDoc.BIOENTITY, id, "bioentity_label")
+        if doc and doc.get("bioentity_label"):
+            return doc.get("bioentity_label")
+    except Exception as e:
+        logger.error(f"Failed to fetch label from BIOENTITY for {id}: {e}")
+
+    return None
+
+
 # The three GO aspect roots, keyed by the GOlr ``source`` value their terms
 # carry. Resolved by stable GO ID rather than by ``annotation_class_label`` so a
 # label change on a root term (e.g. GO:0003674 "molecular_function" ->
@@ -79,19 +128,14 @@ ASPECT_ROOTS = {
 }
 
 
-def get_ontology_subsets_by_id(id: str):
-    """
-    Get ontology subsets based on the provided identifier.
+SUBSET_QUERY = "*:*"
+SUBSET_QUERY_FIELDS = ""
+SUBSET_FIELDS = "annotation_class,annotation_class_label,description,source"
 
-    :param id: The identifier for the ontology subset.
-    :type id: str
-    :return: List of ontology subsets.
-    :rtype: list
-    """
-    q = "*:*"
-    qf = ""
+
+def _subset_filter_query(id: str) -> str:
+    """Build the GOlr filter query selecting the terms of a subset."""
     fq = "&fq=subset:" + id
-    fields = "annotation_class,annotation_class_label,description,source"
 
     # This is a temporary fix while waiting for the PR of the AGR slim on go-ontology
     if id == "goslim_agr":
@@ -104,9 +148,11 @@ def get_ontology_subsets_by_id(id: str):
         goslim_agr_ids = '" "'.join(terms_list)
         fq = '&fq=annotation_class:("' + goslim_agr_ids + '")'
 
-    fq = fq + "&rows=1000"
-    data = gu_run_solr_text_on(ESOLR.GOLR, ESOLRDoc.ONTOLOGY, q, qf, fields, fq, False)
+    return fq + "&rows=1000"
+
 
+def _group_subset_terms(data) -> dict:
+    """Group the terms of a subset by their aspect (GOlr ``source``)."""
     tr = {}
     for term in data:
         source = term["source"]
@@ -115,16 +161,24 @@ def get_ontology_subsets_by_id(id: str):
         ready_term = term.copy()
         del ready_term["source"]
         tr[source]["terms"].append(ready_term)
+    return tr
+
+
+def _subset_root_filter_query(tr: dict):
+    """
+    Build the filter query fetching the aspect roots of the grouped subset, or None if there are none.
 
-    # Resolve each aspect category to its root term by stable GO ID. The second
-    # GOlr query is keyed on annotation_class (the fixed root IDs), not on
-    # annotation_class_label, which drifts when a root term is relabelled.
+    The second GOlr query is keyed on annotation_class (the fixed root IDs), not on
+    annotation_class_label, which drifts when a root term is relabelled.
+    """
     root_ids = [ASPECT_ROOTS[c] for c in tr if c in ASPECT_ROOTS]
-    data = []
-    if root_ids:
-        root_fq = '&fq=annotation_class:("' + '" "'.join(root_ids) + '")&rows=1000'
-        data = gu_run_solr_text_on(ESOLR.GOLR, ESOLRDoc.ONTOLOGY, q, qf, fields, root_fq, False)
+    if not root_ids:
+        return None
+    return '&fq=annotation_class:("' + '" "'.join(root_ids) + '")&rows=1000'
+
 
+def _finalize_subset_categories(id: str, tr: dict, data) -> list:
+    """Resolve each aspect category to its root term by stable GO ID and order the categories."""
     for category in tr:
         root_id = ASPECT_ROOTS.get(category)
         if root_id is None:
@@ -148,19 +202,72 @@ def get_ontology_subsets_by_id(id: str):
             cat = agr_category["category"]
             for category in result:
                 if category.get("annotation_class") == cat:
-                    ordered_terms = []
-                    for ordered_term in agr_category["terms"]:
-                        for unordered_term in category["terms"]:
-                            if unordered_term.get("annotation_class") == ordered_term:
-                                ordered_terms.append(unordered_term)
-                                break
-                    category["terms"] = ordered_terms
+                    # first term of the category with each id
+                    terms_by_id = {}
+                    for unordered_term in category["terms"]:
+                        terms_by_id.setdefault(unordered_term.get("annotation_class"), unordered_term)
+                    category["terms"] = [
+                        terms_by_id[term_id] for term_id in agr_category["terms"] if term_id in terms_by_id
+                    ]
                     temp.append(category)
         result = temp
 
     return result
 
 
+def get_ontology_subsets_by_id(id: str):
+    """
+    Get ontology subsets based on the provided identifier.
+
+    :param id: The identifier for the ontology subset.
+    :type id: str
+    :return: List of ontology subsets.
+    :rtype: list
+    """
+    data = gu_run_solr_text_on(
+        ESOLR.GOLR, ESOLRDoc.ONTOLOGY, SUBSET_QUERY, SUBSET_QUERY_FIELDS, SUBSET_FIELDS, _subset_filter_query(id), False
+    )
+    tr = _group_subset_terms(data)
+
+    root_fq = _subset_root_filter_query(tr)
+    data = []
+    if root_fq:
+        data = gu_run_solr_text_on(
+            ESOLR.GOLR, ESOLRDoc.ONTOLOGY, SUBSET_QUERY, SUBSET_QUERY_FIELDS, SUBSET_FIELDS, root_fq, False
+        )
+
+    return _finalize_subset_categories(id, tr, data)
+
+
+async def get_ontology_subsets_by_id_async(id: str, fresh: bool = False):
+    """
+    Get ontology subsets based on the provided identifier, without blocking the event loop.
+
+    Async counterpart of :func:`get_ontology_subsets_by_id`.
+
+    :param id: The identifier for the ontology subset.
+    :type id: str
+    :param fresh: Whether to query GOlr even when its responses are cached, e.g. to reload the subset.
+    :type fresh: bool
+    :return: List of ontology subsets.
+    :rtype: list
+    """
+    data = await gu_run_solr_text_on_async(
+        ESOLR.GOLR, ESOLRDoc.ONTOLOGY, SUBSET_QUERY, SUBSET_QUERY_FIELDS, SUBSET_FIELDS, _subset_filter_query(id),
+        False, fresh,
+    )
+    tr = _group_subset_terms(data)
+
+    root_fq = _subset_root_filter_query(tr)
+    data = []
+    if root_fq:
+        data = await gu_run_solr_text_on_async(
+            ESOLR.GOLR, ESOLRDoc.ONTOLOGY, SUBSET_QUERY, SUBSET_QUERY_FIELDS, SUBSET_FIELDS, root_fq, False, fresh
+        )
+
+    return _finalize_subset_categories(id, tr, data)
+
+
 def get_category_terms(category):
     """
     Get category terms based on the provided category.
@@ -379,6 +486,29 @@ def get_go_subsets_sparql_query(goid):
     )
 
 
+def check_goid_format(goid: str):
+    """
+    Check that an identifier looks like a GO identifier, without querying GOlr.
+
+    :param goid: The GO identifier to be checked.
+    :raises ValueError: If the identifier does not start with GO: or GO_.
+    """
+    if not goid.startswith("GO:") and not goid.startswith("GO_"):
+        raise ValueError("Invalid GO ID format")
+
+
+def check_curie_format(id: str):
+    """
+    Check that an identifier looks like a CURIE (or an OBO-style id), without querying GOlr.
+
+    :param id: The identifier to be checked.
+    :raises ValueError: If the identifier has neither a ':' nor a '_' separator.
+    """
+    if ":" not in id and "_" not in id:
+        raise ValueError("Invalid CURIE format")
+
+
+@cache_not_found("goid")
 def is_valid_goid(goid) -> bool:
     """
     Check if the provided GO identifier is valid by querying the AmiGO Solr (GOLR) instance.
@@ -389,8 +519,7 @@ def is_valid_goid(goid) -> bool:
     :rtype: bool
     """
     # Ensure the GO ID starts with the proper prefix
-    if not goid.startswith("GO:") and not goid.startswith("GO_"):
-        raise ValueError("Invalid GO ID format")
+    check_goid_format(goid)
 
     fields = ""
 
@@ -408,6 +537,7 @@ def is_valid_goid(goid) -> bool:
     return False
 
 
+@cache_not_found("golr_curie")
 def is_golr_recognized_curie(id) -> bool:
     """
     Check if the provided identifier is valid by querying the AmiGO Solr (GOLR) instance.
@@ -418,8 +548,7 @@ def is_golr_recognized_curie(id) -> bool:
     :rtype: bool
     """
     # Ensure the GO ID starts with the proper prefix
-    if ":" not in id and "_" not in id:
-        raise ValueError("Invalid CURIE format")
+    check_curie_format(id)
 
     fields = ""
 
@@ -440,3 +569,91 @@ def is_golr_recognized_curie(id) -> bool:
 
     # Default return False if no data is found
     return False
+
+
+@cache_not_found("goid")
+async def is_valid_goid_async(goid) -> bool:
+    """
+    Check if the provided GO identifier is valid by querying GOlr, without blocking the event loop.
+
+    Async counterpart of :func:`is_valid_goid`.
+
+    :param goid: The GO identifier to be checked.
+    :type goid: str
+    :return: True if the GO identifier is valid, False otherwise.
+    :rtype: bool
+    """
+    check_goid_format(goid)
+
+    try:
+        data = await run_solr_on_async(ESOLR.GOLR, ESOLRDoc.ONTOLOGY, goid, "")
+        if data:
+            return True
+    except DataNotFoundException as e:
+        logger.info(f"Exception occurred: {e}")
+        raise e
+
+    return False
+
+
+@cache_not_found("golr_curie")
+async def is_golr_recognized_curie_async(id) -> bool:
+    """
+    Check if the provided identifier is known to GOlr, without blocking the event loop.
+
+    Async counterpart of :func:`is_golr_recognized_curie`.
+
+    :param id: The identifier to be checked.
+    :type id: str
+    :return: True if the identifier is valid, False otherwise.
+    :rtype: bool
+    """
+    check_curie_format(id)
+
+    try:
+        data = await run_solr_on_async(ESOLR.GOLR, ESOLRDoc.ONTOLOGY, id, "")
+        if data:
+            return True
+        data = await run_solr_on_async(ESOLR.GOLR, ESOLRDoc.BIOENTITY, id, "")
+        if data:
+            return True
+    except DataNotFoundException as e:
+        logger.info(f"Exception occurred: {e}")
+        raise e
+
+    return False
+
+
+@cache_not_found("goid")
+async def fetch_go_term_async(goid: str, fields: str) -> dict:
+    """
+    Fetch the GOlr ontology document of a GO term, validating the identifier from the same response.
+
+    Replaces calling :func:`is_valid_goid_async` before fetching the document, which queried
+    GOlr twice for the same term. Raises exactly what the validator would for unknown terms.
+
+    :param goid: The GO identifier.
+    :param fields: The comma separated document fields to return.
+    :return: The ontology document.
+    :raises ValueError: If the identifier is not a GO identifier.
+    :raises DataNotFoundException: If GOlr has no ontology document for the identifier.
+    """
+    check_goid_format(goid)
+    return await run_solr_on_async(ESOLR.GOLR, ESOLRDoc.ONTOLOGY, goid, fields)
+
+
+@cache_not_found("golr_curie")
+async def fetch_golr_recognized_term_async(id: str, fields: str) -> dict:
+    """
+    Fetch the GOlr ontology document of a CURIE, validating the identifier from the same response.
+
+    Replaces calling :func:`is_golr_recognized_curie_async` before fetching the document.
+
+    :param id: The identifier, e.g. GO:0003677 or ECO:0000501.
+    :param fields: The comma separated document fields to return.
+    :return: The ontology document.
+    :raises ValueError: If the identifier is not a CURIE.
+    :raises DataNotFoundException: If GOlr has no ontology document for the identifier.
+    """
+    check_curie_format(id)
+    return await run_solr_on_async(ESOLR.GOLR, ESOLRDoc.ONTOLOGY, id, fields)
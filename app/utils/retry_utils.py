@@ -1,59 +1,187 @@
 """Retry utilities for external API calls."""
 
+import asyncio
+import inspect
+import random
+import re
 import time
+from contextvars import ContextVar
 from functools import wraps
-from typing import Any, Callable
+from typing import Any, Callable, Optional
 
+import httpx
+import requests
+from fastapi import HTTPException
 
-def retry_on_golr_error(max_retries: int = 3, delay: float = 1.0) -> Callable:
+# HTTP status codes that indicate a transient upstream failure worth retrying.
+# 4xx responses (other than 429) mean the query itself is wrong and are never retried.
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504, 522, 524})
+
+# Transport-level failures (connection refused/reset, timeouts) for both HTTP stacks.
+RETRYABLE_EXCEPTIONS = (
+    requests.ConnectionError,
+    requests.Timeout,
+    httpx.TransportError,
+)
+
+# pysolr (used by ontobio) reports HTTP failures only in its message, e.g. "(HTTP 502)".
+_SOLR_STATUS_PATTERN = re.compile(r"HTTP (\d{3})")
+
+DEFAULT_MAX_DELAY = 8.0
+DEFAULT_MAX_ELAPSED = 30.0
+
+
+class RetryBudget:
+
+    """
+    A number of retries shared by every upstream call made while serving one API request.
+
+    Once the budget is spent, failing calls raise immediately instead of retrying, so a
+    GOlr brownout is not amplified by every request retrying every query.
+
+    :param retries: The number of retries allowed for the whole request.
+    """
+
+    def __init__(self, retries: int):
+        """Initialize the budget with the number of retries allowed."""
+        self.remaining = retries
+
+    def consume(self) -> bool:
+        """Take one retry from the budget, returning False if it is exhausted."""
+        if self.remaining <= 0:
+            return False
+        self.remaining -= 1
+        return True
+
+
+_request_retry_budget: ContextVar[Optional[RetryBudget]] = ContextVar("request_retry_budget", default=None)
+
+
+def start_request_retry_budget(retries: int) -> RetryBudget:
+    """
+    Start a new retry budget for the current request context.
+
+    :param retries: The number of retries allowed for the request.
+    :return: The new budget.
+    """
+    budget = RetryBudget(retries)
+    _request_retry_budget.set(budget)
+    return budget
+
+
+def is_retryable_error(e: Exception) -> bool:
+    """
+    Classify an exception raised by an upstream call as transient (retryable) or not.
+
+    Retryable errors are connection failures, timeouts and responses carrying one of
+    :data:`RETRYABLE_STATUS_CODES`. Application errors such as DataNotFoundException and
+    other 4xx responses are never retried.
+
+    :param e: The exception raised by the upstream call.
+    :return: True if the call should be retried.
+    """
+    if isinstance(e, HTTPException):
+        return False
+    if isinstance(e, requests.HTTPError):
+        return e.response is not None and e.response.status_code in RETRYABLE_STATUS_CODES
+    if isinstance(e, httpx.HTTPStatusError):
+        return e.response.status_code in RETRYABLE_STATUS_CODES
+    if isinstance(e, RETRYABLE_EXCEPTIONS):
+        return True
+    if type(e).__name__ == "SolrError":
+        match = _SOLR_STATUS_PATTERN.search(str(e))
+        # No status code means pysolr could not reach the server at all.
+        return match is None or int(match.group(1)) in RETRYABLE_STATUS_CODES
+    return False
+
+
+def backoff_delay(attempt: int, delay: float, max_delay: float = DEFAULT_MAX_DELAY) -> float:
+    """
+    Return the wait before the next attempt using exponential backoff with full jitter.
+
+    :param attempt: The zero-based number of the attempt that just failed.
+    :param delay: The base delay in seconds.
+    :param max_delay: The cap on the exponential delay in seconds.
+    :return: A random delay between 0 and min(max_delay, delay * 2 ** attempt).
+    """
+    return random.uniform(0, min(max_delay, delay * 2**attempt))  # noqa: S311
+
+
+def _next_delay(e: Exception, attempt: int, started: float, max_retries: int, delay: float, max_delay: float,
+                max_elapsed: float) -> Optional[float]:
+    """Return how long to wait before retrying after ``e``, or None if the error should be raised."""
+    from app.utils.settings import logger
+
+    if not is_retryable_error(e):
+        return None
+    logger.info(f"GOLr server error on attempt {attempt + 1}/{max_retries}: {type(e).__name__}: {e}")
+    if attempt >= max_retries - 1:
+        logger.error(f"All {max_retries} GOLr attempts failed, raising last exception")
+        return None
+    wait = backoff_delay(attempt, delay, max_delay)
+    if time.monotonic() - started + wait > max_elapsed:
+        logger.error(f"GOLr retry time budget of {max_elapsed} seconds exhausted, raising last exception")
+        return None
+    budget = _request_retry_budget.get()
+    if budget is not None and not budget.consume():
+        logger.error("Request retry budget exhausted, raising last exception")
+        return None
+    logger.info(f"Retrying in {wait:.2f} seconds...")
+    return wait
+
+
+def retry_on_golr_error(
+    max_retries: int = 3,
+    delay: float = 1.0,
+    max_delay: float = DEFAULT_MAX_DELAY,
+    max_elapsed: float = DEFAULT_MAX_ELAPSED,
+) -> Callable:
     """
-    Decorator to retry GOLr/Solr calls on server errors.
+    Decorator to retry GOLr/Solr calls on transient server errors.
 
     This unified decorator handles retry logic for both direct Solr queries
-    and ontobio library calls.
+    and ontobio library calls. Errors are classified by :func:`is_retryable_error`;
+    retries back off exponentially with full jitter, stop once ``max_elapsed`` seconds
+    have been spent on the call, and draw from the per-request budget started by
+    :func:`start_request_retry_budget` when one is active. Coroutine functions wait
+    with ``asyncio.sleep`` so the event loop is never blocked.
 
-    :param max_retries: Maximum number of retry attempts
-    :param delay: Delay in seconds between retries
+    :param max_retries: Maximum number of attempts
+    :param delay: Base delay in seconds for the exponential backoff
+    :param max_delay: Maximum delay in seconds between two attempts
+    :param max_elapsed: Total time in seconds the call may spend, including retries
     :return: Decorated function
     """
     def decorator(func: Callable) -> Callable:
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                started = time.monotonic()
+                for attempt in range(max_retries):
+                    try:
+                        return await func(*args, **kwargs)
+                    except Exception as e:
+                        wait = _next_delay(e, attempt, started, max_retries, delay, max_delay, max_elapsed)
+                        if wait is None:
+                            raise
+                    await asyncio.sleep(wait)
+                raise RuntimeError(f"All {max_retries} attempts failed without capturing an exception")
+
+            return async_wrapper
+
         @wraps(func)
         def wrapper(*args: Any, **kwargs: Any) -> Any:
-            from app.utils.settings import logger
-
-            last_exception = None
+            started = time.monotonic()
             for attempt in range(max_retries):
                 try:
                     return func(*args, **kwargs)
                 except Exception as e:
-                    error_str = str(e)
-                    error_type = type(e).__name__
-
-                    # Check for server errors in the error message or error type
-                    server_errors = ['502', '522', '503', '504', '400', 'bad gateway', 'server error',
-                                   'connection', 'timeout', 'solrerror', 'read timeout', 'readtimeout',
-                                   'timed out']
-
-                    if any(err in error_str.lower() for err in server_errors) or \
-                       'solrerror' in error_type.lower():
-                        last_exception = e
-                        logger.info(
-                            f"GOLr server error on attempt {attempt + 1}/{max_retries}: "
-                            f"{error_type}: {error_str}"
-                        )
-                        if attempt < max_retries - 1:
-                            logger.info(f"Retrying in {delay} seconds...")
-                            time.sleep(delay)
-                            continue
-                    raise
-
-            # If we get here, all retries failed
-            if last_exception:
-                logger.error(f"All {max_retries} GOLr attempts failed, raising last exception")
-                raise last_exception
-            else:
-                # This should never happen, but ensures no implicit None return
-                raise RuntimeError(f"All {max_retries} attempts failed without capturing an exception")
+                    wait = _next_delay(e, attempt, started, max_retries, delay, max_delay, max_elapsed)
+                    if wait is None:
+                        raise
+                time.sleep(wait)
+            # This should never happen, but ensures no implicit None return
+            raise RuntimeError(f"All {max_retries} attempts failed without capturing an exception")
 
         return wrapper
     return decorator
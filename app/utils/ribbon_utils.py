@@ -0,0 +1,511 @@
+"""Ribbon aggregation: annotation counts per slim group and evidence type for each subject."""
+
+from collections import defaultdict
+
+from fastapi.concurrency import run_in_threadpool
+
+from app.utils.cache_backends import get_cache_backend
+from app.utils.concurrency import gather_bounded
+from app.utils.golr_utils import gu_run_solr_text_on_async, run_solr_json_facets_async
+from app.utils.ontology_utils import aspect_map, get_category_terms
+from app.utils.settings import ESOLR, ESOLRDoc, get_golr_config
+
+DEFAULT_RIBBON_CONFIG = {
+    # "documents" aggregates the annotation docs locally, "facets" asks GOlr for the counts
+    "counting": "documents",
+    "subject_batch_size": 20,
+    # batches of subjects (and MyGene lookups) in flight at once for a ribbon request
+    "max_concurrency": 8,
+}
+
+# page size of the annotation queries; GOlr sizes its result collector from rows, so larger
+# results are paged with start rather than asked for at once
+ROWS_PER_QUERY = 100000
+ANNOTATION_FIELDS = "bioentity,annotation_class,evidence_type,regulates_closure,aspect"
+
+
+def get_ribbon_config() -> dict:
+    """
+    Return the ribbon settings from the ``ribbon`` section of config.yaml.
+
+    :return: A dict with counting, subject_batch_size and max_concurrency.
+    """
+    return {**DEFAULT_RIBBON_CONFIG, **(get_golr_config().get("ribbon") or {})}
+
+
+def build_ribbon_categories(categories: list) -> list:
+    """
+    Turn the categories of a subset into ribbon categories; the category dicts are modified.
+
+    Each category gets its id and label from its aspect root, and its terms become groups
+    typed "Term", preceded by an "All" group and followed by an "Other" group for the category.
+
+    :param categories: The categories of a subset, as returned by ``get_ontology_subsets_by_id``.
+    :return: The ribbon categories.
+    """
+    # Drop any aspect we couldn't resolve to a root term (no annotation_class) so
+    # a single ontology label drift can't 500 the whole ribbon. See #165.
+    categories = [category for category in categories if category.get("annotation_class")]
+    for category in categories:
+        category["groups"] = category["terms"]
+        del category["terms"]
+
+        category["id"] = category["annotation_class"]
+        del category["annotation_class"]
+
+        category["label"] = category["annotation_class_label"]
+        del category["annotation_class_label"]
+
+        for group in category["groups"]:
+            group["id"] = group["annotation_class"]
+            del group["annotation_class"]
+
+            group["label"] = group["annotation_class_label"]
+            del group["annotation_class_label"]
+
+            group["type"] = "Term"
+
+        category["groups"] = (
+            [
+                {
+                    "id": category["id"],
+                    "label": "all " + category["label"].lower().replace("_", " "),
+                    "description": "Show all " + category["label"].lower().replace("_", " ") + " annotations",
+                    "type": "All",
+                }
+            ]
+            + category["groups"]
+            + [
+                {
+                    "id": category["id"],
+                    "label": "other " + category["label"].lower().replace("_", " "),
+                    "description": "Represent all annotations not mapped to a specific term",
+                    "type": "Other",
+                }
+            ]
+        )
+
+    return categories
+
+
+class CompiledRibbonCategories:
+
+    """
+    Ribbon categories compiled for aggregation.
+
+    Every distinct group (slim term or category root) gets a bit; a category is described by
+    the mask of its groups (All and Term groups, which decide whether an annotation is
+    counted) and the mask of its Term groups (which decide whether an annotation falls in
+    the "other" bucket). An annotation's ``regulates_closure`` is then reduced once to the
+    mask of the groups it contains, and every membership test becomes a bitwise AND.
+
+    :param categories: The ribbon categories, each with its ``id`` and ``groups`` (typed All,
+                       Term or Other) as returned by the ribbon endpoint.
+    """
+
+    def __init__(self, categories: list):
+        """Assign a bit to every group and build the per-category masks."""
+        self.categories = categories
+        self.bits: dict = {}
+        self.category_ids = []
+        self.group_ids = []
+        self.term_ids = []
+        self.group_masks = []
+        self.term_masks = []
+        for category in categories:
+            group_ids = [group["id"] for group in category["groups"] if group["type"] != "Other"]
+            term_ids = [term["id"] for term in get_category_terms(category)]
+            for id in group_ids + term_ids:
+                self.bits.setdefault(id, len(self.bits))
+            self.category_ids.append(category["id"])
+            self.group_ids.append(group_ids)
+            self.term_ids.append(term_ids)
+            self.group_masks.append(self._mask(group_ids))
+            self.term_masks.append(self._mask(term_ids))
+
+    def _mask(self, ids) -> int:
+        """Return the mask of the groups among ``ids``."""
+        mask = 0
+        for id in ids:
+            bit = self.bits.get(id)
+            if bit is not None:
+                mask |= 1 << bit
+        return mask
+
+    def counted_masks(self, cross_aspect: bool) -> dict:
+        """Return, by aspect root, the groups an annotation of that aspect is counted against."""
+        masks = defaultdict(int)
+        if cross_aspect:
+            everything = 0
+            for mask in self.group_masks:
+                everything |= mask
+            return defaultdict(lambda: everything)
+        for category_id, mask in zip(self.category_ids, self.group_masks, strict=True):
+            masks[category_id] |= mask
+        return masks
+
+
+def _new_subgroup() -> dict:
+    """Return empty counts for a group / evidence type cell."""
+    return {"terms": set(), "nb_classes": 0, "nb_annotations": 0}
+
+
+def aggregate_ribbon_subject(subject_id: str, compiled: CompiledRibbonCategories, annotations: list,
+                             cross_aspect: bool) -> dict:
+    """
+    Aggregate the annotations of one subject into ribbon cells.
+
+    Each annotation's closure is matched against the slim groups once; the per group and
+    evidence type counts, distinct term sets and "other" buckets are then filled from the
+    resulting masks, in the same order as (and with output identical to) the original
+    per category, per group scan of the annotations.
+
+    :param subject_id: The subject (bioentity) the annotations belong to.
+    :param compiled: The compiled ribbon categories.
+    :param annotations: GOlr annotation docs with annotation_class, evidence_type, regulates_closure and aspect.
+    :param cross_aspect: Whether annotations count towards categories of another aspect.
+    :return: The subject's ribbon entity: id, groups, nb_classes and nb_annotations.
+    """
+    bits = compiled.bits
+    aspects = [aspect_map[annot["aspect"]] for annot in annotations]
+    masks = []
+    members = defaultdict(list)
+    for i, annot in enumerate(annotations):
+        mask = 0
+        for term in annot["regulates_closure"]:
+            bit = bits.get(term)
+            if bit is not None and not mask >> bit & 1:
+                mask |= 1 << bit
+                members[bit].append(i)
+        masks.append(mask)
+
+    # annotations counted for the subject: matching any group of a category they may count towards
+    counted = compiled.counted_masks(cross_aspect)
+    terms = set()
+    nb_annotations = 0
+    for i, annot in enumerate(annotations):
+        if masks[i] & counted[aspects[i]]:
+            terms.add(annot["annotation_class"])
+            nb_annotations += 1
+
+    groups = {}
+    for c, category_id in enumerate(compiled.category_ids):
+        for group in compiled.group_ids[c]:
+            for i in members.get(bits[group], ()):
+                if not cross_aspect and category_id != aspects[i]:
+                    continue
+                annot = annotations[i]
+                cells = groups.get(group)
+                if cells is None:
+                    cells = groups[group] = {"ALL": _new_subgroup()}
+                cell = cells.get(annot["evidence_type"])
+                if cell is None:
+                    cell = cells[annot["evidence_type"]] = _new_subgroup()
+                cell["terms"].add(annot["annotation_class"])
+                cell["nb_annotations"] += 1
+                cells["ALL"]["terms"].add(annot["annotation_class"])
+                cells["ALL"]["nb_annotations"] += 1
+
+        other = {"ALL": _new_subgroup()}
+        term_mask = compiled.term_masks[c]
+        for i, annot in enumerate(annotations):
+            if (cross_aspect or category_id == aspects[i]) and not masks[i] & term_mask:
+                other["ALL"]["nb_annotations"] += 1
+                other["ALL"]["terms"].add(annot["annotation_class"])
+                cell = other.get(annot["evidence_type"])
+                if cell is None:
+                    cell = other[annot["evidence_type"]] = _new_subgroup()
+                cell["nb_annotations"] += 1
+                cell["terms"].add(annot["annotation_class"])
+        groups[category_id + "-other"] = other
+
+    # compute the number of classes for each group; only the "other" buckets list their terms
+    for group, cells in groups.items():
+        for cell in cells.values():
+            cell["nb_classes"] = len(cell["terms"])
+            if "-other" not in group:
+                del cell["terms"]
+            else:
+                cell["terms"] = list(cell["terms"])
+
+    return {"id": subject_id, "groups": groups, "nb_classes": len(terms), "nb_annotations": nb_annotations}
+
+
+def build_annotation_filters(ecodes: list = None, exclude_IBA: bool = False, exclude_PB: bool = False) -> str:
+    """
+    Return the filter queries restricting the annotations counted in the ribbon.
+
+    :param ecodes: Evidence types to include; has priority over exclude_IBA.
+    :param exclude_IBA: Whether to exclude IBA annotations.
+    :param exclude_PB: Whether to exclude direct annotations to protein binding.
+    :return: The filter queries, each starting with ``&fq=``.
+    """
+    fq = ""
+    if ecodes:
+        fq += '&fq=evidence_type:("' + '" "'.join(ecodes) + '")'
+    elif exclude_IBA:
+        fq += "&fq=!evidence_type:IBA"
+    if exclude_PB:
+        fq += '&fq=!annotation_class:"GO:0005515"'
+    return fq
+
+
+def _subject_batches(subject_ids: list, batch_size: int = None) -> list:
+    """Split the distinct subjects into batches of ``batch_size`` (``subject_batch_size`` in config.yaml)."""
+    if batch_size is None:
+        batch_size = get_ribbon_config()["subject_batch_size"]
+    batch_size = max(1, int(batch_size))
+    unique_ids = list(dict.fromkeys(subject_ids))
+    return [unique_ids[start : start + batch_size] for start in range(0, len(unique_ids), batch_size)]
+
+
+async def fetch_ribbon_annotations_async(subject_ids: list, filters: str = "", batch_size: int = None) -> dict:
+    """
+    Fetch the annotations of several subjects with one GOlr query per batch of subjects.
+
+    The batch queries filter on any of the subjects' bioentity ids and run concurrently, up to
+    ``max_concurrency`` at once. Each asks for at most ``ROWS_PER_QUERY`` docs and pages with
+    ``start`` beyond that, sorted by id so pages neither overlap nor skip docs. The pages are not
+    kept in the GOlr response cache. The returned docs are split back per subject, keeping the
+    order GOlr returned them in.
+
+    :param subject_ids: The subjects (bioentity ids as indexed in GOlr, e.g. MGI:MGI:98214).
+    :param filters: Additional filter queries, see :func:`build_annotation_filters`.
+    :param batch_size: Subjects per query; defaults to ``subject_batch_size`` in config.yaml.
+    :return: The annotation docs of each subject, by subject id.
+    """
+    batches = _subject_batches(subject_ids, batch_size)
+
+    async def fetch(batch):
+        docs = []
+        while True:
+            fq = (
+                '&fq=bioentity:("' + '" "'.join(batch) + '")'
+                + f"&rows={ROWS_PER_QUERY}&start={len(docs)}&sort=id asc" + filters
+            )
+            # the pages bypass the GOlr response cache: the counts are cached per subject instead
+            page = await gu_run_solr_text_on_async(
+                ESOLR.GOLR, ESOLRDoc.ANNOTATION, "*:*", "", ANNOTATION_FIELDS, fq, False, cache=False
+            )
+            docs.extend(page)
+            if len(page) < ROWS_PER_QUERY:
+                return docs
+
+    annotations = {subject_id: [] for batch in batches for subject_id in batch}
+    for docs in await gather_bounded(batches, fetch, get_ribbon_config()["max_concurrency"]):
+        for doc in docs:
+            subject_annotations = annotations.get(doc.get("bioentity"))
+            if subject_annotations is not None:
+                subject_annotations.append(doc)
+    return annotations
+
+
+def _solr_values(ids) -> str:
+    """Return a parenthesized, quoted list of values for a Solr field query."""
+    return '("' + '" "'.join(ids) + '")'
+
+
+def _cell_facets(list_terms: bool) -> dict:
+    """Return the facets counting one ribbon cell, overall and by evidence type."""
+    classes = {"type": "terms", "field": "annotation_class", "limit": -1} if list_terms else "unique(annotation_class)"
+    return {
+        "classes": classes,
+        "evidence": {"type": "terms", "field": "evidence_type", "limit": -1, "facet": {"classes": classes}},
+    }
+
+
+def build_ribbon_facets(compiled: CompiledRibbonCategories, cross_aspect: bool) -> dict:
+    """
+    Return the JSON facets counting the ribbon cells of a subject.
+
+    There is one query facet per distinct group, restricted to the aspects of the categories
+    listing it unless ``cross_aspect``, one per category for its "other" bucket, and one for the
+    annotations counted for the subject as a whole. Facets are keyed ``g<n>`` (the n-th group in
+    ``compiled.bits``), ``o<n>`` (the n-th category) and ``subject``.
+
+    :param compiled: The compiled ribbon categories.
+    :param cross_aspect: Whether annotations count towards categories of another aspect.
+    :return: The facets, to be nested under a terms facet on bioentity.
+    """
+    letters = {root: letter for letter, root in aspect_map.items()}
+    group_aspects = defaultdict(set)
+    for category_id, group_ids in zip(compiled.category_ids, compiled.group_ids, strict=True):
+        for group in group_ids:
+            if category_id in letters:
+                group_aspects[group].add(letters[category_id])
+
+    facets = {}
+    counted = []
+    for group, bit in compiled.bits.items():
+        if group not in group_aspects and not cross_aspect:
+            continue
+        q = "regulates_closure:" + _solr_values([group])
+        if not cross_aspect:
+            q = "+" + q + " +aspect:" + _solr_values(sorted(group_aspects[group]))
+        facets["g%d" % bit] = {"type": "query", "q": q, "facet": _cell_facets(False)}
+        counted.append("(" + q + ")")
+
+    for c, category_id in enumerate(compiled.category_ids):
+        if not cross_aspect and category_id not in letters:
+            continue
+        q = "*:*" if cross_aspect else "+aspect:" + letters[category_id]
+        if compiled.term_ids[c]:
+            q += " -regulates_closure:" + _solr_values(compiled.term_ids[c])
+        facets["o%d" % c] = {"type": "query", "q": q, "facet": _cell_facets(True)}
+
+    if counted:
+        facets["subject"] = {"type": "query", "q": " ".join(counted), "facet": {"classes": "unique(annotation_class)"}}
+    return facets
+
+
+def _cell_from_facet(facet: dict, list_terms: bool) -> dict:
+    """Return the ribbon cell (ALL, then each evidence type) counted by a query facet."""
+
+    def counts(bucket):
+        if list_terms:
+            terms = [term["val"] for term in bucket.get("classes", {}).get("buckets", [])]
+            return {"terms": terms, "nb_classes": len(terms), "nb_annotations": bucket.get("count", 0)}
+        return {"nb_classes": bucket.get("classes", 0), "nb_annotations": bucket.get("count", 0)}
+
+    cell = {"ALL": counts(facet)}
+    for evidence in facet.get("evidence", {}).get("buckets", []):
+        cell[evidence["val"]] = counts(evidence)
+    return cell
+
+
+def entity_from_facets(subject_id: str, compiled: CompiledRibbonCategories, facets: dict) -> dict:
+    """
+    Build a subject's ribbon entity from the results of :func:`build_ribbon_facets`.
+
+    The entity has the same shape as the one built by :func:`aggregate_ribbon_subject`; evidence
+    types are listed by decreasing number of annotations, and a group listed by several
+    categories is counted once.
+
+    :param subject_id: The subject (bioentity) the facets were computed for.
+    :param compiled: The compiled ribbon categories.
+    :param facets: The facet results of the subject, keyed as in :func:`build_ribbon_facets`.
+    :return: The subject's ribbon entity: id, groups, nb_classes and nb_annotations.
+    """
+    groups = {}
+    for c, category_id in enumerate(compiled.category_ids):
+        for group in compiled.group_ids[c]:
+            facet = facets.get("g%d" % compiled.bits[group])
+            if group not in groups and facet and facet.get("count"):
+                groups[group] = _cell_from_facet(facet, False)
+        groups[category_id + "-other"] = _cell_from_facet(facets.get("o%d" % c) or {}, True)
+
+    subject = facets.get("subject") or {}
+    return {
+        "id": subject_id,
+        "groups": groups,
+        "nb_classes": subject.get("classes", 0),
+        "nb_annotations": subject.get("count", 0),
+    }
+
+
+async def count_ribbon_facets_async(subject_ids: list, compiled: CompiledRibbonCategories, filters: str = "",
+                                    cross_aspect: bool = False, batch_size: int = None) -> dict:
+    """
+    Count the ribbon cells of several subjects with GOlr facets, without fetching annotation docs.
+
+    As for :func:`fetch_ribbon_annotations_async`, there is one query per batch of subjects and
+    up to ``max_concurrency`` of them run at once.
+
+    :param subject_ids: The subjects (bioentity ids as indexed in GOlr, e.g. MGI:MGI:98214).
+    :param compiled: The compiled ribbon categories.
+    :param filters: Additional filter queries, see :func:`build_annotation_filters`.
+    :param cross_aspect: Whether annotations count towards categories of another aspect.
+    :param batch_size: Subjects per query; defaults to ``subject_batch_size`` in config.yaml.
+    :return: The ribbon entity of each subject, by subject id.
+    """
+    batches = _subject_batches(subject_ids, batch_size)
+    subject_facets = build_ribbon_facets(compiled, cross_aspect)
+    facets = {"subjects": {"type": "terms", "field": "bioentity", "limit": -1, "facet": subject_facets}}
+
+    async def count(batch):
+        fq = "&fq=bioentity:" + _solr_values(batch) + filters
+        return await run_solr_json_facets_async(ESOLR.GOLR, ESOLRDoc.ANNOTATION, fq, facets)
+
+    by_subject = {}
+    for result in await gather_bounded(batches, count, get_ribbon_config()["max_concurrency"]):
+        for bucket in result.get("subjects", {}).get("buckets", []):
+            by_subject[bucket["val"]] = bucket
+    return {
+        subject_id: entity_from_facets(subject_id, compiled, by_subject.get(subject_id, {}))
+        for batch in batches
+        for subject_id in batch
+    }
+
+
+def ribbon_subject_cache_key(subject_id: str, subset: str, ecodes: list = None, exclude_IBA: bool = False,
+                             exclude_PB: bool = False, cross_aspect: bool = False) -> str:
+    """
+    Return the key of a subject's ribbon entity in the "ribbon" cache namespace.
+
+    The key covers every parameter the entity depends on; evidence codes are order insensitive
+    and exclude_IBA is ignored when they are given, as they take priority over it.
+
+    :return: The cache key.
+    """
+    evidence = ",".join(sorted(set(ecodes))) if ecodes else ""
+    flags = "%d%d%d" % (bool(exclude_IBA and not ecodes), bool(exclude_PB), bool(cross_aspect))
+    return "|".join([get_ribbon_config()["counting"], subset or "", evidence, flags, subject_id])
+
+
+async def get_ribbon_subjects_async(subject_ids: list, compiled: CompiledRibbonCategories, subset: str,
+                                    ecodes: list = None, exclude_IBA: bool = False, exclude_PB: bool = False,
+                                    cross_aspect: bool = False) -> dict:
+    """
+    Return the ribbon entities of several subjects, only counting the ones not cached yet.
+
+    Entities are cached per subject in the "ribbon" namespace, keyed by
+    :func:`ribbon_subject_cache_key`; the others are counted in batches as configured by
+    ``ribbon.counting``, with up to ``ribbon.max_concurrency`` batches in flight. Each batch is
+    aggregated in the thread pool as soon as its annotations arrive.
+
+    :param subject_ids: The subjects (bioentity ids as indexed in GOlr, e.g. MGI:MGI:98214).
+    :param compiled: The compiled categories of ``subset``.
+    :param subset: The subset (slim) the categories come from.
+    :param ecodes: Evidence types to include; has priority over exclude_IBA.
+    :param exclude_IBA: Whether to exclude IBA annotations.
+    :param exclude_PB: Whether to exclude direct annotations to protein binding.
+    :param cross_aspect: Whether annotations count towards categories of another aspect.
+    :return: The ribbon entity of each subject, by subject id; entities may be shared with the cache,
+             so callers copy them before making changes.
+    """
+    backend = get_cache_backend("ribbon")
+    keys = {
+        subject_id: ribbon_subject_cache_key(subject_id, subset, ecodes, exclude_IBA, exclude_PB, cross_aspect)
+        for subject_id in dict.fromkeys(subject_ids)
+    }
+    # a shared backend may wait on other workers, keep it off the event loop
+    cached = await run_in_threadpool(backend.get_many, keys.values())
+    entities = {subject_id: cached[key] for subject_id, key in keys.items() if key in cached}
+    missing = [subject_id for subject_id in keys if subject_id not in entities]
+    if not missing:
+        return entities
+
+    filters = build_annotation_filters(ecodes, exclude_IBA, exclude_PB)
+    facets = get_ribbon_config()["counting"] == "facets"
+
+    async def count(batch):
+        if facets:
+            # let GOlr count the cells rather than downloading the annotations
+            return await count_ribbon_facets_async(batch, compiled, filters, cross_aspect, batch_size=len(batch))
+        annotations = await fetch_ribbon_annotations_async(batch, filters, batch_size=len(batch))
+        # aggregating large annotation sets is CPU bound, keep it off the event loop
+        return await run_in_threadpool(_aggregate_ribbon_batch, batch, compiled, annotations, cross_aspect)
+
+    for counted in await gather_bounded(_subject_batches(missing), count, get_ribbon_config()["max_concurrency"]):
+        await run_in_threadpool(backend.set_many, [(keys[subject_id], counted[subject_id]) for subject_id in counted])
+        entities.update(counted)
+    return entities
+
+
+def _aggregate_ribbon_batch(subject_ids: list, compiled: CompiledRibbonCategories, annotations: dict,
+                            cross_aspect: bool) -> dict:
+    """Aggregate the annotations of a batch of subjects, see :func:`aggregate_ribbon_subject`."""
+    return {
+        subject_id: aggregate_ribbon_subject(subject_id, compiled, annotations[subject_id], cross_aspect)
+        for subject_id in subject_ids
+    }
@@ -6,7 +6,6 @@ from enum import Enum
 from os import path
 from urllib.parse import urlparse
 
-import requests
 import yaml
 
 CONFIG = path.join(path.dirname(path.abspath(__file__)), "../conf/config.yaml")
@@ -70,7 +69,9 @@ def _load_index_file(file_key: str, config: dict) -> dict:
 
     parsed = urlparse(file_url)
     if parsed.scheme in ("http", "https"):
-        response = requests.get(file_url, timeout=timeout)
+        from app.utils.http_clients import get_session
+
+        response = get_session(file_url).get(file_url, timeout=timeout)
         response.raise_for_status()
         data = response.json()
     else:
@@ -0,0 +1,67 @@
+"""Request coalescing (single-flight) for identical concurrent upstream calls."""
+
+import asyncio
+import copy
+from typing import Any, Awaitable, Callable, Hashable
+
+
+class SingleFlight:
+
+    """
+    Coalesce concurrent calls sharing a key into a single in-flight call.
+
+    The first caller for a key (the leader) runs the call; callers arriving while it is
+    in flight await the leader's outcome instead of issuing their own upstream request.
+    Followers receive a deep copy of the result so that callers mutating their docs
+    cannot affect each other. Nothing is remembered once the call completes.
+    """
+
+    def __init__(self):
+        """Initialize with no calls in flight."""
+        self._calls: dict = {}
+        self.leaders = 0
+        self.followers = 0
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run ``func`` for ``key``, or wait for the identical call already in flight.
+
+        :param key: The key identifying identical calls (e.g. a normalized query).
+        :param func: A zero-argument coroutine function performing the call.
+        :return: The result of the call.
+        """
+        loop = asyncio.get_running_loop()
+        flight_key = (loop, key)
+        flight = self._calls.get(flight_key)
+        if flight is not None:
+            self.followers += 1
+            flight["waiting"] += 1
+            future = flight["future"]
+            # asyncio.wait never cancels or raises for the shared future itself.
+            await asyncio.wait({future})
+            if future.cancelled():
+                # The leader was cancelled (e.g. its client went away); try again.
+                return await self.do(key, func)
+            return copy.deepcopy(future.result())
+
+        self.leaders += 1
+        future = loop.create_future()
+        flight = {"future": future, "waiting": 0}
+        self._calls[flight_key] = flight
+        try:
+            result = await func()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved so it is not logged when nobody was waiting.
+            future.exception()
+            raise
+        else:
+            # Followers copy from a snapshot, as the leader's caller may mutate the result
+            # before they get to run.
+            future.set_result(copy.deepcopy(result) if flight["waiting"] else result)
+            return result
+        finally:
+            del self._calls[flight_key]
@@ -0,0 +1,236 @@
+"""Native map2slim: GOlr annotations of a set of subjects mapped onto the terms of a slim."""
+
+import json
+
+from prefixcommons.curie_util import expand_uri
+
+from app.utils.golr_utils import run_solr_docs_async
+from app.utils.settings import ESOLR, ESOLRDoc
+
+INVOLVED_IN = "involved_in"
+ACTS_UPSTREAM_OF_OR_WITHIN = "acts_upstream_of_or_within"
+
+# ECO class of IEA annotations, excluded by exclude_automatic_assertions
+IEA_ECO = "ECO:0000501"
+# annotations fetched per query when all rows are requested, paging with start beyond that
+ROWS_PER_QUERY = 100000
+
+# GOlr prefixes and their canonical form
+PREFIX_NORMALIZATION_MAP = {"MGI:MGI": "MGI", "FB": "FlyBase"}
+ASPECT_CATEGORIES = {"F": "molecular_activity", "P": "biological_process", "C": "cellular_component"}
+# annotation fields copied as is into the associations
+AMIGO_SPECIFIC_FIELDS = [
+    "reference",
+    "qualifier",
+    "is_redundant_for",
+    "type",
+    "evidence",
+    "evidence_label",
+    "evidence_type",
+    "evidence_type_label",
+    "evidence_with",
+    "evidence_closure",
+    "evidence_closure_label",
+    "evidence_subset_closure",
+    "evidence_subset_closure_label",
+    "evidence_type_closure",
+    "evidence_type_closure_label",
+    "aspect",
+]
+ASSOCIATION_FIELDS = [
+    "id",
+    "assigned_by",
+    "source",
+    "bioentity",
+    "bioentity_label",
+    "taxon",
+    "taxon_label",
+    "relation_label",
+    "annotation_class",
+    "annotation_class_label",
+    "evidence_closure_map",
+    "frequency",
+    "frequency_label",
+    "onset",
+    "onset_label",
+    "evidence_graph",
+    "association_type",
+] + AMIGO_SPECIFIC_FIELDS
+
+
+def closure_field(relationship_type: str) -> str:
+    """Return the GOlr closure an annotation is mapped up through for a relationship type."""
+    return "regulates_closure" if relationship_type == ACTS_UPSTREAM_OF_OR_WITHIN else "isa_partof_closure"
+
+
+def canonical_id(id: str) -> str:
+    """Return the canonical form of a GOlr identifier, e.g. MGI:nnnn for MGI:MGI:nnnn."""
+    if id is not None:
+        for golr_prefix, prefix in PREFIX_NORMALIZATION_MAP.items():
+            if id.startswith(golr_prefix + ":"):
+                return id.replace(golr_prefix + ":", prefix + ":")
+    return id
+
+
+def golr_id(id: str) -> str:
+    """Return the form of an identifier GOlr indexes, e.g. MGI:MGI:nnnn for MGI:nnnn."""
+    if id is not None:
+        for golr_prefix, prefix in PREFIX_NORMALIZATION_MAP.items():
+            if id.startswith(prefix + ":"):
+                return id.replace(prefix + ":", golr_prefix + ":")
+    return id
+
+
+def _solr_values(values: list) -> str:
+    """Return a value, or a disjunction of values, quoted for a Solr filter query."""
+    if len(values) == 1:
+        return '"' + values[0] + '"'
+    return "(" + " OR ".join('"' + value + '"' for value in values) + ")"
+
+
+def _entity(doc: dict, field: str, label_field: str):
+    """Return the entity (id, iri, label) a field of an annotation doc refers to, or None."""
+    if field not in doc:
+        return None
+    id = canonical_id(doc[field])
+    entity = {"id": id}
+    if id:
+        entity["iri"] = expand_uri(id)
+    if label_field in doc:
+        entity["label"] = doc[label_field]
+    return entity
+
+
+def translate_annotation(doc: dict, closure: str) -> dict:
+    """
+    Turn a GOlr annotation doc into an association, in the form ontobio's map2slim returns them.
+
+    :param doc: The annotation doc.
+    :param closure: The closure field the association's object is mapped up through.
+    :return: The association, with its object closure under ``object_closure``.
+    """
+    subject = _entity(doc, "bioentity", "bioentity_label")
+    if subject is not None and "taxon" in doc:
+        subject["taxon"] = _entity(doc, "taxon", "taxon_label")
+    object = _entity(doc, "annotation_class", "annotation_class_label")
+    if object is not None:
+        if "taxon" in doc:
+            object["taxon"] = _entity(doc, "taxon", "taxon_label")
+        if "aspect" in doc and object["id"].startswith("GO:"):
+            object["category"] = [ASPECT_CATEGORIES[doc["aspect"]]]
+
+    # GO overloads qualifiers and relation
+    qualifiers = []
+    relation = None
+    if isinstance(doc.get("qualifier"), list):
+        for qualifier in doc["qualifier"]:
+            if qualifier.lower() == "not":
+                qualifiers.append(qualifier)
+            else:
+                relation = qualifier
+    elif "qualifier" in doc:
+        relation = doc["qualifier"]
+    if relation is not None or "qualifier" in doc:
+        relation = {"id": relation}
+        if relation["id"]:
+            relation["iri"] = expand_uri(relation["id"])
+        if "relation_label" in doc:
+            relation["label"] = doc["relation_label"]
+
+    sources = doc.get("source", [])
+    association = {
+        "id": doc.get("id"),
+        "subject": subject,
+        "object": object,
+        "negated": "not" in qualifiers,
+        "relation": relation,
+        "publications": [{"id": id} for id in (sources if isinstance(sources, list) else [sources])],
+    }
+    if qualifiers:
+        association["qualifiers"] = qualifiers
+
+    evidence_types = []
+    if "evidence" in doc:
+        evidence_labels = json.loads(doc.get("evidence_closure_map") or "{}")
+        evidence_types.append({"id": doc["evidence"], "label": evidence_labels.get(doc["evidence"])})
+    association["evidence_types"] = evidence_types
+
+    if closure in doc:
+        association["object_closure"] = doc[closure]
+    if "assigned_by" in doc:
+        assigned_by = doc["assigned_by"]
+        association["provided_by"] = assigned_by if isinstance(assigned_by, list) else [assigned_by]
+    if "evidence_graph" in doc:
+        association["evidence_graph"] = json.loads(doc["evidence_graph"])
+    for field in ["frequency", "onset"]:
+        if field in doc:
+            association[field] = {"id": doc[field]}
+            if field + "_label" in doc:
+                association[field]["label"] = doc[field + "_label"]
+    if "association_type" in doc:
+        association["type"] = doc["association_type"]
+    for field in AMIGO_SPECIFIC_FIELDS:
+        # the aspect only shows as the category of GO objects
+        if field in doc and not (field == "aspect" and "category" in (object or {})):
+            association[field] = doc[field]
+    return association
+
+
+def build_map2slim_filters(subjects: list, slim: list, closure: str, exclude_automatic_assertions: bool = False,
+                           rows: int = -1, start: int = 0, offset: int = 0) -> str:
+    """
+    Build the GOlr filter queries and paging parameters of a map2slim query.
+
+    When all the annotations are requested, only the ones mapping to a slim term are fetched,
+    ``ROWS_PER_QUERY`` at a time in id order, ``offset`` being the number already fetched.
+    With explicit paging every annotation of the subjects counts towards the page, as in ontobio.
+
+    :return: The query parameters, each starting with ``&``.
+    """
+    fq = "&fq=bioentity:" + _solr_values([golr_id(canonical_id(subject)) for subject in subjects])
+    if exclude_automatic_assertions:
+        fq += '&fq=-evidence_subset_closure:"' + IEA_ECO + '"'
+    if rows < 0 and not start:
+        fq += "&fq=" + closure + ":" + _solr_values(slim)
+    if rows < 0:
+        return fq + "&rows=" + str(ROWS_PER_QUERY) + "&start=" + str(start + offset) + "&sort=id asc"
+    return fq + "&rows=" + str(rows) + "&start=" + str(start)
+
+
+async def map2slim_async(subjects: list, slim: list, relationship_type: str = ACTS_UPSTREAM_OF_OR_WITHIN,
+                         exclude_automatic_assertions: bool = False, rows: int = -1, start: int = 0) -> list:
+    """
+    Map the GO annotations of a set of subjects (e.g. genes) onto the terms of a slim.
+
+    Equivalent to ontobio's map2slim with object_category "function", fetching only the fields
+    the associations are built from.
+
+    :param subjects: The subjects, in GOlr or canonical form.
+    :param slim: The GO terms of the slim.
+    :param relationship_type: involved_in maps through is_a/part_of, acts_upstream_of_or_within through regulates.
+    :param exclude_automatic_assertions: Whether to leave out IEA annotations.
+    :param rows: The number of annotations to fetch, -1 for all.
+    :param start: The first annotation to fetch.
+    :return: A list of unique subject / slim term pairs, each with the associations mapped to it.
+    """
+    if not subjects or not slim:
+        return []
+    closure = closure_field(relationship_type)
+    fields = ",".join(ASSOCIATION_FIELDS + [closure])
+    docs = []
+    while True:
+        fq = build_map2slim_filters(subjects, slim, closure, exclude_automatic_assertions, rows, start, len(docs))
+        # pages of all the annotations are too large to be worth keeping in the GOlr response cache
+        page = await run_solr_docs_async(ESOLR.GOLR, ESOLRDoc.ANNOTATION, fields, fq, cache=rows >= 0)
+        docs.extend(page)
+        if rows >= 0 or len(page) < ROWS_PER_QUERY:
+            break
+
+    slim_terms = set(slim)
+    pairs = {}
+    for doc in docs:
+        association = translate_annotation(doc, closure)
+        association["slim"] = [term for term in association.pop("object_closure", []) if term in slim_terms]
+        for term in association["slim"]:
+            pairs.setdefault((association["subject"]["id"], term), []).append(association)
+    return [{"subject": subject, "slim": term, "assocs": assocs} for (subject, term), assocs in pairs.items()]
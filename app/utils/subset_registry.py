@@ -0,0 +1,154 @@
+"""In-memory registry of subsets (slims), loaded from GOlr and compiled once per version."""
+
+import asyncio
+import copy
+import hashlib
+import json
+import logging
+import time
+from typing import Optional
+
+from app.utils.ontology_utils import get_ontology_subsets_by_id_async
+from app.utils.ribbon_utils import CompiledRibbonCategories, build_ribbon_categories
+from app.utils.settings import get_golr_config
+from app.utils.singleflight import SingleFlight
+
+logger = logging.getLogger()
+
+DEFAULT_SUBSET_REGISTRY_CONFIG = {
+    # seconds after which a subset is loaded again from GOlr
+    "refresh_seconds": 86400,
+    # subsets loaded on startup and kept fresh in the background
+    "preload": ["goslim_agr"],
+}
+
+
+def get_subset_registry_config() -> dict:
+    """
+    Return the registry settings from the ``subset_registry`` section of config.yaml.
+
+    :return: A dict with refresh_seconds and preload.
+    """
+    return {**DEFAULT_SUBSET_REGISTRY_CONFIG, **(get_golr_config().get("subset_registry") or {})}
+
+
+class CompiledSubset:
+
+    """
+    A subset as loaded from GOlr, along with its ribbon categories compiled for aggregation.
+
+    The version is a digest of the subset's content, so it only changes when a refresh
+    brings a different subset; it is part of :attr:`key`, which identifies the subset in
+    caches of results derived from it.
+
+    :param id: The subset id (e.g. goslim_agr).
+    :param categories: The categories of the subset, as returned by ``get_ontology_subsets_by_id``.
+    """
+
+    def __init__(self, id: str, categories: list):
+        """Compile the ribbon categories of the subset."""
+        self.id = id
+        self.categories = categories
+        self.version = hashlib.sha256(json.dumps(categories, sort_keys=True).encode()).hexdigest()[:12]
+        self.key = f"{id}@{self.version}"
+        self.loaded_at = time.monotonic()
+        self.ribbon_categories = build_ribbon_categories(copy.deepcopy(categories))
+        self.compiled = CompiledRibbonCategories(self.ribbon_categories)
+
+    def get_categories(self) -> list:
+        """Return a copy of the subset's categories."""
+        return copy.deepcopy(self.categories)
+
+    def get_ribbon_categories(self) -> list:
+        """Return a copy of the subset's ribbon categories."""
+        return copy.deepcopy(self.ribbon_categories)
+
+
+class SubsetRegistry:
+
+    """
+    Subsets served from memory, loaded on first use and refreshed once they are older than ``refresh_seconds``.
+
+    Concurrent loads of the same subset share a single pair of GOlr queries. Only the first
+    load of a subset may be answered from the GOlr response cache; refreshes always query
+    GOlr, as the cached responses live as long as ``refresh_seconds``. Subsets GOlr knows
+    nothing about are not remembered.
+
+    :param refresh_seconds: The age after which a subset is loaded again.
+    """
+
+    def __init__(self, refresh_seconds: float = 86400):
+        """Initialize an empty registry."""
+        self.refresh_seconds = refresh_seconds
+        self._subsets: dict = {}
+        self._loads = SingleFlight()
+
+    async def _load(self, id: str, fresh: bool) -> CompiledSubset:
+        """Load a subset from GOlr (bypassing its response cache when ``fresh``) and register it when it exists."""
+        subset = CompiledSubset(id, await get_ontology_subsets_by_id_async(id, fresh=fresh))
+        if subset.categories:
+            previous = self._subsets.get(id)
+            if previous is None or previous.version != subset.version:
+                logger.info(f"Loaded subset {id} version {subset.version}")
+            self._subsets[id] = subset
+        return subset
+
+    async def get_async(self, id: str) -> CompiledSubset:
+        """
+        Return a subset, loading it from GOlr when it is not registered or is due for a refresh.
+
+        When GOlr cannot refresh a registered subset, the error is logged and the last
+        version loaded is served.
+
+        :param id: The subset id (e.g. goslim_agr).
+        :return: The compiled subset; it has no categories when GOlr does not know the subset.
+        """
+        subset = self._subsets.get(id)
+        if subset is not None and time.monotonic() - subset.loaded_at < self.refresh_seconds:
+            return subset
+        try:
+            await self._loads.do(id, lambda: self._load(id, fresh=subset is not None))
+        except Exception as e:
+            if subset is None:
+                raise
+            logger.error(f"Could not refresh subset {id}, serving version {subset.version}: {e}")
+            return subset
+        return self._subsets.get(id) or CompiledSubset(id, [])
+
+    async def refresh_async(self, ids: Optional[list] = None) -> dict:
+        """
+        Load subsets again from GOlr, whatever their age.
+
+        :param ids: The subsets to refresh; defaults to every registered subset.
+        :return: The version of each refreshed subset, by id.
+        """
+        versions = {}
+        for id in list(self._subsets) if ids is None else ids:
+            subset = await self._loads.do(id, lambda id=id: self._load(id, fresh=True))
+            versions[id] = subset.version
+        return versions
+
+    def clear(self):
+        """Forget every registered subset."""
+        self._subsets.clear()
+
+    async def run_refresh_loop(self, preload: list):
+        """
+        Load the ``preload`` subsets, then refresh every registered subset each ``refresh_seconds``.
+
+        Meant to run as a background task for the lifetime of the application; GOlr errors
+        are logged and the registered subsets are kept.
+
+        :param preload: The subsets to load up front.
+        """
+        ids = list(preload)
+        while True:
+            try:
+                await self.refresh_async(list(dict.fromkeys(ids + list(self._subsets))))
+            except Exception as e:
+                logger.error(f"Could not refresh the subsets: {e}")
+            ids = []
+            await asyncio.sleep(self.refresh_seconds)
+
+
+subset_registry = SubsetRegistry(get_subset_registry_config()["refresh_seconds"])
@@ -1,9 +1,11 @@
 """Unit tests for the endpoints in the bioentity module."""
 import logging
 import unittest
+import unittest.mock
 
 from fastapi.testclient import TestClient
 
+from app.exceptions.global_exceptions import DataNotFoundException
 from app.main import app
 from app.utils.settings import ESOLR, ESOLRDoc
 from tests.test_utils import retry_on_golr_error
@@ -114,5 +116,44 @@ class TestBioentityEndpoints(unittest.TestCase):
             self.assertEqual(response.status_code, 200)
 
 
+class TestGotermAnnotationSearch(unittest.TestCase):
+    """Test that annotation searches by GO term only skip validation for docs annotated to the term."""
+
+    def setUp(self):
+        """Answer the search with ``self.docs`` and record the validation queries."""
+        self.docs = []
+        self.validated = []
+
+        async def fake_search(solr_instance, category, q, qf, fields, optionals, highlight):
+            return [dict(doc) for doc in self.docs]
+
+        async def fake_is_valid_goid_async(id):
+            self.validated.append(id)
+            if id == "GO:9999999":
+                raise DataNotFoundException(detail=f"Item with ID {id} not found")
+            return True
+
+        for name, fake in [("gu_run_solr_text_on_async", fake_search), ("is_valid_goid_async", fake_is_valid_goid_async)]:
+            patcher = unittest.mock.patch(f"app.routers.bioentity.{name}", fake)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_annotated_docs_validate_the_term(self):
+        """Docs annotated to the term are returned without a validation query or their annotation_class."""
+        self.docs = [{"annotation_class": "GO:0008150", "taxon": "NCBITaxon:9606", "taxon_label": "Homo sapiens"}]
+        response = test_client.get("/api/bioentity/function/GO:0008150/taxons")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), [{"taxon": "NCBITaxon:9606", "taxon_label": "Homo sapiens"}])
+        self.assertEqual(self.validated, [])
+
+    def test_text_matches_of_an_unknown_term_are_not_found(self):
+        """An unknown term matching only free text fields gets a 404, not unrelated annotations."""
+        self.docs = [{"annotation_class": "GO:0005634", "taxon": "NCBITaxon:9606", "taxon_label": "Homo sapiens"}]
+        for endpoint in ["/api/bioentity/function/GO:9999999", "/api/bioentity/function/GO:9999999/taxons"]:
+            response = test_client.get(endpoint)
+            self.assertEqual(response.status_code, 404)
+        self.assertEqual(self.validated, ["GO:9999999", "GO:9999999"])
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,140 @@
+"""Unit tests for the cache backends in app.utils.cache_backends."""
+
+import asyncio
+import time
+
+import pytest
+
+from app.exceptions.global_exceptions import DataNotFoundException
+from app.utils import cache_backends
+from app.utils.cache_backends import MemoryCacheBackend, SQLiteCacheBackend, cache_not_found, cached_by_argument
+
+
+def test_sqlite_backend_is_shared_between_instances(tmp_path):
+    """Two backends on the same file (e.g. two workers) see each other's entries, per namespace."""
+    path = str(tmp_path / "cache.sqlite3")
+    worker_1 = SQLiteCacheBackend(path, "golr", max_bytes=1000)
+    worker_2 = SQLiteCacheBackend(path, "golr", max_bytes=1000)
+    other_namespace = SQLiteCacheBackend(path, "mygene", max_bytes=1000)
+
+    worker_1.set("q", {"response": {"docs": [{"id": "GO:0008150"}]}})
+    assert worker_2.get("q") == {"response": {"docs": [{"id": "GO:0008150"}]}}
+    assert other_namespace.get("q") is None
+    assert worker_2.stats()["hits"] == 1
+    assert worker_2.stats()["entries"] == 1
+
+
+def test_sqlite_backend_expiry_and_eviction(tmp_path, monkeypatch):
+    """Expired entries are misses and least recently used entries are evicted beyond max_bytes."""
+    monkeypatch.setattr(cache_backends, "SQLITE_EVICTION_INTERVAL", 1)
+    monkeypatch.setattr(cache_backends, "SQLITE_ACCESS_INTERVAL", 0)
+    backend = SQLiteCacheBackend(str(tmp_path / "cache.sqlite3"), "gocam", max_bytes=30)
+
+    backend.set("expired", "x", ttl=-1)
+    assert backend.get("expired") is None
+
+    backend.set("a", "a" * 10)
+    backend.set("b", "b" * 10)
+    backend.get("a")
+    backend.set("c", "c" * 10)
+    assert backend.get("b") is None
+    assert backend.get("a") == "a" * 10
+    assert backend.get("c") == "c" * 10
+    assert backend.stats()["evictions"] == 1
+
+
+def test_sqlite_backend_hits_are_read_only(tmp_path):
+    """Hits within the access interval and expired entries leave the database untouched."""
+    backend = SQLiteCacheBackend(str(tmp_path / "cache.sqlite3"), "golr", max_bytes=1000)
+    backend.set("q", "x")
+    backend.set("expired", "x", ttl=0.01)
+    time.sleep(0.02)
+    changes = backend._connection().total_changes
+    assert backend.get("q") == "x"
+    assert backend.get("expired") is None
+    assert backend.get_many(["q", "expired", "missing"]) == {"q": "x"}
+    assert backend._connection().total_changes == changes
+
+
+def test_namespace_backend_overrides_and_bulk_writes(tmp_path, monkeypatch):
+    """A namespace can use its own backend type, and set_many writes a batch of entries at once."""
+    path = str(tmp_path / "mappings.sqlite3")
+    monkeypatch.setattr(cache_backends, "get_cache_config", lambda: {
+        "type": "memory",
+        "namespaces": {"mygene": {"type": "sqlite", "path": path, "max_bytes": 30}},
+    })
+    assert isinstance(cache_backends.create_cache_backend("golr"), MemoryCacheBackend)
+    backend = cache_backends.create_cache_backend("mygene")
+    assert isinstance(backend, SQLiteCacheBackend)
+    assert backend.path == path
+
+    backend.set_many([("a", "a" * 10), ("b", "b" * 10), ("c", "c" * 10)])
+    assert backend.stats()["entries"] == 2
+    assert backend.get("c") == "c" * 10
+    memory = MemoryCacheBackend(max_bytes=1000)
+    memory.set_many([("a", [1]), ("b", [2])], ttl=60)
+    assert memory.get("b") == [2]
+
+
+def test_memory_backend_shares_values_and_needs_their_size():
+    """The memory backend neither copies nor serializes values, so callers give their size."""
+    backend = MemoryCacheBackend(max_bytes=1000)
+    value = {"docs": [{"id": "GO:0008150"}]}
+    backend.set("q", value, size=30)
+    assert backend.get("q") is value
+    assert backend.stats()["bytes"] == 30
+    with pytest.raises(ValueError):
+        backend.set("r", value)
+
+
+def test_cached_by_argument_only_caches_results(monkeypatch):
+    """Successful results are served from the namespace backend; errors are not remembered."""
+    backend = MemoryCacheBackend(max_bytes=1000)
+    monkeypatch.setattr(cache_backends, "get_cache_backend", lambda namespace: backend)
+    calls = []
+
+    @cached_by_argument("mygene", "test")
+    def lookup(id):
+        calls.append(id)
+        if id == "missing":
+            raise KeyError(id)
+        return [f"UniProtKB:{id}"]
+
+    assert lookup("P1") == ["UniProtKB:P1"]
+    assert lookup("P1") == ["UniProtKB:P1"]
+    assert calls == ["P1"]
+    for _ in range(2):
+        try:
+            lookup("missing")
+        except KeyError:
+            pass
+    assert calls == ["P1", "missing", "missing"]
+
+
+def test_cache_not_found_remembers_unknown_identifiers(monkeypatch):
+    """A DataNotFoundException is replayed from the negative cache without calling the lookup again."""
+    backend = MemoryCacheBackend(max_bytes=1000)
+    monkeypatch.setattr(cache_backends, "get_cache_backend", lambda namespace: backend)
+    calls = []
+
+    @cache_not_found("goid")
+    def is_valid(id):
+        calls.append(id)
+        if id == "GO:0000000":
+            raise DataNotFoundException(detail=f"Item with ID {id} not found")
+        return True
+
+    @cache_not_found("goid")
+    async def is_valid_async(id):
+        calls.append(id)
+        return True
+
+    assert is_valid("GO:0008150")
+    assert is_valid("GO:0008150")
+    for _ in range(2):
+        with pytest.raises(DataNotFoundException) as e:
+            is_valid("GO:0000000")
+        assert e.value.detail == "Item with ID GO:0000000 not found"
+    with pytest.raises(DataNotFoundException):
+        asyncio.run(is_valid_async("GO:0000000"))
+    assert calls == ["GO:0008150", "GO:0008150", "GO:0000000"]
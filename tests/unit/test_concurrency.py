@@ -0,0 +1,43 @@
+"""Unit tests for bounded concurrent calls in app.utils.concurrency."""
+
+import asyncio
+
+import pytest
+
+from app.utils.concurrency import gather_bounded
+
+
+def test_calls_run_concurrently_within_the_limit():
+    """At most ``limit`` calls are in flight and results keep the order of the items."""
+    in_flight = []
+    peak = []
+
+    async def call(item):
+        in_flight.append(item)
+        peak.append(len(in_flight))
+        await asyncio.sleep(0.01 * (5 - item % 5))
+        in_flight.remove(item)
+        return item * 2
+
+    results = asyncio.run(gather_bounded(range(10), call, 3))
+    assert results == [item * 2 for item in range(10)]
+    assert max(peak) == 3
+
+
+def test_first_error_propagates_and_pending_calls_are_cancelled():
+    """A failing call raises out of gather_bounded and the others do not keep running."""
+    finished = []
+
+    async def call(item):
+        if item == 0:
+            raise ValueError("boom")
+        await asyncio.sleep(0.05)
+        finished.append(item)
+
+    async def run():
+        with pytest.raises(ValueError):
+            await gather_bounded(range(4), call, 2)
+        await asyncio.sleep(0.1)
+
+    asyncio.run(run())
+    assert finished == []
@@ -0,0 +1,188 @@
+"""Unit tests for the local GO graph in app.utils.go_graph."""
+
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.utils import go_graph
+from app.utils.go_graph import IS_A, PART_OF, REGULATES_CLOSURE, load_go_graph
+
+test_client = TestClient(app)
+
+GO_OBO = """format-version: 1.2
+
+[Term]
+id: GO:0008150
+name: biological_process
+
+[Term]
+id: GO:0009987
+name: cellular process
+is_a: GO:0008150 ! biological_process
+
+[Term]
+id: GO:0006259
+name: DNA metabolic process
+is_a: GO:0009987 ! cellular process
+
+[Term]
+id: GO:0006260
+name: DNA replication
+is_a: GO:0006259 ! DNA metabolic process
+
+[Term]
+id: GO:0006270
+name: DNA replication initiation
+relationship: part_of GO:0006260 ! DNA replication
+
+[Term]
+id: GO:0030174
+name: regulation of DNA-templated DNA replication initiation
+relationship: regulates GO:0006270 ! DNA replication initiation
+
+[Typedef]
+id: part_of
+name: part of
+"""
+
+
+@pytest.fixture
+def graph(tmp_path):
+    """Load the test ontology from an OBO file."""
+    path = tmp_path / "go.obo"
+    path.write_text(GO_OBO)
+    return load_go_graph(str(path))
+
+
+def test_closures_follow_the_requested_relations(graph):
+    """Ancestors and descendants are closures over is_a/part_of unless other relations are asked for."""
+    assert graph.ancestors("GO:0006270") == ["GO:0008150", "GO:0009987", "GO:0006259", "GO:0006260", "GO:0006270"]
+    assert graph.ancestors("GO:0006270", relations=IS_A) == ["GO:0006270"]
+    assert graph.ancestors("GO:0030174", reflexive=False) == []
+    assert "GO:0006260" in graph.ancestors("GO:0030174", relations=REGULATES_CLOSURE)
+    assert graph.descendants("GO:0006259", reflexive=False) == ["GO:0006260", "GO:0006270"]
+    assert graph.parents("GO:0006270", relations=PART_OF) == ["GO:0006260"]
+    assert graph.children("GO:0008150") == ["GO:0009987"]
+    assert graph.label("GO:0006260") == "DNA replication"
+    with pytest.raises(KeyError):
+        graph.ancestors("GO:9999999")
+
+
+def test_obographs_json_matches_obo(graph, tmp_path):
+    """A GO JSON release loads into the same graph as the OBO file."""
+    purl = "http://purl.obolibrary.org/obo/"
+    nodes = [{"id": purl + term.replace(":", "_"), "lbl": graph.label(term), "type": "CLASS"} for term in graph.ids]
+    edges = [
+        {"sub": purl + child.replace(":", "_"), "pred": pred, "obj": purl + parent.replace(":", "_")}
+        for child, pred, parent in [
+            ("GO:0009987", "is_a", "GO:0008150"),
+            ("GO:0006259", "is_a", "GO:0009987"),
+            ("GO:0006260", "is_a", "GO:0006259"),
+            ("GO:0006270", purl + "BFO_0000050", "GO:0006260"),
+            ("GO:0030174", purl + "RO_0002211", "GO:0006270"),
+        ]
+    ]
+    path = tmp_path / "go.json"
+    path.write_text(json.dumps({"graphs": [{"nodes": nodes, "edges": edges}]}))
+    loaded = load_go_graph(str(path))
+    for term in graph.ids:
+        assert loaded.ancestors(term, relations=REGULATES_CLOSURE) == graph.ancestors(term, relations=REGULATES_CLOSURE)
+        assert loaded.label(term) == graph.label(term)
+
+
+def test_routers_answer_from_the_local_graph(graph, monkeypatch):
+    """The subgraph and shared ancestor endpoints use the local graph when it has the terms."""
+    monkeypatch.setattr(go_graph, "_graph", graph)
+
+    response = test_client.get("/api/ontology/term/GO:0006259/subgraph")
+    assert response.status_code == 200
+    assert response.json() == {
+        "descendents": [{"id": "GO:0006260"}, {"id": "GO:0006270"}],
+        "ancestors": [{"id": "GO:0008150"}, {"id": "GO:0009987"}, {"id": "GO:0006259"}],
+    }
+
+    response = test_client.get("/api/ontology/shared/GO:0006270/GO:0006259")
+    assert response.status_code == 200
+    assert response.json()["goids"] == ["GO:0008150", "GO:0009987", "GO:0006259"]
+    assert response.json()["gonames: "] == ["biological_process", "cellular process", "DNA metabolic process"]
+
+
+def test_closest_relation_agrees_with_golr(graph, monkeypatch):
+    """The closest relation gives the same answer from the local graph as from GOlr neighborhood graphs."""
+    edges = [
+        {"sub": "GO:0009987", "pred": "is_a", "obj": "GO:0008150"},
+        {"sub": "GO:0006259", "pred": "is_a", "obj": "GO:0009987"},
+        {"sub": "GO:0006260", "pred": "is_a", "obj": "GO:0006259"},
+        {"sub": "GO:0006270", "pred": "BFO:0000050", "obj": "GO:0006260"},
+    ]
+
+    async def run_solr_on_async(solr_instance, category, id, fields):
+        neighborhood = [edge for edge in edges if id in (edge["sub"], edge["obj"])]
+        return {"neighborhood_graph_json": json.dumps({"edges": neighborhood})}
+
+    async def is_valid_goid_async(id):
+        return True
+
+    monkeypatch.setattr("app.routers.ontology.run_solr_on_async", run_solr_on_async)
+    monkeypatch.setattr("app.utils.ontology_utils.is_valid_goid_async", is_valid_goid_async)
+    url = "/api/association/between/GO:0009987/GO:0006260"
+    from_golr = test_client.get(url, params={"relation": "closest"}).json()
+    monkeypatch.setattr(go_graph, "_graph", graph)
+    from_graph = test_client.get(url, params={"relation": "closest"}).json()
+    assert from_graph == {"sharedIsA": ["GO:0006259"], "sharedPartOf": ["GO:0006270"]}
+    assert {key: sorted(value) for key, value in from_golr.items()} == from_graph
+
+
+def test_closure_index_is_topological(tmp_path):
+    """Terms listed before their parents are re-indexed so ancestors come first, and closures stay correct."""
+    path = tmp_path / "go.obo"
+    stanzas = GO_OBO.split("\n\n")
+    path.write_text("\n\n".join([stanzas[0]] + list(reversed(stanzas[1:-1])) + [stanzas[-1]]))
+    graph = load_go_graph(str(path))
+    assert graph.index["GO:0008150"] < graph.index["GO:0006270"]
+    for term in graph.ids:
+        assert all(graph.index[parent] < graph.index[term] for parent in graph.parents(term))
+    assert graph.ancestors("GO:0006270") == ["GO:0008150", "GO:0009987", "GO:0006259", "GO:0006260", "GO:0006270"]
+    assert graph.depth[graph.index["GO:0006270"]] == 4
+
+
+def test_shared_and_closest_common_ancestors(graph):
+    """Shared ancestors come from ANDing closure bitsets; the closest ones and the LCA depth follow."""
+    assert graph.shared_ancestors("GO:0006270", "GO:0006260") == ["GO:0008150", "GO:0009987", "GO:0006259",
+                                                                  "GO:0006260"]
+    assert graph.closest_common_ancestors("GO:0006270", "GO:0006259") == ["GO:0006259"]
+    assert graph.lca_depth("GO:0006270", "GO:0006259") == 2
+    assert graph.closest_common_ancestors("GO:0030174", "GO:0006259") == []
+    assert graph.lca_depth("GO:0030174", "GO:0006259") is None
+
+    assert graph.compare_pairs([("GO:0006270", "GO:0006259")]) == [{
+        "subject": "GO:0006270",
+        "object": "GO:0006259",
+        "shared": ["GO:0008150", "GO:0009987", "GO:0006259"],
+        "closest": ["GO:0006259"],
+        "lca_depth": 2,
+    }]
+
+
+def test_batch_shared_ancestors_endpoint(graph, monkeypatch):
+    """The batch endpoint compares every pair of subjects and reports unknown terms."""
+    monkeypatch.setattr(go_graph, "_graph", graph)
+    response = test_client.post(
+        "/api/ontology/shared", json={"subjects": ["GO:0006270", "GO:0006260", "GO:0009987"]}
+    )
+    assert response.status_code == 200
+    results = response.json()
+    assert [(r["subject"], r["object"]) for r in results] == [
+        ("GO:0006270", "GO:0006260"), ("GO:0006270", "GO:0009987"), ("GO:0006260", "GO:0009987")
+    ]
+    assert results[0]["closest"] == ["GO:0006260"]
+    assert results[0]["lca_depth"] == 3
+
+    response = test_client.post("/api/ontology/shared", json={"subjects": ["GO:0006270"], "objects": ["GO:9999999"]})
+    assert response.status_code == 404
+
+    monkeypatch.setattr(go_graph, "_graph", None)
+    response = test_client.post("/api/ontology/shared", json={"subjects": ["GO:0006270", "GO:0006260"]})
+    assert response.status_code == 501
@@ -0,0 +1,89 @@
+"""Unit tests for the cached gocam-py conversion in app.utils.gocam_conversion."""
+
+import json
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.utils import gocam_conversion
+from app.utils.cache_backends import MemoryCacheBackend
+from app.utils.gocam_conversion import preconvert_models
+from app.utils.gocam_store import GoCamModelStore
+
+test_client = TestClient(app)
+
+MODEL = {
+    "id": "gomodel:5900dc7400000968",
+    "annotations": [{"key": "title", "value": "Wnt signaling"}, {"key": "state", "value": "production"}],
+    "individuals": [
+        {"id": "i1", "type": [{"id": "GO:0004672", "label": "protein kinase activity"}]},
+        {"id": "i2", "type": [{"id": "UniProtKB:P12345", "label": "KIN1 Hsap"}]},
+    ],
+    "facts": [{"subject": "i1", "property": "RO:0002333", "object": "i2", "annotations": []}],
+}
+
+
+def counting_conversion(monkeypatch):
+    """Give the conversions a fresh cache and count the models actually converted."""
+    backend = MemoryCacheBackend(max_bytes=1024 * 1024)
+    monkeypatch.setattr(gocam_conversion, "get_cache_backend", lambda namespace: backend)
+    convert_model = gocam_conversion.convert_model
+    converted = []
+
+    def counting_convert_model(model_data):
+        converted.append(model_data["id"])
+        return convert_model(model_data)
+
+    monkeypatch.setattr(gocam_conversion, "convert_model", counting_convert_model)
+    return converted
+
+
+def test_conversions_are_cached_by_model_version(tmp_path, monkeypatch):
+    """A model is converted once per version of its file; a changed file is converted again."""
+    (tmp_path / "5900dc7400000968.json").write_text(json.dumps(MODEL))
+    store = GoCamModelStore(path=str(tmp_path), max_models=0)
+    monkeypatch.setattr(gocam_conversion, "gocam_store", store)
+    converted = counting_conversion(monkeypatch)
+
+    first = test_client.get("/api/gocam-model/gomodel:5900dc7400000968")
+    assert first.status_code == 200
+    assert first.json()["title"] == "Wnt signaling"
+    assert test_client.get("/api/gocam-model/5900dc7400000968").json() == first.json()
+    assert converted == ["gomodel:5900dc7400000968"]
+
+    changed = {**MODEL, "annotations": [{"key": "title", "value": "Wnt signaling, revised"}]}
+    (tmp_path / "5900dc7400000968.json").write_text(json.dumps(changed))
+    assert test_client.get("/api/gocam-model/5900dc7400000968").json()["title"] == "Wnt signaling, revised"
+    assert len(converted) == 2
+
+
+def test_model_versions_are_worked_out_once_per_load(tmp_path, monkeypatch):
+    """The version of a stored model comes from its file and is kept in memory with the model."""
+    (tmp_path / "5900dc7400000968.json").write_text(json.dumps(MODEL))
+    store = GoCamModelStore(path=str(tmp_path))
+    monkeypatch.setattr(gocam_conversion, "gocam_store", store)
+    monkeypatch.setattr("app.utils.gocam_store.content_version", lambda data: pytest.fail("model was hashed"))
+    counting_conversion(monkeypatch)
+    loads = []
+    load_local = store.load_local
+    store.load_local = lambda model_id: loads.append(model_id) or load_local(model_id)
+
+    for _ in range(3):
+        assert test_client.get("/api/gocam-model/5900dc7400000968").status_code == 200
+    assert loads == ["5900dc7400000968"]
+    stat = os.stat(tmp_path / "5900dc7400000968.json")
+    assert store.get_cached("5900dc7400000968") == MODEL
+    assert store._get_cached_entry("5900dc7400000968")[1] == f"{stat.st_size}-{stat.st_mtime_ns}"
+
+
+def test_preconvert_models(tmp_path, monkeypatch):
+    """Pre-conversion converts the stored models once and skips those that cannot be converted."""
+    (tmp_path / "5900dc7400000968.json").write_text(json.dumps(MODEL))
+    (tmp_path / "broken.json").write_text(json.dumps({**MODEL, "id": "gomodel:broken", "facts": []}))
+    converted = counting_conversion(monkeypatch)
+
+    assert preconvert_models(str(tmp_path)) == 1
+    assert preconvert_models(str(tmp_path)) == 0
+    assert converted == ["gomodel:5900dc7400000968", "gomodel:broken", "gomodel:broken"]
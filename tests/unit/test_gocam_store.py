@@ -0,0 +1,195 @@
+"""Unit tests for the GO-CAM model store in app.utils.gocam_store."""
+
+import asyncio
+import io
+import json
+import tarfile
+import threading
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from app.exceptions.global_exceptions import DataNotFoundException
+from app.main import app
+from app.utils.cache_backends import MemoryCacheBackend
+from app.utils.gocam_store import GoCamModelStore, sync_models_from_tarball
+
+test_client = TestClient(app)
+
+MODEL = {
+    "id": "gomodel:5900dc7400000968",
+    "annotations": [{"key": "title", "value": "A test model"}],
+    "individuals": [],
+    "facts": [],
+}
+
+
+def counting_download(store, models):
+    """Replace the S3 download of a store with a lookup in ``models``, counting the calls."""
+    calls = []
+
+    async def download_async(model_id, etag=None):
+        calls.append(model_id)
+        await asyncio.sleep(0)
+        if model_id not in models:
+            raise DataNotFoundException("GO-CAM model not found.")
+        return models[model_id], None
+
+    store.download_async = download_async
+    return calls
+
+
+def test_models_are_downloaded_once_and_saved_locally(tmp_path):
+    """Concurrent misses share one download, which is written to the directory and kept in memory."""
+    store = GoCamModelStore(path=str(tmp_path), max_models=2)
+    calls = counting_download(store, {"5900dc7400000968": MODEL})
+
+    async def fetch_all():
+        return await asyncio.gather(*[store.get_async("gomodel:5900dc7400000968") for _ in range(5)])
+
+    assert asyncio.run(fetch_all()) == [MODEL] * 5
+    assert calls == ["5900dc7400000968"]
+    assert json.loads((tmp_path / "5900dc7400000968.json").read_text()) == MODEL
+
+    store.clear()
+    assert asyncio.run(store.get_async("5900dc7400000968")) == MODEL
+    assert calls == ["5900dc7400000968"]
+    assert store.local_hits == 1
+
+    with pytest.raises(DataNotFoundException):
+        asyncio.run(store.get_async("../5900dc7400000968"))
+    with pytest.raises(DataNotFoundException):
+        asyncio.run(store.get_async("0000000000000000"))
+
+
+def test_get_many_loads_models_concurrently_within_the_bound():
+    """Distinct models are loaded concurrently, at most max_concurrency at once, and returned in order."""
+    store = GoCamModelStore(max_models=0, max_concurrency=2)
+    in_flight = []
+    peak = []
+
+    async def download_async(model_id, etag=None):
+        in_flight.append(model_id)
+        peak.append(len(in_flight))
+        await asyncio.sleep(0.01)
+        in_flight.remove(model_id)
+        return {"id": model_id}, None
+
+    store.download_async = download_async
+    ids = ["gomodel:a", "b", "c", "a", "d"]
+    models = asyncio.run(store.get_many_async(ids))
+    assert models == [{"id": "a"}, {"id": "b"}, {"id": "c"}, {"id": "a"}, {"id": "d"}]
+    assert max(peak) == 2
+    assert len(peak) == 4
+
+
+def test_cache_backend_is_used_from_the_thread_pool(monkeypatch):
+    """Without a directory, models are kept in the gocam cache backend, called off the event loop."""
+    threads = []
+
+    class RecordingBackend(MemoryCacheBackend):
+        def get(self, key):
+            threads.append(threading.current_thread())
+            return super().get(key)
+
+        def set(self, key, value, ttl=None, size=None):
+            threads.append(threading.current_thread())
+            super().set(key, value, ttl, size)
+
+    backend = RecordingBackend(max_bytes=1024 * 1024)
+    monkeypatch.setattr("app.utils.gocam_store.get_cache_backend", lambda namespace: backend)
+    store = GoCamModelStore(max_models=0)
+    calls = counting_download(store, {"5900dc7400000968": MODEL})
+
+    assert asyncio.run(store.get_async("5900dc7400000968")) == MODEL
+    assert asyncio.run(store.get_async("5900dc7400000968")) == MODEL
+    assert calls == ["5900dc7400000968"]
+    assert len(threads) == 3
+    assert threading.main_thread() not in threads
+
+
+def test_saved_models_are_revalidated_with_their_etag(tmp_path):
+    """Models written through are checked against S3 once their ETag is older than the TTL."""
+    store = GoCamModelStore(path=str(tmp_path), max_models=0, ttl_seconds=3600)
+    s3 = {"etag": '"v1"', "model": MODEL}
+    sent = []
+
+    async def download_async(model_id, etag=None):
+        sent.append(etag)
+        if s3["etag"] is None:
+            raise httpx.ConnectError("S3 is unreachable")
+        if etag == s3["etag"]:
+            return None, etag
+        return s3["model"], s3["etag"]
+
+    store.download_async = download_async
+    assert asyncio.run(store.get_async("5900dc7400000968")) == MODEL
+    assert asyncio.run(store.get_async("5900dc7400000968")) == MODEL
+    assert sent == [None]
+    assert (tmp_path / "5900dc7400000968.etag").read_text() == '"v1"'
+
+    store.ttl_seconds = 0
+    assert asyncio.run(store.get_async("5900dc7400000968")) == MODEL
+    assert sent == [None, '"v1"']
+    revised = {**MODEL, "annotations": [{"key": "title", "value": "A revised model"}]}
+    s3.update(etag='"v2"', model=revised)
+    assert asyncio.run(store.get_async("5900dc7400000968")) == revised
+    assert json.loads((tmp_path / "5900dc7400000968.json").read_text()) == revised
+    assert (tmp_path / "5900dc7400000968.etag").read_text() == '"v2"'
+    s3["etag"] = None
+    assert asyncio.run(store.get_async("5900dc7400000968")) == revised
+
+
+def test_lru_entries_expire_after_the_ttl():
+    """Parsed models are not served from memory for longer than ttl_seconds."""
+    store = GoCamModelStore(max_models=2, ttl_seconds=0)
+    store._remember("a", {"id": "a"}, "v1")
+    assert store.get_cached("a") is None
+    assert GoCamModelStore().ttl_seconds == 3600
+
+
+def test_lru_keeps_the_most_recently_used_models():
+    """Beyond max_models the least recently used parsed model is dropped."""
+    store = GoCamModelStore(max_models=2)
+    for model_id in ["a", "b", "a", "c"]:
+        store._remember(model_id, {"id": model_id}, "v1")
+        store.get_cached(model_id)
+    assert store.get_cached("b") is None
+    assert store.get_cached("a") == {"id": "a"}
+
+
+def test_sync_models_from_tarball(tmp_path):
+    """Only the JSON members of a release tarball are written, flattened into the directory."""
+    archive_path = tmp_path / "models.tar.gz"
+    with tarfile.open(archive_path, "w:gz") as archive:
+        for name, content in [
+            ("models/5900dc7400000968.json", json.dumps(MODEL)),
+            ("models/README.txt", "not a model"),
+            ("models/broken.json", "{"),
+        ]:
+            data = content.encode()
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            archive.addfile(info, io.BytesIO(data))
+
+    directory = tmp_path / "store"
+    assert sync_models_from_tarball(str(archive_path), str(directory)) == 1
+    assert sorted(p.name for p in directory.iterdir()) == ["5900dc7400000968.json"]
+
+
+def test_model_endpoints_read_the_store(tmp_path, monkeypatch):
+    """/api/go-cam and /api/models answer from the local directory without downloading."""
+    (tmp_path / "5900dc7400000968.json").write_text(json.dumps(MODEL))
+    store = GoCamModelStore(path=str(tmp_path))
+    calls = counting_download(store, {})
+    monkeypatch.setattr("app.routers.models.gocam_store", store)
+
+    response = test_client.get("/api/go-cam/gomodel:5900dc7400000968")
+    assert response.status_code == 200
+    assert response.json() == MODEL
+    response = test_client.get("/api/models/5900dc7400000968")
+    assert response.status_code == 200
+    assert {"subject": "gomodel:5900dc7400000968", "predicate": "http://purl.org/dc/elements/1.1/title",
+            "object": "A test model"} in response.json()
+    assert calls == []
@@ -0,0 +1,178 @@
+"""Unit tests for the GO-CAM model summaries in app.utils.gocam_summary."""
+
+import json
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.utils import gocam_summary
+from app.utils.gocam_store import GoCamModelStore
+from app.utils.gocam_summary import CHAIN_LENGTH_LIMIT, build_summaries, causal_chain_lengths, summarize_model
+
+test_client = TestClient(app)
+
+MODEL = {
+    "id": "gomodel:5900dc7400000968",
+    "annotations": [
+        {"key": "title", "value": "Wnt signaling"},
+        {"key": "state", "value": "production"},
+        {"key": "comment", "value": "see PMID: 12345"},
+        {"key": "title", "value": "ignored second title"},
+    ],
+    "individuals": [
+        {
+            "id": "i1",
+            "type": [{"id": "GO:0004672", "label": "protein kinase activity"}],
+            "root-type": [{"id": "GO:0003674"}],
+            "annotations": [{"key": "source", "value": "PMID:111"}],
+        },
+        {"id": "i2", "type": [{"id": "UniProtKB:P12345", "label": "KIN1 Hsap"}], "root-type": []},
+        {"id": "i3", "type": [{"id": "GO:0003674", "label": "molecular_function"}], "root-type": []},
+        {
+            "id": "i4",
+            "type": [{"id": "GO:0005634", "label": "nucleus"}, {"id": "GO:0004672", "label": "again"}],
+            "root-type": [{"id": "GO:0005575"}],
+        },
+        {"id": "i5", "type": [{"id": "CHEBI:15377", "label": "water"}]},
+        {"id": "i6", "type": [{"id": "UniProtKB:P99999", "label": "ORPHAN"}]},
+    ],
+    "facts": [
+        {"subject": "i1", "property": "RO:0002333", "object": "i2",
+         "annotations": [{"key": "source", "value": "PMID:222 and PMID: 111"}]},
+        {"subject": "i1", "property": "RO:0002333", "object": "i5", "annotations": []},
+        {"subject": "i1", "property": "RO:0002234", "object": "i5",
+         "annotations": [{"key": "with", "value": "PMID:9"}]},
+    ],
+}
+
+
+def test_summarize_model():
+    """The summary holds the non-root GO terms with aspects, the enablers, the cited PMIDs and the flags."""
+    assert summarize_model(MODEL) == {
+        "id": "gomodel:5900dc7400000968",
+        "title": "Wnt signaling",
+        "state": "production",
+        "goterms": [
+            ["GO:0004672", "protein kinase activity", "MF"],
+            ["GO:0005634", "nucleus", "CC"],
+        ],
+        "gene_products": [["UniProtKB:P12345", "KIN1 Hsap"]],
+        "pmids": ["PMID:111", "PMID:12345", "PMID:222"],
+        "causal_edges": 0,
+        "chemical_connection": True,
+        "causal_pathway": True,
+    }
+    assert summarize_model(MODEL, chain_lengths=True)["chain_lengths"] == {"UniProtKB:P12345": 1}
+
+
+def test_chain_lengths_follow_consecutive_causal_edges():
+    """Each enabler gets the longest causal chain through its functions; the functions of a cycle count once."""
+    individuals = [{"id": f"f{n}", "type": [{"id": "GO:0003674"}]} for n in range(1, 6)]
+    individuals += [{"id": f"g{n}", "type": [{"id": f"UniProtKB:P{n}"}]} for n in range(1, 6)]
+    facts = [{"subject": f"f{n}", "property": "RO:0002333", "object": f"g{n}"} for n in range(1, 6)]
+    # f1 -> f2 -> f3 -> f1 is a cycle; f4 -> f5 is a separate pair
+    for subject, obj in [("f1", "f2"), ("f2", "f3"), ("f3", "f1"), ("f4", "f5")]:
+        facts.append({"subject": subject, "property": "RO:0002413", "object": obj})
+    summary = summarize_model({"id": "gomodel:chain", "individuals": individuals, "facts": facts}, chain_lengths=True)
+    assert summary["causal_edges"] == 4
+    assert summary["chemical_connection"] is False
+    assert summary["chain_lengths"] == {
+        "UniProtKB:P1": 3, "UniProtKB:P2": 3, "UniProtKB:P3": 3, "UniProtKB:P4": 2, "UniProtKB:P5": 2,
+    }
+    assert summary["causal_pathway"] is True
+
+
+def test_chain_lengths_of_densely_connected_models_are_bounded():
+    """Chain lengths of layered, fully connected functions are worked out without enumerating paths."""
+    layers = [[f"f{layer}_{n}" for n in range(12)] for layer in range(20)]
+    successors = {node: set(after) for before, after in zip(layers, layers[1:], strict=False) for node in before}
+    lengths = causal_chain_lengths([node for layer in layers for node in layer], successors)
+    assert set(lengths.values()) == {CHAIN_LENGTH_LIMIT}
+    short = {node: set(after) for before, after in zip(layers[:6], layers[1:7], strict=True) for node in before}
+    assert causal_chain_lengths(layers[0], short) == {node: 7 for node in layers[0]}
+
+
+@pytest.mark.parametrize("from_table", [False, True])
+def test_model_list_endpoints_answer_from_summaries(tmp_path, monkeypatch, from_table):
+    """/api/models/go|gp|pmid give the same answers from the model store and from the summary table."""
+    (tmp_path / "5900dc7400000968.json").write_text(json.dumps(MODEL))
+    monkeypatch.setattr(gocam_summary, "gocam_store", GoCamModelStore(path=str(tmp_path)))
+    if from_table:
+        monkeypatch.setattr(gocam_summary, "_summaries", build_summaries(str(tmp_path))["models"])
+        monkeypatch.setattr(gocam_summary, "gocam_store", None)
+
+    response = test_client.get("/api/models/go", params={"gocams": "5900dc7400000968"})
+    assert response.status_code == 200
+    assert response.json() == [{
+        "gocam": "gomodel:5900dc7400000968",
+        "goclasses": ["MF", "CC"],
+        "goids": ["http://purl.obolibrary.org/obo/GO_0004672", "http://purl.obolibrary.org/obo/GO_0005634"],
+        "gonames": ["protein kinase activity", "nucleus"],
+    }]
+    response = test_client.get("/api/models/gp", params={"gocams": "gomodel:5900dc7400000968"})
+    assert response.json() == [
+        {"gocam": "gomodel:5900dc7400000968", "gpids": "UniProtKB:P12345", "gpnames": "KIN1 Hsap"}
+    ]
+    response = test_client.get("/api/models/pmid", params={"gocams": "5900dc7400000968"})
+    assert response.json() == [{"gocam": "gomodel:5900dc7400000968", "sources": "PMID:111@|@PMID:12345@|@PMID:222"}]
+
+
+def test_build_summaries_only_reads_changed_models(tmp_path, monkeypatch):
+    """Rebuilding keeps the summaries of unchanged files and drops those of removed files."""
+    for model_id in ["a", "b", "c"]:
+        (tmp_path / f"{model_id}.json").write_text(json.dumps({**MODEL, "id": f"gomodel:{model_id}"}))
+    table = build_summaries(str(tmp_path))
+    assert sorted(table["models"]) == ["a", "b", "c"]
+
+    summarized = []
+    monkeypatch.setattr(gocam_summary, "summarize_model", lambda data, **kwargs: summarized.append(data["id"]) or {})
+    (tmp_path / "b.json").write_text(json.dumps({**MODEL, "id": "gomodel:b", "facts": []}))
+    stat = os.stat(tmp_path / "b.json")
+    os.utime(tmp_path / "b.json", ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+    os.remove(tmp_path / "c.json")
+    rebuilt = build_summaries(str(tmp_path), table)
+    assert summarized == ["gomodel:b"]
+    assert sorted(rebuilt["models"]) == ["a", "b"]
+    assert rebuilt["models"]["a"] == table["models"]["a"]
+
+
+def test_pathway_widget_causal_filter_is_answered_from_the_table(tmp_path, monkeypatch):
+    """With causalmf=2, models are kept when the table has a causal chain through the gene (or an isoform)."""
+    individuals = MODEL["individuals"] + [{"id": f"f{n}", "type": [{"id": "GO:0003674"}]} for n in range(1, 4)]
+    individuals.append({"id": "i7", "type": [{"id": "UniProtKB:P12345-2", "label": "KIN1 isoform 2"}]})
+    chain = [{"subject": f"f{n}", "property": "RO:0002413", "object": f"f{n + 1}"} for n in range(1, 3)]
+    enables = {"elsewhere": "i6", "through": "i2", "isoform": "i7"}
+    models = {"causal": MODEL["facts"], "plain": []}
+    for model_id, enabler in enables.items():
+        models[model_id] = [MODEL["facts"][0], {"subject": "f1", "property": "RO:0002333", "object": enabler}, *chain]
+    for model_id, facts in models.items():
+        model = {**MODEL, "id": f"gomodel:{model_id}", "individuals": individuals, "facts": facts}
+        (tmp_path / f"{model_id}.json").write_text(json.dumps(model))
+    monkeypatch.setattr(gocam_summary, "_summaries", build_summaries(str(tmp_path))["models"])
+    monkeypatch.setattr(gocam_summary, "gocam_store", None)
+    monkeypatch.setattr("app.utils.settings.get_index_files", lambda name: {
+        "UniProtKB:P12345": ["causal", "plain", "elsewhere", "through"], "UniProtKB:P12345-2": ["isoform"],
+    })
+
+    async def get_bioentity_isoforms_async(id):
+        return ["UniProtKB:P12345-2"]
+
+    monkeypatch.setattr("app.routers.pathway_widget.get_bioentity_isoforms_async", get_bioentity_isoforms_async)
+    assert gocam_summary.get_causal_properties("gomodel:plain") == {
+        "causal_edges": 0, "chemical_connection": False, "chain_lengths": {},
+        "causal_pathway": False,
+    }
+    assert gocam_summary.get_causal_properties("gomodel:elsewhere")["chain_lengths"] == {
+        "UniProtKB:P12345": 1, "UniProtKB:P99999": 3,
+    }
+    response = test_client.get("/api/gp/UniProtKB:P12345/models", params={"causalmf": 2})
+    assert [model["gocam"] for model in response.json()] == [
+        f"http://model.geneontology.org/{model_id}" for model_id in ["causal", "isoform", "through"]
+    ]
+    assert response.json()[0]["title"] == "Wnt signaling"
+    response = test_client.get("/api/gp/UniProtKB:P12345/models")
+    assert [model["gocam"] for model in response.json()] == [
+        f"http://model.geneontology.org/{model_id}" for model_id in sorted(models)
+    ]
@@ -1,8 +1,12 @@
 """Unit tests for golr_utils functions."""
 
+import asyncio
+import json
+
 import pytest
 
-from app.utils.golr_utils import get_bioentity_isoforms
+from app.utils import golr_utils
+from app.utils.golr_utils import GolrResponseCache, get_bioentity_isoforms, normalize_solr_query
 
 
 class TestFacetListParsing:
@@ -37,6 +41,77 @@ class TestFacetListParsing:
         assert result == expected
 
 
+class TestGolrResponseCache:
+    """Tests for the TTL + LRU cache of GOlr responses."""
+
+    ONTOLOGY_QUERY = normalize_solr_query('https://golr/select?q=*:*&fq=document_category:"ontology_class"&fq=id:"X"')
+    ANNOTATION_QUERY = normalize_solr_query('https://golr/select?q=*:*&fq=document_category:"annotation"')
+
+    def make_cache(self, max_bytes=100):
+        """Create a cache with a long ontology TTL and caching of annotations disabled."""
+        return GolrResponseCache(max_bytes=max_bytes, ttl_seconds={"ontology_class": 3600, "annotation": 0,
+                                                                   "default": 60})
+
+    def test_hit_returns_an_independent_copy(self):
+        """A cached response is returned as a copy and counted as a hit."""
+        cache = self.make_cache()
+        assert cache.get(self.ONTOLOGY_QUERY) is None
+        cache.put(self.ONTOLOGY_QUERY, json.dumps({"response": {"docs": [{"id": "X"}]}}), 10)
+        first = cache.get(self.ONTOLOGY_QUERY)
+        first["response"]["docs"][0]["id"] = "changed"
+        assert cache.get(self.ONTOLOGY_QUERY) == {"response": {"docs": [{"id": "X"}]}}
+        assert cache.stats()["hits"] == 2
+        assert cache.stats()["misses"] == 1
+
+    def test_ttl_depends_on_document_category(self):
+        """Categories with a zero TTL are not cached and expired entries are dropped."""
+        cache = self.make_cache()
+        cache.put(self.ANNOTATION_QUERY, json.dumps({"response": {}}), 10)
+        assert cache.get(self.ANNOTATION_QUERY) is None
+        cache.ttl_seconds["ontology_class"] = -1
+        cache.put(self.ONTOLOGY_QUERY, json.dumps({"response": {}}), 10)
+        assert cache.get(self.ONTOLOGY_QUERY) is None
+        assert cache.ttl_for("https://golr/select?q=*:*") == 60
+
+    def test_lru_eviction_by_size(self):
+        """The least recently used responses are evicted once max_bytes is exceeded."""
+        cache = self.make_cache(max_bytes=100)
+        keys = [f"{self.ONTOLOGY_QUERY}&fq=id%3A{i}" for i in range(3)]
+        cache.put(keys[0], json.dumps({"n": 0}), 40)
+        cache.put(keys[1], json.dumps({"n": 1}), 40)
+        assert cache.get(keys[0]) == {"n": 0}
+        cache.put(keys[2], json.dumps({"n": 2}), 40)
+        assert cache.get(keys[1]) is None
+        assert cache.get(keys[0]) == {"n": 0}
+        assert cache.stats()["bytes"] == 80
+        assert cache.stats()["evictions"] == 1
+        cache.put("too-big", json.dumps({}), 101)
+        assert cache.stats()["entries"] == 2
+
+    def test_fresh_queries_bypass_and_replace_the_cached_response(self, monkeypatch):
+        """Fresh queries skip the cached response and replace it; uncached queries neither read nor replace it."""
+        cache = self.make_cache()
+        monkeypatch.setattr(golr_utils, "golr_cache", cache)
+        fetched = []
+
+        async def fake_fetch(query, key, use_cache=True):
+            fetched.append(query)
+            response = {"response": {"numFound": len(fetched)}}
+            if use_cache:
+                cache.put(key, json.dumps(response), 10)
+            return response
+
+        monkeypatch.setattr(golr_utils, "_async_fetch_golr_json", fake_fetch)
+        assert asyncio.run(golr_utils._async_get_golr_json(self.ONTOLOGY_QUERY))["response"]["numFound"] == 1
+        assert asyncio.run(golr_utils._async_get_golr_json(self.ONTOLOGY_QUERY))["response"]["numFound"] == 1
+        assert asyncio.run(golr_utils._async_get_golr_json(self.ONTOLOGY_QUERY, fresh=True))["response"]["numFound"] == 2
+        assert asyncio.run(golr_utils._async_get_golr_json(self.ONTOLOGY_QUERY))["response"]["numFound"] == 2
+        assert len(fetched) == 2
+        uncached = golr_utils._async_get_golr_json(self.ONTOLOGY_QUERY, cache=False)
+        assert asyncio.run(uncached)["response"]["numFound"] == 3
+        assert asyncio.run(golr_utils._async_get_golr_json(self.ONTOLOGY_QUERY))["response"]["numFound"] == 2
+
+
 @pytest.mark.integration
 def test_get_bioentity_isoforms_from_golr():
     """
@@ -0,0 +1,35 @@
+"""Unit tests for the pooled upstream clients in app.utils.http_clients."""
+
+import asyncio
+
+from app.utils import http_clients
+from app.utils.http_clients import close_upstream_clients, get_async_client, get_pool_config, get_session
+
+
+def test_one_session_per_host():
+    """Requests to the same host share a session; other hosts get their own pool."""
+    golr = get_session("https://golr.geneontology.org/solr/select?q=*:*")
+    assert get_session("https://golr.geneontology.org/solr/other") is golr
+    assert get_session("https://go-public.s3.amazonaws.com/files/go-cam/x.json") is not golr
+    asyncio.run(close_upstream_clients())
+    assert http_clients._sessions == {}
+
+
+def test_async_client_reused_within_a_loop_and_closed_on_shutdown():
+    """The async client is pooled per host for the running loop and closed by the shutdown hook."""
+
+    async def run():
+        client = get_async_client("https://golr.geneontology.org/solr/select")
+        assert get_async_client("https://golr.geneontology.org/solr/") is client
+        await close_upstream_clients()
+        return client
+
+    client = asyncio.run(run())
+    assert client.is_closed
+
+
+def test_pool_limits_come_from_config():
+    """Pool limits are read from the upstream_http section of config.yaml."""
+    config = get_pool_config()
+    assert config["max_keepalive_connections"] > 0
+    assert config["max_connections"] >= config["max_keepalive_connections"]
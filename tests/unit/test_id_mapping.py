@@ -0,0 +1,99 @@
+"""Unit tests for the local identifier mapping table in app.utils.id_mapping."""
+
+import asyncio
+import json
+
+import pytest
+
+from app.exceptions.global_exceptions import DataNotFoundException
+from app.utils import id_mapping
+from app.utils.golr_utils import is_valid_bioentity_async
+from app.utils.id_mapping import IdMappingTable, SortedIds, load_id_mapping
+from app.utils.mygene_utils import (
+    gene_to_uniprot_from_mygene,
+    genes_to_uniprot_from_mygene,
+    uniprot_to_gene_from_mygene,
+)
+
+HGNC_TSV = (
+    "hgnc_id\tsymbol\tentrez_id\tensembl_gene_id\tuniprot_ids\n"
+    "HGNC:940001\tBBB1\t940001\tENSG00000940001\tP94001|Q94002\n"
+    "HGNC:940003\tBBB3\t940003\t\tP94003\n"
+    "HGNC:940004\tBBB4\t\t\t\n"
+)
+
+
+def test_sorted_ids_search():
+    """Packed identifiers keep their order and are found by binary search."""
+    ids = SortedIds(["HGNC:1", "HGNC:10", "HGNC:2"])
+    assert list(ids) == ["HGNC:1", "HGNC:10", "HGNC:2"]
+    assert ids.index("HGNC:10") == 1
+    assert ids.index("HGNC:3") == -1
+    assert SortedIds([]).index("HGNC:1") == -1
+
+
+def test_table_maps_both_directions_in_file_order():
+    """Proteins of a gene keep the order of the file, and every gene of a protein is found."""
+    table = IdMappingTable([
+        ("HGNC:2", "Q00002"), ("HGNC:2", "UniProtKB:P00002"), ("HGNC:1", "P00001"),
+        ("NCBIGene:2", "P00002"), ("HGNC:2", "Q00002"),
+    ])
+    assert len(table) == 3
+    assert table.gene_to_uniprot("HGNC:2") == ["UniProtKB:Q00002", "UniProtKB:P00002"]
+    assert table.uniprot_to_gene("P00002") == ["HGNC:2", "NCBIGene:2"]
+    assert table.gene_to_uniprot("HGNC:3") == []
+    assert table.uniprot_to_gene("UniProtKB:P99999") == []
+
+
+@pytest.mark.parametrize("layout", ["hgnc", "pairs", "json"])
+def test_mapping_file_layouts(tmp_path, layout):
+    """HGNC dumps, two column TSVs and JSON files load into the same lookups."""
+    if layout == "hgnc":
+        path = tmp_path / "hgnc_complete_set.txt"
+        path.write_text(HGNC_TSV)
+    elif layout == "pairs":
+        path = tmp_path / "mapping.tsv"
+        path.write_text("# gene\tprotein\nHGNC:940001\tP94001\nHGNC:940001\tUniProtKB:Q94002\n\nHGNC:940003\tP94003\n")
+    else:
+        path = tmp_path / "mapping.json"
+        path.write_text(json.dumps({"HGNC:940001": ["P94001", "Q94002"], "HGNC:940003": "UniProtKB:P94003"}))
+    table = load_id_mapping(str(path))
+    assert table.gene_to_uniprot("HGNC:940001") == ["UniProtKB:P94001", "UniProtKB:Q94002"]
+    assert table.uniprot_to_gene("P94003")[0] == "HGNC:940003"
+    if layout == "hgnc":
+        assert table.gene_to_uniprot("ENSEMBL:ENSG00000940001") == ["UniProtKB:P94001", "UniProtKB:Q94002"]
+        assert table.uniprot_to_gene("P94003") == ["HGNC:940003", "NCBIGene:940003"]
+        assert table.gene_to_uniprot("HGNC:940004") == []
+
+
+def test_lookups_use_the_table_before_remote_services(tmp_path, monkeypatch):
+    """With a table loaded, MyGene.info is only queried for identifiers it does not have."""
+    path = tmp_path / "hgnc_complete_set.txt"
+    path.write_text(HGNC_TSV)
+    monkeypatch.setattr(id_mapping, "_table", load_id_mapping(str(path)))
+    monkeypatch.setattr("app.utils.mygene_utils.get_client", lambda kind: pytest.fail("MyGeneInfo was queried"))
+
+    assert gene_to_uniprot_from_mygene("NCBIGene:940001") == ["UniProtKB:P94001", "UniProtKB:Q94002"]
+    assert uniprot_to_gene_from_mygene("UniProtKB:Q94002") == ["HGNC:940001"]
+    assert genes_to_uniprot_from_mygene(["HGNC:940003"]) == {"HGNC:940003": ["UniProtKB:P94003"]}
+
+
+def test_is_valid_bioentity_maps_hgnc_ids_locally(tmp_path, monkeypatch):
+    """An HGNC id missing from GOlr is checked again under its UniProtKB id taken from the table."""
+    path = tmp_path / "hgnc_complete_set.txt"
+    path.write_text(HGNC_TSV)
+    monkeypatch.setattr(id_mapping, "_table", load_id_mapping(str(path)))
+    monkeypatch.setattr(
+        "app.utils.golr_utils.gene_to_uniprot_from_mygene", lambda id: pytest.fail("MyGeneInfo was queried")
+    )
+    queried = []
+
+    async def run_solr_on_async(solr, category, id, fields):
+        queried.append(id)
+        if id.startswith("HGNC:"):
+            raise DataNotFoundException(detail=f"{id} not found")
+        return {"id": id}
+
+    monkeypatch.setattr("app.utils.golr_utils.run_solr_on_async", run_solr_on_async)
+    assert asyncio.run(is_valid_bioentity_async("HGNC:940003")) is True
+    assert queried == ["HGNC:940003", "UniProtKB:P94003"]
@@ -10,7 +10,10 @@ from app.exceptions.global_exceptions import DataNotFoundException
 from app.utils.mygene_utils import (
     gene_to_uniprot_from_alliance,
     gene_to_uniprot_from_mygene,
+    genes_to_uniprot_from_mygene,
     uniprot_to_gene_from_mygene,
+    uniprots_to_genes_from_mygene,
+    seed_mapping_cache,
 )
 
 
@@ -323,7 +326,11 @@ def test_alliance_parses_gcrp_only_gene_summary_shape(monkeypatch) -> None:
                 },
             }
 
-    monkeypatch.setattr("app.utils.mygene_utils.requests.get", lambda *a, **k: _Resp())
+    class _Session:
+        def get(self, *args, **kwargs):
+            return _Resp()
+
+    monkeypatch.setattr("app.utils.mygene_utils.get_session", lambda url: _Session())
 
     assert gene_to_uniprot_from_alliance("HGNC:12139") == ["UniProtKB:A0A0B4J263"]
 
@@ -346,7 +353,11 @@ def test_alliance_parses_uniprot_in_cross_references(monkeypatch) -> None:
                 },
             }
 
-    monkeypatch.setattr("app.utils.mygene_utils.requests.get", lambda *a, **k: _Resp())
+    class _Session:
+        def get(self, *args, **kwargs):
+            return _Resp()
+
+    monkeypatch.setattr("app.utils.mygene_utils.get_session", lambda url: _Session())
 
     assert gene_to_uniprot_from_alliance("HGNC:11998") == ["UniProtKB:P04637"]
 
@@ -361,12 +372,96 @@ def test_alliance_no_uniprot_raises(monkeypatch) -> None:
         def json(self):
             return {"category": "gene_summary", "gene": {"crossReferences": []}}
 
-    monkeypatch.setattr("app.utils.mygene_utils.requests.get", lambda *a, **k: _Resp())
+    class _Session:
+        def get(self, *args, **kwargs):
+            return _Resp()
+
+    monkeypatch.setattr("app.utils.mygene_utils.get_session", lambda url: _Session())
 
     with pytest.raises(DataNotFoundException):
         gene_to_uniprot_from_alliance("HGNC:99999999")
 
 
+class _BatchClient:
+    """Stand-in MyGeneInfo client recording its ``querymany`` calls."""
+
+    def __init__(self, hits):
+        self.hits = hits
+        self.calls = []
+
+    def querymany(self, qterms, scopes=None, **kwargs):
+        self.calls.append((list(qterms), scopes))
+        return [hit for hit in self.hits if hit["query"] in qterms]
+
+
+def test_genes_to_uniprot_batches_and_shares_the_cache(monkeypatch) -> None:
+    """Gene ids are resolved with one querymany per namespace and the answers feed the single-id lookup."""
+    client = _BatchClient([
+        {"query": "910001", "uniprot": {"Swiss-Prot": "P91001", "TrEMBL": ["Q91001"]}},
+        {"query": "910002", "uniprot": {"TrEMBL": ["Q91002", "Q91003"]}},
+        {"query": "910003", "notfound": True},
+        {"query": "910004", "uniprot": {"Swiss-Prot": ["P91004", "UniProtKB:P91005"]}},
+    ])
+    monkeypatch.setattr("app.utils.mygene_utils.get_client", lambda kind: client)
+    monkeypatch.setattr(
+        "app.utils.mygene_utils.gene_to_uniprot_from_alliance",
+        lambda gene_id: (_ for _ in ()).throw(DataNotFoundException(detail="none")),
+    )
+
+    result = genes_to_uniprot_from_mygene(
+        ["HGNC:910001", "HGNC:910002", "HGNC:910001", "HGNC:910003", "NCBIGene:910004"]
+    )
+    assert result == {
+        "HGNC:910001": ["UniProtKB:P91001"],
+        "HGNC:910002": ["UniProtKB:Q91002", "UniProtKB:Q91003"],
+        "NCBIGene:910004": ["UniProtKB:P91004", "UniProtKB:P91005"],
+    }
+    assert client.calls == [(["910001", "910002", "910003"], "HGNC"), (["910004"], "entrezgene")]
+
+    assert gene_to_uniprot_from_mygene("HGNC:910001") == ["UniProtKB:P91001"]
+    assert genes_to_uniprot_from_mygene(["HGNC:910002"]) == {"HGNC:910002": ["UniProtKB:Q91002", "UniProtKB:Q91003"]}
+    assert len(client.calls) == 2
+
+
+def test_uniprots_to_genes_batches_and_verifies_hits(monkeypatch) -> None:
+    """Proteins are resolved in one querymany call and only hits that list the protein count."""
+    client = _BatchClient([
+        {"query": "P92001", "HGNC": "92001", "uniprot": {"Swiss-Prot": "P92001"}},
+        {"query": "Q92002", "HGNC": "HGNC:92002", "uniprot": {"Swiss-Prot": "P00000", "TrEMBL": ["Q92002"]}},
+        {"query": "P92003", "HGNC": "92003", "uniprot": {"Swiss-Prot": "P99999"}},
+        {"query": "P92004", "notfound": True},
+    ])
+    monkeypatch.setattr("app.utils.mygene_utils.get_client", lambda kind: client)
+
+    result = uniprots_to_genes_from_mygene(
+        ["UniProtKB:P92001", "UniProtKB:Q92002", "UniProtKB:P92003", "UniProtKB:P92004", "UniProtKB:P92001"]
+    )
+    assert result == {"UniProtKB:P92001": ["HGNC:92001"], "UniProtKB:Q92002": ["HGNC:92002"]}
+    assert len(client.calls) == 1
+    assert uniprot_to_gene_from_mygene("UniProtKB:P92001") == ["HGNC:92001"]
+    assert len(client.calls) == 1
+
+
+def test_seed_mapping_cache_answers_lookups_offline(tmp_path, monkeypatch) -> None:
+    """Mappings seeded from an HGNC dump answer both directions without querying MyGeneInfo."""
+    path = tmp_path / "hgnc_complete_set.txt"
+    path.write_text(
+        "hgnc_id\tsymbol\tentrez_id\tensembl_gene_id\tuniprot_ids\n"
+        "HGNC:930001\tAAA1\t930001\tENSG00000930001\tP93001|Q93002\n"
+        "HGNC:930003\tAAA3\t\t\t\n"
+    )
+    monkeypatch.setattr("app.utils.mygene_utils.get_client", lambda kind: pytest.fail("MyGeneInfo was queried"))
+
+    assert seed_mapping_cache(str(path)) == 5
+    assert seed_mapping_cache(str(path)) == 0
+    assert gene_to_uniprot_from_mygene("HGNC:930001") == ["UniProtKB:P93001", "UniProtKB:Q93002"]
+    assert genes_to_uniprot_from_mygene(["NCBIGene:930001", "ENSEMBL:ENSG00000930001"]) == {
+        "NCBIGene:930001": ["UniProtKB:P93001", "UniProtKB:Q93002"],
+        "ENSEMBL:ENSG00000930001": ["UniProtKB:P93001", "UniProtKB:Q93002"],
+    }
+    assert uniprot_to_gene_from_mygene("UniProtKB:Q93002") == ["HGNC:930001"]
+
+
 @pytest.mark.integration
 def test_round_trip_gene_to_uniprot_to_gene() -> None:
     """Test round-trip conversion: HGNC -> UniProt -> HGNC.
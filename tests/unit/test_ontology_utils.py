@@ -1,12 +1,15 @@
 """Unit tests for the endpoints in the ontology utils module."""
+import asyncio
 import logging
 import unittest
+import unittest.mock
 
 from fastapi.testclient import TestClient
 from ontobio.sparql.sparql_ontology import EagerRemoteSparqlOntology
 
 import app.utils.ontology_utils as ou
 from app.main import app
+from app.utils.cache_backends import MemoryCacheBackend
 from app.utils.settings import get_golr_config
 
 test_client = TestClient(app)
@@ -263,3 +266,45 @@ class TestOntologyUtils(unittest.TestCase):
 
 if __name__ == "__main__":
     unittest.main()
+
+
+class TestValidatedFetch(unittest.TestCase):
+    """Test fetching ontology documents while validating the identifier from the same response."""
+
+    def setUp(self):
+        """Record the GOlr calls made through run_solr_on_async."""
+        self.calls = []
+
+        async def fake_run_solr_on_async(solr_instance, category, id, fields):
+            self.calls.append((id, fields))
+            if id == "GO:0000000":
+                raise ou.DataNotFoundException(detail=f"Item with ID {id} not found")
+            return {"id": id, "annotation_class_label": "biological_process"}
+
+        patcher = unittest.mock.patch.object(ou, "run_solr_on_async", fake_run_solr_on_async)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        backend_patcher = unittest.mock.patch(
+            "app.utils.cache_backends.get_cache_backend", return_value=MemoryCacheBackend(max_bytes=1000)
+        )
+        backend_patcher.start()
+        self.addCleanup(backend_patcher.stop)
+
+    def test_fetch_go_term_makes_one_call(self):
+        """A known term is validated and fetched with a single GOlr query."""
+        doc = asyncio.run(ou.fetch_go_term_async("GO:0008150", "id,annotation_class_label"))
+        self.assertEqual(doc["annotation_class_label"], "biological_process")
+        self.assertEqual(self.calls, [("GO:0008150", "id,annotation_class_label")])
+
+    def test_fetch_go_term_rejects_bad_format_without_querying(self):
+        """Malformed identifiers raise ValueError before anything is sent upstream."""
+        with self.assertRaises(ValueError):
+            asyncio.run(ou.fetch_go_term_async("NOT_A_GO_ID", "id"))
+        self.assertEqual(self.calls, [])
+
+    def test_fetch_go_term_unknown_term(self):
+        """Unknown terms raise DataNotFoundException and are then served from the negative cache."""
+        for _ in range(2):
+            with self.assertRaises(ou.DataNotFoundException):
+                asyncio.run(ou.fetch_go_term_async("GO:0000000", "id"))
+        self.assertEqual(len(self.calls), 1)
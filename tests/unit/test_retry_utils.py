@@ -0,0 +1,116 @@
+"""Unit tests for the GOlr retry policy in app.utils.retry_utils."""
+
+import asyncio
+import time
+
+import httpx
+import pytest
+import requests
+
+from app.exceptions.global_exceptions import DataNotFoundException
+from app.utils import retry_utils
+from app.utils.retry_utils import (
+    backoff_delay,
+    is_retryable_error,
+    retry_on_golr_error,
+    start_request_retry_budget,
+)
+
+
+def _requests_http_error(status_code):
+    response = requests.Response()
+    response.status_code = status_code
+    return requests.HTTPError(f"{status_code} error", response=response)
+
+
+def _httpx_status_error(status_code):
+    request = httpx.Request("GET", "https://golr.example.org/solr/select")
+    response = httpx.Response(status_code, request=request)
+    return httpx.HTTPStatusError(f"{status_code} error", request=request, response=response)
+
+
+class SolrError(Exception):
+    """Stand-in with the same class name as pysolr's SolrError."""
+
+
+@pytest.mark.parametrize(
+    "error,expected",
+    [
+        (_requests_http_error(503), True),
+        (_requests_http_error(522), True),
+        (_requests_http_error(400), False),
+        (_httpx_status_error(502), True),
+        (_httpx_status_error(404), False),
+        (requests.ConnectionError("connection refused"), True),
+        (requests.Timeout("read timeout"), True),
+        (httpx.ReadTimeout("timed out"), True),
+        (SolrError("Solr responded with an error (HTTP 504): Gateway Timeout"), True),
+        (SolrError("Solr responded with an error (HTTP 400): undefined field"), False),
+        (SolrError("Failed to connect to server at golr"), True),
+        # The message mentions '400' and 'connection' but it is an application error.
+        (DataNotFoundException(detail="Item with ID GO:0004000 connection not found"), False),
+        (ValueError("timeout"), False),
+    ],
+)
+def test_is_retryable_error(error, expected):
+    """Errors are classified by status code and exception type, not by message substrings."""
+    assert is_retryable_error(error) is expected
+
+
+def test_backoff_delay_is_capped_and_jittered():
+    """The backoff grows exponentially up to max_delay and never goes negative."""
+    for attempt in range(10):
+        wait = backoff_delay(attempt, delay=0.5, max_delay=4.0)
+        assert 0 <= wait <= min(4.0, 0.5 * 2**attempt)
+
+
+def test_sync_retry_stops_on_non_retryable_error(monkeypatch):
+    """A non-retryable error is raised on the first attempt without sleeping."""
+    monkeypatch.setattr(time, "sleep", lambda _: pytest.fail("should not sleep"))
+    calls = []
+
+    @retry_on_golr_error(max_retries=3, delay=1)
+    def lookup():
+        calls.append(1)
+        raise DataNotFoundException(detail="Item with ID GO:0000400 not found")
+
+    with pytest.raises(DataNotFoundException):
+        lookup()
+    assert len(calls) == 1
+
+
+def test_async_retry_does_not_block_the_event_loop(monkeypatch):
+    """Async retries wait with asyncio.sleep, never time.sleep."""
+    monkeypatch.setattr(time, "sleep", lambda _: pytest.fail("time.sleep called from async code"))
+    monkeypatch.setattr(retry_utils, "backoff_delay", lambda *args: 0)
+    calls = []
+
+    @retry_on_golr_error(max_retries=3, delay=1)
+    async def query():
+        calls.append(1)
+        if len(calls) < 3:
+            raise _httpx_status_error(503)
+        return "ok"
+
+    assert asyncio.run(query()) == "ok"
+    assert len(calls) == 3
+
+
+def test_request_retry_budget_limits_retries(monkeypatch):
+    """Once the per-request budget is spent, failing calls are not retried any more."""
+    monkeypatch.setattr(retry_utils, "backoff_delay", lambda *args: 0)
+    calls = []
+
+    @retry_on_golr_error(max_retries=5, delay=1)
+    async def query():
+        calls.append(1)
+        raise _httpx_status_error(502)
+
+    async def handle_request():
+        start_request_retry_budget(2)
+        with pytest.raises(httpx.HTTPStatusError):
+            await query()
+
+    asyncio.run(handle_request())
+    # One initial attempt plus the two retries the budget allows.
+    assert len(calls) == 3
@@ -0,0 +1,307 @@
+"""Unit tests for the ribbon aggregation engine in app.utils.ribbon_utils."""
+
+import asyncio
+import random
+
+import pytest
+
+from app.utils import ribbon_utils
+from app.utils.cache_backends import get_cache_backend
+from app.utils.ontology_utils import aspect_map, get_category_terms
+from app.utils.ribbon_utils import (
+    CompiledRibbonCategories,
+    aggregate_ribbon_subject,
+    build_annotation_filters,
+    build_ribbon_facets,
+    count_ribbon_facets_async,
+    entity_from_facets,
+    fetch_ribbon_annotations_async,
+    get_ribbon_subjects_async,
+    ribbon_subject_cache_key,
+)
+
+BP, MF, CC = aspect_map["P"], aspect_map["F"], aspect_map["C"]
+SLIM = {
+    BP: ["GO:0002376", "GO:0005975", "GO:0006259", "GO:0007049"],
+    MF: ["GO:0003677", "GO:0003824", "GO:0005215"],
+    CC: ["GO:0005634", "GO:0005737", "GO:0005829"],
+}
+OTHER_TERMS = ["GO:0000001", "GO:0000002", "GO:0000003"]
+EVIDENCE = ["EXP", "IDA", "IBA", "IEA", "ISS"]
+
+
+def _categories(slim):
+    categories = []
+    for root, terms in slim.items():
+        groups = [{"id": term, "label": term, "type": "Term"} for term in terms]
+        categories.append(
+            {
+                "id": root,
+                "label": root,
+                "groups": [{"id": root, "type": "All"}] + groups + [{"id": root, "type": "Other"}],
+            }
+        )
+    return categories
+
+
+def _annotations(rng, count):
+    roots = list(aspect_map.items())
+    all_terms = [term for terms in SLIM.values() for term in terms] + OTHER_TERMS
+    annotations = []
+    for _ in range(count):
+        aspect, root = rng.choice(roots)
+        closure = rng.sample(all_terms, rng.randint(0, 4))
+        if rng.random() < 0.8:
+            closure.append(root)
+        annotations.append(
+            {
+                "annotation_class": "GO:%07d" % rng.randint(1, 40),
+                "evidence_type": rng.choice(EVIDENCE),
+                "regulates_closure": closure,
+                "aspect": aspect,
+            }
+        )
+    return annotations
+
+
+def _reference_entity(subject_id, categories, data, cross_aspect):
+    """The per category, per group scan the ribbon endpoint used before the engine."""
+    entity = {"id": subject_id, "groups": {}, "nb_classes": 0, "nb_annotations": 0, "terms": set()}
+    for annot in data:
+        aspect = aspect_map[annot["aspect"]]
+        found = False
+        for cat in categories:
+            for gp in cat["groups"]:
+                if gp["type"] == "Other":
+                    continue
+                if (cross_aspect or cat["id"] == aspect) and gp["id"] in annot["regulates_closure"]:
+                    found = True
+                    break
+        if found:
+            entity["terms"].add(annot["annotation_class"])
+            entity["nb_annotations"] += 1
+
+    for cat in categories:
+        for gp in cat["groups"]:
+            group = gp["id"]
+            if gp["type"] == "Other":
+                continue
+            for annot in data:
+                aspect = aspect_map[annot["aspect"]]
+                if (cross_aspect or cat["id"] == aspect) and group in annot["regulates_closure"]:
+                    if group not in entity["groups"]:
+                        entity["groups"][group] = {"ALL": {"terms": set(), "nb_classes": 0, "nb_annotations": 0}}
+                    if annot["evidence_type"] not in entity["groups"][group]:
+                        entity["groups"][group][annot["evidence_type"]] = {
+                            "terms": set(),
+                            "nb_classes": 0,
+                            "nb_annotations": 0,
+                        }
+                    entity["groups"][group][annot["evidence_type"]]["terms"].add(annot["annotation_class"])
+                    entity["groups"][group][annot["evidence_type"]]["nb_annotations"] += 1
+                    entity["groups"][group]["ALL"]["terms"].add(annot["annotation_class"])
+                    entity["groups"][group]["ALL"]["nb_annotations"] += 1
+
+        terms = [term["id"] for term in get_category_terms(cat)]
+        other = {"ALL": {"terms": set(), "nb_classes": 0, "nb_annotations": 0}}
+        for annot in data:
+            aspect = aspect_map[annot["aspect"]]
+            if cross_aspect or cat["id"] == aspect:
+                if not any(term in annot["regulates_closure"] for term in terms):
+                    other["ALL"]["nb_annotations"] += 1
+                    other["ALL"]["terms"].add(annot["annotation_class"])
+                    if annot["evidence_type"] not in other:
+                        other[annot["evidence_type"]] = {"terms": set(), "nb_classes": 0, "nb_annotations": 0}
+                    other[annot["evidence_type"]]["nb_annotations"] += 1
+                    other[annot["evidence_type"]]["terms"].add(annot["annotation_class"])
+        entity["groups"][cat["id"] + "-other"] = other
+
+    for group in entity["groups"]:
+        for subgroup in entity["groups"][group]:
+            entity["groups"][group][subgroup]["nb_classes"] = len(entity["groups"][group][subgroup]["terms"])
+            if "-other" not in group:
+                del entity["groups"][group][subgroup]["terms"]
+            else:
+                entity["groups"][group][subgroup]["terms"] = list(entity["groups"][group][subgroup]["terms"])
+    entity["nb_classes"] = len(entity["terms"])
+    del entity["terms"]
+    return entity
+
+
+def _ordered(value):
+    """Turn nested dicts into lists of items so that comparisons also check key order."""
+    if isinstance(value, dict):
+        return [(key, _ordered(item)) for key, item in value.items()]
+    return value
+
+
+@pytest.mark.parametrize("cross_aspect", [False, True])
+@pytest.mark.parametrize("seed", range(5))
+def test_aggregation_matches_reference_scan(seed, cross_aspect):
+    """The engine returns exactly what the original scan did, including key and term order."""
+    rng = random.Random(seed)  # noqa: S311
+    categories = _categories(SLIM)
+    # a slim term listed twice within a category is counted twice, as before
+    categories[0]["groups"].insert(2, dict(categories[0]["groups"][1]))
+    annotations = _annotations(rng, 300)
+
+    entity = aggregate_ribbon_subject("UniProtKB:P0", CompiledRibbonCategories(categories), annotations, cross_aspect)
+    expected = _reference_entity("UniProtKB:P0", categories, annotations, cross_aspect)
+    assert _ordered(entity) == _ordered(expected)
+
+
+def test_aggregation_without_annotations():
+    """A subject without annotations only gets empty "other" buckets."""
+    entity = aggregate_ribbon_subject("UniProtKB:P0", CompiledRibbonCategories(_categories(SLIM)), [], False)
+    assert entity["nb_classes"] == 0
+    assert entity["nb_annotations"] == 0
+    assert list(entity["groups"]) == [BP + "-other", MF + "-other", CC + "-other"]
+    assert entity["groups"][BP + "-other"] == {"ALL": {"terms": [], "nb_classes": 0, "nb_annotations": 0}}
+
+
+def test_annotations_are_fetched_in_batches_and_split_per_subject(monkeypatch):
+    """Subjects are queried a batch at a time and each gets its own docs back, in GOlr order."""
+    queries = []
+
+    async def fake_solr(solr_instance, category, q, qf, fields, optionals, highlight=False, cache=True):
+        assert not cache
+        queries.append(optionals)
+        subjects = optionals.split('bioentity:("')[1].split('")')[0].split('" "')
+        return [
+            {"bioentity": subject, "annotation_class": "GO:000000%d" % i}
+            for i in range(2)
+            for subject in subjects
+        ]
+
+    monkeypatch.setattr(ribbon_utils, "gu_run_solr_text_on_async", fake_solr)
+    filters = build_annotation_filters(["EXP", "IDA"], exclude_IBA=True, exclude_PB=True)
+    subject_ids = ["MGI:MGI:98214", "RGD:620474", "MGI:MGI:98214", "FB:FBgn0000490"]
+
+    annotations = asyncio.run(fetch_ribbon_annotations_async(subject_ids, filters, batch_size=2))
+
+    assert len(queries) == 2
+    assert queries[0].startswith('&fq=bioentity:("MGI:MGI:98214" "RGD:620474")&rows=100000&start=0&sort=id asc')
+    assert queries[0].endswith('&fq=evidence_type:("EXP" "IDA")&fq=!annotation_class:"GO:0005515"')
+    assert list(annotations) == ["MGI:MGI:98214", "RGD:620474", "FB:FBgn0000490"]
+    assert [doc["annotation_class"] for doc in annotations["RGD:620474"]] == ["GO:0000000", "GO:0000001"]
+    assert all(doc["bioentity"] == "FB:FBgn0000490" for doc in annotations["FB:FBgn0000490"])
+
+
+def test_large_batches_are_paged(monkeypatch):
+    """Batches with more annotations than a page are fetched page by page with start."""
+    starts = []
+
+    async def fake_solr(solr_instance, category, q, qf, fields, optionals, highlight=False, cache=True):
+        start = int(optionals.split("&start=")[1].split("&")[0])
+        starts.append(start)
+        return [{"bioentity": "MGI:MGI:98214", "annotation_class": "GO:%07d" % i} for i in range(start, min(start + 3, 7))]
+
+    monkeypatch.setattr(ribbon_utils, "gu_run_solr_text_on_async", fake_solr)
+    monkeypatch.setattr(ribbon_utils, "ROWS_PER_QUERY", 3)
+
+    annotations = asyncio.run(fetch_ribbon_annotations_async(["MGI:MGI:98214"]))
+
+    assert starts == [0, 3, 6]
+    assert [doc["annotation_class"] for doc in annotations["MGI:MGI:98214"]] == ["GO:%07d" % i for i in range(7)]
+
+
+def test_facet_queries_are_restricted_to_the_slim_and_aspects():
+    """Each group is counted on its own aspect, and "other" excludes the category's slim terms."""
+    compiled = CompiledRibbonCategories(_categories({BP: ["GO:0002376"], MF: ["GO:0003677", "GO:0003824"]}))
+    facets = build_ribbon_facets(compiled, cross_aspect=False)
+
+    group = facets["g%d" % compiled.bits["GO:0002376"]]
+    assert group["q"] == '+regulates_closure:("GO:0002376") +aspect:("P")'
+    assert group["facet"]["classes"] == "unique(annotation_class)"
+    assert facets["o1"]["q"] == '+aspect:F -regulates_closure:("GO:0003677" "GO:0003824")'
+    assert facets["o1"]["facet"]["classes"]["field"] == "annotation_class"
+    assert facets["subject"]["q"].count("regulates_closure") == 5
+
+    cross = build_ribbon_facets(compiled, cross_aspect=True)
+    assert cross["g%d" % compiled.bits["GO:0002376"]]["q"] == 'regulates_closure:("GO:0002376")'
+    assert cross["o0"]["q"] == '*:* -regulates_closure:("GO:0002376")'
+
+
+def test_entity_from_facets():
+    """Facet counts are turned into the same cells as the document based aggregation."""
+    compiled = CompiledRibbonCategories(_categories({BP: ["GO:0002376", "GO:0005975"]}))
+    facets = {
+        "count": 5,
+        "subject": {"count": 4, "classes": 3},
+        "g%d" % compiled.bits[BP]: {
+            "count": 4,
+            "classes": 3,
+            "evidence": {
+                "buckets": [{"val": "IDA", "count": 3, "classes": 2}, {"val": "IEA", "count": 1, "classes": 1}]
+            },
+        },
+        "g%d" % compiled.bits["GO:0005975"]: {"count": 0},
+        "g%d" % compiled.bits["GO:0002376"]: {
+            "count": 1,
+            "classes": 1,
+            "evidence": {"buckets": [{"val": "IEA", "count": 1, "classes": 1}]},
+        },
+        "o0": {
+            "count": 2,
+            "classes": {"buckets": [{"val": "GO:0000001", "count": 2}]},
+            "evidence": {
+                "buckets": [{"val": "IDA", "count": 2, "classes": {"buckets": [{"val": "GO:0000001", "count": 2}]}}]
+            },
+        },
+    }
+
+    entity = entity_from_facets("UniProtKB:P0", compiled, facets)
+
+    assert entity["nb_classes"] == 3
+    assert entity["nb_annotations"] == 4
+    assert list(entity["groups"]) == [BP, "GO:0002376", BP + "-other"]
+    assert entity["groups"][BP] == {
+        "ALL": {"nb_classes": 3, "nb_annotations": 4},
+        "IDA": {"nb_classes": 2, "nb_annotations": 3},
+        "IEA": {"nb_classes": 1, "nb_annotations": 1},
+    }
+    assert entity["groups"][BP + "-other"]["IDA"] == {"terms": ["GO:0000001"], "nb_classes": 1, "nb_annotations": 2}
+
+
+def test_facet_counting_without_annotations(monkeypatch):
+    """Subjects GOlr has no annotations for get an empty entity."""
+
+    async def fake_facets(solr_instance, category, optionals, facets):
+        assert optionals == '&fq=bioentity:("RGD:620474")'
+        assert "subject" in facets["subjects"]["facet"]
+        return {"count": 0}
+
+    monkeypatch.setattr(ribbon_utils, "run_solr_json_facets_async", fake_facets)
+    compiled = CompiledRibbonCategories(_categories(SLIM))
+    entities = asyncio.run(count_ribbon_facets_async(["RGD:620474"], compiled))
+    assert entities["RGD:620474"]["nb_annotations"] == 0
+    assert list(entities["RGD:620474"]["groups"]) == [BP + "-other", MF + "-other", CC + "-other"]
+
+
+def test_ribbon_subjects_are_cached_per_subject_and_filters(monkeypatch):
+    """Only subjects without a cached entity for the same subset and filters are counted again."""
+    fetched = []
+
+    async def fake_fetch(subject_ids, filters="", batch_size=None):
+        fetched.append(list(subject_ids))
+        return {subject_id: _annotations(random.Random(subject_id), 20) for subject_id in subject_ids}  # noqa: S311
+
+    monkeypatch.setattr(ribbon_utils, "fetch_ribbon_annotations_async", fake_fetch)
+    get_cache_backend("ribbon").clear()
+    compiled = CompiledRibbonCategories(_categories(SLIM))
+
+    first = asyncio.run(get_ribbon_subjects_async(["RGD:620474"], compiled, "goslim_agr", ["IDA", "EXP"]))
+    second = asyncio.run(
+        get_ribbon_subjects_async(["MGI:MGI:98214", "RGD:620474"], compiled, "goslim_agr", ["EXP", "IDA"], True)
+    )
+    asyncio.run(get_ribbon_subjects_async(["RGD:620474"], compiled, "goslim_agr", ["EXP", "IDA"], cross_aspect=True))
+
+    assert fetched == [["RGD:620474"], ["MGI:MGI:98214"], ["RGD:620474"]]
+    assert second["RGD:620474"] == first["RGD:620474"]
+    # exclude_IBA has no effect once evidence codes are given
+    assert ribbon_subject_cache_key("RGD:620474", "goslim_agr", ["EXP"], True) == ribbon_subject_cache_key(
+        "RGD:620474", "goslim_agr", ["EXP"], False
+    )
+    assert ribbon_subject_cache_key("RGD:620474", "goslim_agr", exclude_PB=True) != ribbon_subject_cache_key(
+        "RGD:620474", "goslim_agr"
+    )
@@ -0,0 +1,61 @@
+"""Unit tests for request coalescing in app.utils.singleflight."""
+
+import asyncio
+
+import pytest
+
+from app.utils.golr_utils import normalize_solr_query
+from app.utils.singleflight import SingleFlight
+
+
+def test_concurrent_identical_calls_share_one_upstream_call():
+    """Concurrent callers with the same key await a single call and get independent copies."""
+    flight = SingleFlight()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"response": {"docs": [{"id": "GO:0003674"}]}}
+
+    async def run():
+        return await asyncio.gather(*(flight.do("q", fetch) for _ in range(10)))
+
+    results = asyncio.run(run())
+    assert len(calls) == 1
+    assert flight.leaders == 1
+    assert flight.followers == 9
+    assert all(result == results[0] for result in results)
+    # Mutating one caller's result must not leak into another's.
+    results[0]["response"]["docs"][0]["id"] = "changed"
+    assert results[1]["response"]["docs"][0]["id"] == "GO:0003674"
+
+
+def test_leader_error_is_shared_and_not_remembered():
+    """An upstream error reaches every waiting caller; the next call runs again."""
+    flight = SingleFlight()
+    calls = []
+
+    async def failing():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        raise RuntimeError("GOlr down")
+
+    async def run():
+        return await asyncio.gather(*(flight.do("q", failing) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert len(calls) == 1
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(flight.do("q", failing))
+    assert len(calls) == 2
+
+
+def test_normalize_solr_query_ignores_parameter_order_and_presentation():
+    """Equivalent GOlr URLs normalize to the same key."""
+    a = 'https://golr/select?q=*:*&fq=document_category:"annotation"&fq=bioentity:"X"&wt=json&indent=on'
+    b = 'https://golr/select?q=*:*&fq=bioentity:"X"&fq=document_category:"annotation"&wt=json'
+    assert normalize_solr_query(a) == normalize_solr_query(b)
+    assert normalize_solr_query(a) != normalize_solr_query(b.replace('"X"', '"Y"'))
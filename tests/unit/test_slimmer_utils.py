@@ -0,0 +1,109 @@
+"""Unit tests for the native map2slim in app.utils.slimmer_utils."""
+
+import asyncio
+import json
+
+from app.utils import slimmer_utils
+from app.utils.slimmer_utils import build_map2slim_filters, map2slim_async, translate_annotation
+
+DOC = {
+    "id": "MGI:MGI:98214|GO:0003700",
+    "assigned_by": "MGI",
+    "source": "MGI",
+    "bioentity": "MGI:MGI:98214",
+    "bioentity_label": "Shh",
+    "taxon": "NCBITaxon:10090",
+    "taxon_label": "Mus musculus",
+    "qualifier": ["enables"],
+    "annotation_class": "GO:0003700",
+    "annotation_class_label": "DNA-binding transcription factor activity",
+    "evidence": "ECO:0000314",
+    "evidence_closure_map": json.dumps({"ECO:0000314": "direct assay evidence"}),
+    "evidence_type": "IDA",
+    "reference": ["PMID:1"],
+    "aspect": "F",
+    "regulates_closure": ["GO:0003700", "GO:0140110", "GO:0003674"],
+}
+
+
+def test_annotation_is_translated_like_ontobio():
+    """Subjects get their canonical id, the aspect becomes the object category and qualifiers the relation."""
+    association = translate_annotation(dict(DOC), "regulates_closure")
+    assert association["id"] == DOC["id"]
+    assert association["subject"] == {
+        "id": "MGI:98214",
+        "iri": "http://www.informatics.jax.org/accession/MGI:98214",
+        "label": "Shh",
+        "taxon": {
+            "id": "NCBITaxon:10090",
+            "iri": "http://purl.obolibrary.org/obo/NCBITaxon_10090",
+            "label": "Mus musculus",
+        },
+    }
+    assert association["object"]["category"] == ["molecular_activity"]
+    assert association["object"]["iri"] == "http://purl.obolibrary.org/obo/GO_0003700"
+    assert association["negated"] is False
+    assert association["relation"] == {"id": "enables", "iri": "enables"}
+    assert association["publications"] == [{"id": "MGI"}]
+    assert association["evidence_types"] == [{"id": "ECO:0000314", "label": "direct assay evidence"}]
+    assert association["provided_by"] == ["MGI"]
+    assert association["object_closure"] == DOC["regulates_closure"]
+    assert association["reference"] == ["PMID:1"]
+    assert "aspect" not in association
+
+    negated = translate_annotation({**DOC, "qualifier": ["NOT", "enables"]}, "regulates_closure")
+    assert negated["qualifiers"] == ["NOT"]
+    assert negated["negated"] is False
+    assert translate_annotation({**DOC, "qualifier": ["not"]}, "regulates_closure")["negated"] is True
+
+
+def test_filters_only_fetch_annotations_mapping_to_the_slim():
+    """Unpaged queries are restricted to the slim; paged ones page over all the subjects' annotations."""
+    fq = build_map2slim_filters(["MGI:98214", "FB:FBgn1"], ["GO:0003674"], "isa_partof_closure", True)
+    assert fq == (
+        '&fq=bioentity:("MGI:MGI:98214" OR "FB:FBgn1")&fq=-evidence_subset_closure:"ECO:0000501"'
+        '&fq=isa_partof_closure:"GO:0003674"&rows=100000&start=0&sort=id asc'
+    )
+    paged = build_map2slim_filters(["ZFIN:ZDB-GENE-1"], ["GO:0003674"], "regulates_closure", rows=10, start=20)
+    assert paged == '&fq=bioentity:"ZFIN:ZDB-GENE-1"&rows=10&start=20'
+
+
+def test_associations_are_grouped_by_subject_and_slim_term(monkeypatch):
+    """Each subject / slim term pair lists the associations mapped to it, in GOlr order."""
+    second = {**DOC, "id": "second", "regulates_closure": ["GO:0005515", "GO:0003674"]}
+    queries = []
+
+    async def fake_docs(solr_instance, category, fields, optionals, cache=True):
+        queries.append((fields, optionals))
+        return [dict(DOC), second]
+
+    monkeypatch.setattr(slimmer_utils, "run_solr_docs_async", fake_docs)
+    results = asyncio.run(map2slim_async(["MGI:MGI:98214"], ["GO:0003674", "GO:0140110"]))
+
+    assert [(result["subject"], result["slim"]) for result in results] == [
+        ("MGI:98214", "GO:0140110"),
+        ("MGI:98214", "GO:0003674"),
+    ]
+    assert [assoc["id"] for assoc in results[1]["assocs"]] == [DOC["id"], "second"]
+    assert results[0]["assocs"][0]["slim"] == ["GO:0140110", "GO:0003674"]
+    assert "object_closure" not in results[0]["assocs"][0]
+    assert queries[0][0].endswith(",regulates_closure")
+    assert asyncio.run(map2slim_async([], ["GO:0003674"])) == []
+
+
+def test_all_annotations_are_fetched_page_by_page(monkeypatch):
+    """When all rows are requested, pages are fetched until GOlr returns a short one, bypassing the cache."""
+    starts = []
+
+    async def fake_docs(solr_instance, category, fields, optionals, cache=True):
+        assert not cache
+        start = int(optionals.split("&start=")[1].split("&")[0])
+        starts.append(start)
+        return [{**DOC, "id": f"doc{i}"} for i in range(start, min(start + 3, 7))]
+
+    monkeypatch.setattr(slimmer_utils, "run_solr_docs_async", fake_docs)
+    monkeypatch.setattr(slimmer_utils, "ROWS_PER_QUERY", 3)
+    results = asyncio.run(map2slim_async(["MGI:MGI:98214"], ["GO:0003674"]))
+
+    assert starts == [0, 3, 6]
+    assert [assoc["id"] for assoc in results[0]["assocs"]] == [f"doc{i}" for i in range(7)]
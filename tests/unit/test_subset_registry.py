@@ -0,0 +1,111 @@
+"""Unit tests for the subset registry in app.utils.subset_registry."""
+
+import asyncio
+
+import pytest
+
+from app.utils import subset_registry as registry_module
+from app.utils.subset_registry import SubsetRegistry
+
+
+def _subset(*term_ids):
+    return [
+        {
+            "annotation_class_label": "molecular_function",
+            "annotation_class": "GO:0003674",
+            "description": "A molecular process.",
+            "terms": [
+                {"annotation_class": id, "annotation_class_label": id, "description": ""} for id in term_ids
+            ],
+        }
+    ]
+
+
+def _fake_golr(monkeypatch, subsets):
+    calls = []
+
+    async def fake_subsets(id, fresh=False):
+        calls.append((id, fresh))
+        await asyncio.sleep(0.01)
+        return subsets.get(id, [])
+
+    monkeypatch.setattr(registry_module, "get_ontology_subsets_by_id_async", fake_subsets)
+    return calls
+
+
+def test_subsets_are_loaded_once_and_compiled(monkeypatch):
+    """Concurrent requests share one load, and later ones are served from memory."""
+    calls = _fake_golr(monkeypatch, {"goslim_agr": _subset("GO:0003824", "GO:0005215")})
+    registry = SubsetRegistry(refresh_seconds=3600)
+
+    async def run():
+        first = await asyncio.gather(*(registry.get_async("goslim_agr") for _ in range(5)))
+        return first, await registry.get_async("goslim_agr")
+
+    first, later = asyncio.run(run())
+    assert calls == [("goslim_agr", False)]
+    assert later.key == "goslim_agr@" + later.version
+    assert [group["type"] for group in later.ribbon_categories[0]["groups"]] == ["All", "Term", "Term", "Other"]
+    assert set(later.compiled.bits) == {"GO:0003674", "GO:0003824", "GO:0005215"}
+    # callers get their own copies
+    later.get_categories()[0]["terms"].clear()
+    assert len(later.get_categories()[0]["terms"]) == 2
+
+
+def test_refresh_changes_the_version_only_when_the_subset_changes(monkeypatch):
+    """Refreshed subsets are reloaded from GOlr, bypassing its response cache; their version follows their content."""
+    subsets = {"goslim_agr": _subset("GO:0003824")}
+    calls = _fake_golr(monkeypatch, subsets)
+    registry = SubsetRegistry(refresh_seconds=3600)
+
+    async def run():
+        before = await registry.get_async("goslim_agr")
+        same = await registry.refresh_async()
+        subsets["goslim_agr"] = _subset("GO:0003824", "GO:0005215")
+        changed = await registry.refresh_async(["goslim_agr"])
+        return before, same, changed, await registry.get_async("goslim_agr")
+
+    before, same, changed, after = asyncio.run(run())
+    assert [fresh for _, fresh in calls] == [False, True, True]
+    assert same == {"goslim_agr": before.version}
+    assert changed == {"goslim_agr": after.version}
+    assert after.version != before.version
+    assert len(after.compiled.term_ids[0]) == 2
+
+
+def test_stale_and_unknown_subsets_are_loaded_again(monkeypatch):
+    """Subsets older than refresh_seconds, and subsets GOlr does not know, are not served from memory."""
+    calls = _fake_golr(monkeypatch, {"goslim_agr": _subset("GO:0003824")})
+    registry = SubsetRegistry(refresh_seconds=0)
+
+    async def run():
+        for id in ["goslim_agr", "goslim_agr", "unknown", "unknown"]:
+            await registry.get_async(id)
+        return await registry.get_async("unknown")
+
+    unknown = asyncio.run(run())
+    assert calls == [
+        ("goslim_agr", False), ("goslim_agr", True), ("unknown", False), ("unknown", False), ("unknown", False)
+    ]
+    assert unknown.categories == []
+    assert unknown.get_ribbon_categories() == []
+
+
+def test_stale_subsets_are_served_when_golr_fails(monkeypatch):
+    """A stale subset that cannot be reloaded is served as it was; a subset never loaded raises."""
+    subsets = {"goslim_agr": _subset("GO:0003824")}
+    _fake_golr(monkeypatch, subsets)
+    registry = SubsetRegistry(refresh_seconds=0)
+
+    async def failing_subsets(id, fresh=False):
+        raise ConnectionError("GOlr is down")
+
+    async def run():
+        before = await registry.get_async("goslim_agr")
+        monkeypatch.setattr(registry_module, "get_ontology_subsets_by_id_async", failing_subsets)
+        return before, await registry.get_async("goslim_agr")
+
+    before, after = asyncio.run(run())
+    assert after is before
+    with pytest.raises(ConnectionError):
+        asyncio.run(registry.get_async("goslim_generic"))